@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class FilmesFavoritosApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "filmes_favoritos_api"
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save, pre_save
+
+        from .authentication import invalidate_cached_user
+        from .models import FavoriteMovie
+        from .stats import favorite_deleted, favorite_saved
+        from .sync import assign_version, record_tombstone
+
+        # Usuário desativado ou com senha trocada sai do cache da autenticação
+        User = get_user_model()
+        post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_cache_user_saved')
+        post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_cache_user_deleted')
+
+        # Toda gravação ou remoção de favorito gera uma nova versão da lista
+        pre_save.connect(assign_version, sender=FavoriteMovie, dispatch_uid='favorites_sync_saved')
+        post_delete.connect(record_tombstone, sender=FavoriteMovie, dispatch_uid='favorites_sync_deleted')
+
+        # e atualiza o resumo do usuário (GET /api/favorites/stats/)
+        post_save.connect(favorite_saved, sender=FavoriteMovie, dispatch_uid='favorites_stats_saved')
+        post_delete.connect(favorite_deleted, sender=FavoriteMovie, dispatch_uid='favorites_stats_deleted')
@@ -0,0 +1,190 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed, Throttled
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import CachedJWTAuthentication, ClaimsUser
+from .catalog import search_catalog
+from .favorite_status import annotate_results
+from .projection import InvalidFields, parse_fields, project
+from .search_pages import (InvalidPaging, catalog_limit, catalog_page, collect_pages,
+                           merge_pages, parse_paging)
+from .search_cache import search_cache
+from .throttling import GlobalTokenBucketThrottle, IPTokenBucketThrottle, UserTokenBucketThrottle, throttle_wait
+from .views import TMDB_LANGUAGE
+from . import tmdb
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Mesmo formato compacto do JSONRenderer do DRF
+JSON_PARAMS = {'separators': (',', ':'), 'ensure_ascii': False}
+
+
+def json_response(data, status=200, headers=None):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params=JSON_PARAMS, headers=headers)
+
+
+def token_user(request):
+    """
+    Usuário do access token (Authorization: Bearer), como o
+    CachedJWTAuthentication da MovieSearchView: com
+    AUTH_CACHE['STATELESS_READS'], montado só com as claims assinadas; senão,
+    pelo cache AUTH_CACHE ou pelo banco, recusando usuários desativados ou
+    removidos. None sem token; token inválido levanta AuthenticationFailed.
+    Síncrona (cache e banco): chame com sync_to_async.
+    """
+    authentication = CachedJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return None
+    validated_token = authentication.get_validated_token(raw_token)
+    if settings.AUTH_CACHE['STATELESS_READS']:
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("O token não identifica o usuário.")
+        return ClaimsUser(validated_token)
+    return authentication.get_cached_user(validated_token)
+
+
+async def fetch_tmdb_search(search_query, language=TMDB_LANGUAGE):
+    """Versão assíncrona de views.fetch_tmdb_search."""
+    data = await tmdb.get_async_client().search_movies(search_query, language)
+    return data['results']
+
+
+async def search_movies(search_query):
+    """Versão assíncrona de views.search_movies."""
+    options = settings.MOVIE_SEARCH
+    if options['BACKEND'] == 'catalog':
+        results = await sync_to_async(search_catalog)(search_query, options['LIMIT'])
+        if results or not options['TMDB_FALLBACK']:
+            return results
+
+    return await search_cache.aget_or_fetch(
+        search_query,
+        TMDB_LANGUAGE,
+        lambda: fetch_tmdb_search(search_query),
+    )
+
+
+async def fetch_tmdb_page(search_query, page, language=TMDB_LANGUAGE):
+    """Versão assíncrona de views.fetch_tmdb_page."""
+    data = await tmdb.get_async_client().search_movies(search_query, language, page=page)
+    return {key: data.get(key) for key in ('page', 'total_pages', 'total_results', 'results')}
+
+
+async def search_movie_pages(search_query, first_page, pages, limit=None):
+    """Versão assíncrona de views.search_movie_pages (as páginas em um gather)."""
+    options = settings.MOVIE_SEARCH
+    if options['BACKEND'] == 'catalog':
+        found = await sync_to_async(search_catalog)(search_query, catalog_limit(first_page, pages))
+        if found or not options['TMDB_FALLBACK']:
+            return merge_pages([catalog_page(found, first_page, pages)], first_page, pages, limit)
+
+    def fetch_page(page):
+        return search_cache.aget_or_fetch(
+            search_query,
+            TMDB_LANGUAGE,
+            lambda: fetch_tmdb_page(search_query, page),
+            page=page,
+        )
+
+    outcomes = await asyncio.gather(
+        *(fetch_page(page) for page in range(first_page, first_page + pages)),
+        return_exceptions=True,
+    )
+    return merge_pages(collect_pages(outcomes), first_page, pages, limit)
+
+
+class AsyncMovieSearchView(View):
+    """
+    View assíncrona para pesquisar filmes no catálogo local ou na API do TMDb.
+
+    Mesmo contrato da MovieSearchView, mas a espera pelo TMDb não ocupa um
+    worker: no ASGI um único processo atende centenas de pesquisas abertas.
+    Ativada com TMDB_ASYNC_VIEWS=True.
+    """
+
+    # Mesmo escopo e mesmos throttles da MovieSearchView
+    throttle_scope = 'search'
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle, GlobalTokenBucketThrottle]
+
+    async def get(self, request):
+        # Como no DRF: autentica e depois aplica os throttles (o por usuário
+        # usa o usuário do token); cache e banco fora do event loop
+        try:
+            user = await sync_to_async(token_user)(request)
+        except AuthenticationFailed as e:
+            detail = e.detail if isinstance(e.detail, dict) else {"detail": str(e.detail)}
+            return json_response(detail, status=e.status_code,
+                                 headers={'WWW-Authenticate': CachedJWTAuthentication().authenticate_header(request)})
+        request.user = user or AnonymousUser()
+        user_id = user.id if user is not None else None
+
+        wait = await sync_to_async(throttle_wait)(request, self, self.throttle_classes)
+        if wait:
+            # Mesma resposta 429 do DRF (mensagem traduzida e Retry-After)
+            throttled = Throttled(wait)
+            return json_response(
+                {"detail": str(throttled.detail)},
+                status=throttled.status_code,
+                headers={'Retry-After': str(throttled.wait)},
+            )
+
+        # 1. Obter o termo de pesquisa (query) da URL
+        search_query = request.GET.get('query', None)
+
+        if not search_query:
+            return json_response(
+                {"detail": "O parâmetro 'query' é obrigatório para a pesquisa."},
+                status=400
+            )
+
+        try:
+            fields = parse_fields(request.GET.get('fields'))
+            paging = parse_paging(request.GET)
+        except (InvalidFields, InvalidPaging) as e:
+            return json_response({"detail": str(e)}, status=400)
+
+        try:
+            # 2. Pesquisa no catálogo local e/ou no TMDb (uma ou várias páginas)
+            if paging is None:
+                results = await search_movies(search_query)
+            else:
+                data = await search_movie_pages(search_query, *paging)
+                results = data['results']
+
+            # 3. Com login, marca os filmes que já estão nos favoritos
+            if user_id is not None and (fields is None or 'is_favorite' in fields):
+                results = await sync_to_async(annotate_results)(results, user_id)
+
+            # 4. Só os campos pedidos em ?fields=
+            results = project(results, fields)
+            return json_response(results if paging is None else {**data, 'results': results})
+
+        except tmdb.TMDbOverloaded:
+            return json_response(
+                {"detail": "Muitas pesquisas em andamento. Tente novamente em instantes."},
+                status=429,
+                headers={'Retry-After': '1'},
+            )
+        except tmdb.TMDbError as e:
+            logger.error(f"Erro HTTP ao chamar TMDb: {e}")
+            return json_response(
+                {"detail": "Erro ao buscar filmes no TMDb. Verifique a chave da API."},
+                status=503
+            )
+        except Exception as e:
+            logger.error(f"Erro inesperado: {e}")
+            return json_response(
+                {"detail": "Erro interno do servidor."},
+                status=500
+            )
@@ -0,0 +1,95 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+# Métodos em que uma view com `stateless_auth = True` dispensa a consulta do usuário
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def user_cache():
+    return caches[settings.AUTH_CACHE['ALIAS']]
+
+
+def user_cache_key(user_id):
+    return f"user:{user_id}"
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """
+    Receptor de post_save/post_delete do User: descarta o usuário do cache.
+    Qualquer gravação conta (desativação, troca de senha, permissões). Um
+    `User.objects.update()` não dispara sinais e fica limitado pelo TIMEOUT.
+    """
+    user_cache().delete(user_cache_key(instance.pk))
+
+
+class ClaimsUser(TokenUser):
+    """TokenUser com o id convertido para o tipo da chave primária do User."""
+
+    @cached_property
+    def id(self):
+        return get_user_model()._meta.pk.to_python(self.token[api_settings.USER_ID_CLAIM])
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que resolve o usuário pelo cache AUTH_CACHE (TTL curto;
+    local e limitado por MAX_ENTRIES, ou o Redis de CACHE_URL), em vez de um
+    SELECT no User a cada requisição autenticada.
+
+    Com AUTH_CACHE['STATELESS_READS'], as views marcadas com
+    `stateless_auth = True` recebem um ClaimsUser montado só com as claims
+    assinadas do token em requisições de leitura: nenhuma consulta, ao custo
+    de um usuário desativado continuar lendo até o access token expirar.
+    """
+
+    def authenticate(self, request):
+        self.request = request
+        return super().authenticate(request)
+
+    def is_stateless_read(self):
+        view = self.request.parser_context.get('view') if self.request.parser_context else None
+        return (
+            settings.AUTH_CACHE['STATELESS_READS']
+            and self.request.method in SAFE_METHODS
+            and getattr(view, 'stateless_auth', False)
+        )
+
+    def get_user(self, validated_token):
+        if self.is_stateless_read():
+            if api_settings.USER_ID_CLAIM not in validated_token:
+                raise InvalidToken("O token não identifica o usuário.")
+            return ClaimsUser(validated_token)
+        return self.get_cached_user(validated_token)
+
+    def get_cached_user(self, validated_token):
+        """Usuário do token pelo cache (ou pelo banco), com as verificações do get_user."""
+        try:
+            key = user_cache_key(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            return super().get_user(validated_token)
+
+        cache = user_cache()
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.AUTH_CACHE['TIMEOUT'])
+            return user
+
+        # Mesmas verificações do get_user original; se o usuário em cache não
+        # passa, a resposta final vem do banco (que pode estar mais novo)
+        stale = (
+            (api_settings.CHECK_USER_IS_ACTIVE and not user.is_active)
+            or (api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+                != get_md5_hash_password(user.password))
+        )
+        if stale:
+            cache.delete(key)
+            return super().get_user(validated_token)
+        return user
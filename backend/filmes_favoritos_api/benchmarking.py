@@ -0,0 +1,45 @@
+"""Funções auxiliares dos comandos de benchmark (manage.py benchmark_*)."""
+import math
+
+
+def percentile(values, pct):
+    """Percentil `pct` (0-100) pelo método nearest-rank; `values` já ordenados."""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(latencies, elapsed):
+    """Resume latências (segundos) e tempo total em um dicionário com ms e req/s."""
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'elapsed_s': round(elapsed, 4),
+        'throughput_rps': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def compare_reports(current, baseline, tolerance):
+    """
+    Compara dois relatórios do loadtest endpoint a endpoint e devolve a lista
+    de regressões: p95 ou vazão piores que `tolerance` (fração) ou mais
+    consultas SQL por requisição do que no baseline.
+    """
+    regressions = []
+    for name, base in baseline['endpoints'].items():
+        row = current['endpoints'].get(name)
+        if row is None:
+            continue
+        if row['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {row['p95_ms']} ms (baseline {base['p95_ms']} ms)")
+        if row['throughput_rps'] < base['throughput_rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {row['throughput_rps']} req/s (baseline {base['throughput_rps']} req/s)")
+        if row['queries_max'] > base['queries_max']:
+            regressions.append(f"{name}: {row['queries_max']} consultas (baseline {base['queries_max']})")
+        if row['errors'] > base['errors']:
+            regressions.append(f"{name}: {row['errors']} erros (baseline {base['errors']})")
+    return regressions
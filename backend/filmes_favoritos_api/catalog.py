@@ -0,0 +1,89 @@
+import re
+
+from django.db import connection
+
+from .models import Movie
+
+# Palavras do termo de pesquisa (letras e números, com acentos)
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+MOVIE_TABLE = Movie._meta.db_table
+
+SQLITE_SEARCH_SQL = f"""
+    SELECT m.* FROM {MOVIE_TABLE}_fts f
+    JOIN {MOVIE_TABLE} m ON m.tmdb_id = f.rowid
+    WHERE {MOVIE_TABLE}_fts MATCH %s
+    ORDER BY f.rank, m.popularity DESC
+    LIMIT %s
+"""
+
+# A expressão de to_tsvector precisa ser idêntica à do índice criado na migration 0003
+POSTGRES_SEARCH_SQL = f"""
+    SELECT * FROM {MOVIE_TABLE}
+    WHERE to_tsvector('simple', title || ' ' || original_title) @@ to_tsquery('simple', %s)
+       OR title %% %s
+    ORDER BY ts_rank(to_tsvector('simple', title || ' ' || original_title), to_tsquery('simple', %s)) DESC,
+             similarity(title, %s) DESC,
+             popularity DESC
+    LIMIT %s
+"""
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.casefold())
+
+
+def movie_to_result(movie):
+    """Converte um Movie do catálogo para o formato dos resultados de pesquisa do TMDb."""
+    return {
+        'adult': movie.adult,
+        'genre_ids': movie.genre_ids,
+        'id': movie.tmdb_id,
+        'original_title': movie.original_title,
+        'overview': movie.overview,
+        'popularity': movie.popularity,
+        'poster_path': movie.poster_path,
+        'release_date': movie.release_date.isoformat() if movie.release_date else '',
+        'title': movie.title or movie.original_title,
+        'vote_average': float(movie.rating) if movie.rating is not None else 0.0,
+    }
+
+
+def fts5_match(tokens):
+    """Cada palavra vira um prefixo entre aspas: "matr"* "reload"*"""
+    return ' '.join('"{}"*'.format(token.replace('"', '""')) for token in tokens)
+
+
+def prefix_tsquery(tokens):
+    """Todas as palavras, como prefixos: matr:* & reload:*"""
+    return ' & '.join(f"{token}:*" for token in tokens)
+
+
+def _search_sqlite(tokens, limit):
+    return Movie.objects.raw(SQLITE_SEARCH_SQL, [fts5_match(tokens), limit])
+
+
+def _search_postgres(query, tokens, limit):
+    tsquery = prefix_tsquery(tokens)
+    return Movie.objects.raw(POSTGRES_SEARCH_SQL, [tsquery, query, tsquery, query, limit])
+
+
+def search_catalog(query, limit=20):
+    """
+    Pesquisa filmes no catálogo local com uma única consulta indexada.
+
+    Usa full-text + trigram no Postgres e FTS5 no SQLite; em outros bancos cai
+    para um `icontains` simples. Retorna a lista no formato do TMDb.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    if connection.vendor == 'sqlite':
+        movies = _search_sqlite(tokens, limit)
+    elif connection.vendor == 'postgresql':
+        movies = _search_postgres(query, tokens, limit)
+    else:
+        movies = Movie.objects.filter(title__icontains=query).order_by('-popularity')[:limit]
+
+    return [movie_to_result(movie) for movie in movies]
@@ -0,0 +1,82 @@
+"""
+Compressão das respostas com brotli (se o pacote estiver instalado) ou gzip,
+conforme o Accept-Encoding do cliente. Usado pelo CompressionMiddleware e
+pelo benchmark_compression.
+"""
+import gzip
+import zlib
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+# Tipos de conteúdo que valem a pena comprimir (imagens etc. já vêm comprimidas)
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'application/xml',
+                      'application/x-ndjson')
+
+
+def available_encodings():
+    """Codificações suportadas, da preferida para a menos preferida."""
+    return ('br', 'gzip') if brotli is not None else ('gzip', )
+
+
+def parse_accept_encoding(header):
+    """{codificação: q} do cabeçalho Accept-Encoding."""
+    accepted = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """A melhor codificação aceita pelo cliente (q > 0) ou None."""
+    accepted = parse_accept_encoding(header)
+    for encoding in available_encodings():
+        q = accepted.get(encoding, accepted.get('*', 0.0))
+        if q > 0:
+            return encoding
+    return None
+
+
+def is_compressible(content_type):
+    content_type = content_type.lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES) or '+json' in content_type
+
+
+def compress(content, encoding, options):
+    if encoding == 'br':
+        return brotli.compress(content, quality=options['BROTLI_QUALITY'])
+    # mtime=0: o mesmo conteúdo gera os mesmos bytes
+    return gzip.compress(content, compresslevel=options['GZIP_LEVEL'], mtime=0)
+
+
+def compress_stream(chunks, encoding, options):
+    """Versão em streaming de compress(): um pedaço comprimido por pedaço recebido."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=options['BROTLI_QUALITY'])
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    # wbits 16+: formato gzip (cabeçalho + CRC), como o gzip.compress
+    compressor = zlib.compressobj(options['GZIP_LEVEL'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
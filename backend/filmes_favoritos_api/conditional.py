@@ -0,0 +1,84 @@
+import hashlib
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .projection import fields_tag
+
+
+def is_conditional(request):
+    """Indica se a requisição traz alguma pré-condição (If-None-Match etc.)."""
+    meta = request.META
+    return any(header in meta for header in (
+        'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_MATCH', 'HTTP_IF_UNMODIFIED_SINCE',
+    ))
+
+
+def not_modified(request, etag=None, last_modified=None):
+    """
+    Avalia as pré-condições da requisição contra os metadados da versão.
+    Retorna a resposta 304/412 do Django ou None quando a resposta completa
+    deve ser gerada.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def set_validators(response, etag=None, last_modified=None):
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+# --- Links compartilhados ---
+
+def snapshot_etag(content_hash, compressed=False, fields=None):
+    """ETag forte do snapshot: o sha256 do conteúdo, por codificação e projeção (?fields=)."""
+    if fields is not None:
+        content_hash = f"{content_hash}-{fields_tag(fields)}"
+    return quote_etag(f"{content_hash}-gzip" if compressed else content_hash)
+
+
+def public_cache(response, options, expires_at=None):
+    """
+    Cabeçalhos para navegador e CDN: o snapshot de um link não muda. Um link
+    com validade não fica em cache além dela.
+    """
+    max_age, s_maxage = options['MAX_AGE'], options['S_MAXAGE']
+    if expires_at is not None:
+        remaining = max(0, int((expires_at - timezone.now()).total_seconds()))
+        max_age, s_maxage = min(max_age, remaining), min(s_maxage, remaining)
+    patch_cache_control(
+        response,
+        public=True,
+        max_age=max_age,
+        s_maxage=s_maxage,
+    )
+    patch_vary_headers(response, ('Accept-Encoding', ))
+    return response
+
+
+# --- Favoritos do usuário ---
+
+def favorites_etag(request, version):
+    """
+    ETag forte da resposta: versão da lista (sync.get_state) + usuário +
+    query string + formato. Toda gravação na lista muda a versão.
+    """
+    raw = '|'.join(str(part) for part in (
+        request.user.id,
+        version,
+        request.META.get('QUERY_STRING', ''),
+        request.accepted_renderer.format,
+    ))
+    return quote_etag(hashlib.sha256(raw.encode('utf-8')).hexdigest())
+
+
+def private_cache(response):
+    """Só o navegador do usuário guarda a lista, sempre revalidando pelo ETag."""
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization', 'Accept'))
+    return response
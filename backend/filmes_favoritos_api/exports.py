@@ -0,0 +1,50 @@
+import csv
+import json
+
+from django.conf import settings
+
+from .fastpath import RowSerializer
+from .serializers import FavoriteMovieSerializer
+
+favorite_row_serializer = RowSerializer(FavoriteMovieSerializer)
+
+# Colunas exportadas, na mesma ordem da API
+EXPORT_FIELDS = favorite_row_serializer.field_names
+
+
+class Echo:
+    """Pseudo-buffer para o csv.writer: devolve a linha em vez de guardá-la."""
+
+    def write(self, value):
+        return value
+
+
+def favorite_rows(queryset):
+    """
+    Percorre os favoritos em blocos (`.iterator(chunk_size=...)`) e devolve cada
+    linha como dicionário no mesmo formato do FavoriteMovieSerializer.
+    """
+    rows = favorite_row_serializer.values(queryset).iterator(
+        chunk_size=settings.FAVORITES_EXPORT_CHUNK_SIZE
+    )
+    for row in rows:
+        yield favorite_row_serializer.to_representation(row)
+
+
+def iter_ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(['' if row[name] is None else row[name] for name in EXPORT_FIELDS])
+
+
+# Formato -> (gerador, content type, extensão do arquivo)
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (iter_csv, 'text/csv', 'csv'),
+}
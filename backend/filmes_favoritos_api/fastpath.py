@@ -0,0 +1,108 @@
+import datetime
+import decimal
+from operator import itemgetter
+
+from rest_framework import ISO_8601, fields as drf_fields
+from rest_framework.settings import api_settings
+
+
+def identity(value):
+    return value
+
+
+def compile_decimal(field):
+    """Mesmo resultado do DecimalField.to_representation, com o quantize pré-montado."""
+    if (field.decimal_places is None or field.normalize_output or field.localize
+            or not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)):
+        return field.to_representation
+
+    quantum = decimal.Decimal('.1') ** field.decimal_places
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        return f'{value.quantize(quantum, rounding=rounding, context=context):f}'
+    return convert
+
+
+def compile_datetime(field):
+    """Mesmo resultado do DateTimeField.to_representation (ISO 8601, 'Z' para UTC)."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        value = value.astimezone(field_timezone).isoformat()
+        if value.endswith('+00:00'):
+            return value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def compile_date(field):
+    output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601:
+        return field.to_representation
+    return datetime.date.isoformat
+
+
+def compile_converter(field):
+    """
+    Escolhe a conversão de um valor vindo do banco para a saída do campo DRF.
+    Campos cujo valor do banco já é a saída (inteiros, textos) não são
+    convertidos; tipos desconhecidos usam o próprio to_representation.
+    """
+    if isinstance(field, (drf_fields.IntegerField, drf_fields.CharField, drf_fields.BooleanField)):
+        return identity
+    if isinstance(field, drf_fields.DecimalField):
+        return compile_decimal(field)
+    if isinstance(field, drf_fields.DateTimeField):
+        return compile_datetime(field)
+    if isinstance(field, drf_fields.DateField):
+        return compile_date(field)
+    return field.to_representation
+
+
+class RowSerializer:
+    """
+    Caminho rápido de leitura para um ModelSerializer de campos simples.
+
+    Converte tuplas de `.values_list(*lookups)` direto em dicionários no
+    formato do serializer, com os conversores montados uma vez por classe em
+    vez de percorrer os campos DRF a cada linha. Campos com `source` em outro
+    modelo (ex.: 'movie.title') viram lookups com join ('movie__title').
+    """
+
+    def __init__(self, serializer_class):
+        fields = serializer_class().fields
+        self.field_names = tuple(name for name, field in fields.items() if not field.write_only)
+        self.lookups = tuple(fields[name].source.replace('.', '__') for name in self.field_names)
+        converters = [compile_converter(fields[name]) for name in self.field_names]
+        # (índice, nome, conversor) só dos campos que precisam de conversão
+        self.converted = [
+            (index, name, convert)
+            for index, (name, convert) in enumerate(zip(self.field_names, converters))
+            if convert is not identity
+        ]
+
+    def getter(self, *names):
+        """itemgetter das colunas pedidas, para ler valores crus das tuplas."""
+        return itemgetter(*(self.field_names.index(name) for name in names))
+
+    def to_representation(self, row):
+        data = dict(zip(self.field_names, row))
+        for index, name, convert in self.converted:
+            value = row[index]
+            if value is not None:
+                data[name] = convert(value)
+        return data
+
+    def values(self, queryset):
+        return queryset.values_list(*self.lookups)
+
+    def serialize(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
@@ -0,0 +1,33 @@
+"""
+Quais filmes de uma lista o usuário já favoritou: usado para marcar
+`is_favorite` nos resultados da pesquisa e pelo POST /api/favorites/status/.
+"""
+from .models import FavoriteMovie
+
+
+def favorited_ids(user_id, tmdb_ids):
+    """Subconjunto de `tmdb_ids` que está nos favoritos do usuário (uma consulta)."""
+    tmdb_ids = set(tmdb_ids)
+    if not tmdb_ids:
+        return set()
+    return set(
+        FavoriteMovie.objects.filter(user_id=user_id, movie_id__in=tmdb_ids)
+        .values_list('movie_id', flat=True)
+    )
+
+
+def result_ids(results):
+    return [movie['id'] for movie in results if isinstance(movie.get('id'), int)]
+
+
+def mark_favorites(results, favorited):
+    """
+    Cópia dos resultados com `is_favorite` em cada filme. Os dicts originais
+    não são alterados: podem ser os mesmos objetos compartilhados pelo cache
+    de pesquisa entre requisições de usuários diferentes.
+    """
+    return [{**movie, 'is_favorite': movie.get('id') in favorited} for movie in results]
+
+
+def annotate_results(results, user_id):
+    return mark_favorites(results, favorited_ids(user_id, result_ids(results)))
@@ -0,0 +1,338 @@
+"""
+Peças do teste de carga ponta a ponta (manage.py loadtest): servidor WSGI da
+aplicação em uma thread, contagem de consultas por requisição, dados de
+semente e os cenários que exercitam cada rota da API.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import recommendations, share_views, stats
+from .benchmarking import summarize
+from .models import FavoriteMovie, Movie
+from .snapshots import get_or_create_snapshot
+from .tmdb_stub import fake_movie
+
+# Cabeçalho interno com o número de consultas SQL da requisição
+QUERY_COUNT_HEADER = 'X-Loadtest-Queries'
+
+
+class QueryCounter:
+    """execute_wrapper que só conta as consultas feitas na thread da requisição."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class QueryCountingApp:
+    """
+    Envolve o WSGIHandler do Django e devolve o total de consultas SQL da
+    requisição (inclusive as feitas durante o streaming) em QUERY_COUNT_HEADER.
+    """
+
+    def __init__(self, handler=None):
+        self.handler = handler or WSGIHandler()
+
+    def __call__(self, environ, start_response):
+        captured = {}
+
+        def capture(status, headers, exc_info=None):
+            captured['status'], captured['headers'] = status, headers
+            return lambda data: None
+
+        counter = QueryCounter()
+        with connection.execute_wrapper(counter):
+            response = self.handler(environ, capture)
+            try:
+                body = b''.join(response)
+            finally:
+                if hasattr(response, 'close'):
+                    response.close()
+
+        headers = [(name, value) for name, value in captured['headers'] if name.lower() != 'content-length']
+        headers += [('Content-Length', str(len(body))), (QUERY_COUNT_HEADER, str(counter.count))]
+        start_response(captured['status'], headers)
+        return [body]
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    # Sem Nagle: respostas pequenas não esperam o ACK atrasado do cliente
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+
+class AppServer:
+    """Servidor HTTP multithread da aplicação, em background, numa porta livre."""
+
+    def __init__(self, host='127.0.0.1', port=0):
+        self.server = ThreadedWSGIServer((host, port), QuietRequestHandler, allow_reuse_address=False)
+        self.server.set_app(QueryCountingApp())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+
+# --- Dados de semente ---
+
+PASSWORD = 'senha-de-carga-123'
+
+
+@dataclass
+class LoadUser:
+    username: str
+    access: str
+    refresh: str
+    tmdb_ids: list
+    share_hash: str = None
+
+
+def seed(users, favorites, first_tmdb_id=1):
+    """
+    Cria `users` usuários com `favorites` favoritos cada (bulk_create) e um
+    par de tokens JWT para cada um. Retorna a lista de LoadUser.
+    """
+    # Um único hash de senha: o PBKDF2 por usuário dominaria o tempo de semente
+    password = make_password(PASSWORD)
+    User.objects.bulk_create([
+        User(username=f"carga{i}", email=f"carga{i}@example.com", password=password)
+        for i in range(users)
+    ])
+
+    seeded, next_tmdb_id = [], first_tmdb_id
+    for user in User.objects.filter(username__startswith='carga').order_by('id'):
+        tmdb_ids = list(range(next_tmdb_id, next_tmdb_id + favorites))
+        next_tmdb_id += favorites
+        Movie.objects.bulk_create([
+            Movie(
+                tmdb_id=tmdb_id,
+                title=fake_movie(tmdb_id)['title'],
+                poster_path=f"/poster{tmdb_id}.jpg",
+                rating='7.5',
+                release_date='2001-01-01',
+            )
+            for tmdb_id in tmdb_ids
+        ], batch_size=1000, ignore_conflicts=True)
+        FavoriteMovie.objects.bulk_create([
+            FavoriteMovie(user=user, movie_id=tmdb_id) for tmdb_id in tmdb_ids
+        ], batch_size=1000)
+        token = RefreshToken.for_user(user)
+        seeded.append(LoadUser(user.username, str(token.access_token), str(token), tmdb_ids))
+    return seeded
+
+
+# --- Cenários ---
+
+@dataclass
+class Scenario:
+    """
+    Uma rota exercitada pelo teste de carga. `build(i, user)` devolve os
+    argumentos do requests (method, path, json, params); a autenticação JWT é
+    adicionada quando `auth` é verdadeiro.
+    """
+    name: str
+    build: Callable
+    expected: tuple = (200, )
+    auth: bool = True
+    # Executado uma vez antes das requisições do cenário
+    prepare: Callable = None
+    # Clientes simultâneos (padrão: --concurrency do comando)
+    concurrency: int = None
+    # Cenários de sobrecarga rodam com os rate limits ligados
+    throttled: bool = False
+
+
+class TmdbIds:
+    """Gerador thread-safe de tmdb_ids novos (ainda não favoritados)."""
+
+    def __init__(self, start):
+        self.lock = threading.Lock()
+        self.next = start
+
+    def take(self, count=1):
+        with self.lock:
+            first, self.next = self.next, self.next + count
+        return list(range(first, first + count))
+
+
+def build_scenarios(users, new_ids, search_terms, overload_concurrency=None):
+    """
+    Cenários de todas as rotas de filmes_favoritos_api.urls e dos tokens JWT.
+    Com `overload_concurrency`, inclui os cenários de sobrecarga (login e
+    pesquisas sem cache acima dos limites), em que 429 é resposta esperada.
+    """
+    added = {}
+
+    def user_for(i):
+        return users[i % len(users)]
+
+    def add_favorite(i, user):
+        tmdb_id = new_ids.take()[0]
+        added.setdefault(user.username, []).append(tmdb_id)
+        return {'method': 'POST', 'path': '/api/favorites/',
+                'json': {'tmdb_id': tmdb_id, 'title': f"Novo {tmdb_id}", 'rating': '6.5'}}
+
+    def delete_favorite(i, user):
+        tmdb_id = added[user.username].pop()
+        return {'method': 'DELETE', 'path': f'/api/favorites/{tmdb_id}/'}
+
+    def import_favorites(i, user):
+        return {'method': 'POST', 'path': '/api/favorites/import/', 'json': [
+            {'tmdb_id': tmdb_id, 'title': f"Importado {tmdb_id}", 'rating': '7.0'}
+            for tmdb_id in new_ids.take(10)
+        ]}
+
+    def create_share_links():
+        for user in users:
+            shared_list, _, _ = get_or_create_snapshot(User.objects.get(username=user.username))
+            user.share_hash = shared_list.share_hash
+
+    def build_recommendations():
+        if recommendations.np is not None:
+            recommendations.build_index()
+
+    def share_retrieve(i, user):
+        return {'method': 'GET', 'path': f'/api/share/{user.share_hash}/'}
+
+    def register(i, user):
+        username = f"novo{new_ids.take()[0]}"
+        return {'method': 'POST', 'path': '/api/register/',
+                'json': {'username': username, 'email': f"{username}@example.com", 'password': PASSWORD}}
+
+    def unique_search(i, user):
+        return {'method': 'GET', 'path': '/api/search/', 'params': {'query': f"sobrecarga {new_ids.take()[0]}"}}
+
+    overload = [
+        Scenario('overload_token_obtain', lambda i, u: {
+            'method': 'POST', 'path': '/api/token/', 'json': {'username': u.username, 'password': PASSWORD},
+        }, expected=(200, 429), auth=False, concurrency=overload_concurrency, throttled=True),
+        Scenario('overload_search', unique_search, expected=(200, 429),
+                 concurrency=overload_concurrency, throttled=True),
+    ] if overload_concurrency else []
+
+    return [
+        Scenario('token_obtain', lambda i, u: {
+            'method': 'POST', 'path': '/api/token/', 'json': {'username': u.username, 'password': PASSWORD},
+        }, auth=False),
+        Scenario('token_refresh', lambda i, u: {
+            'method': 'POST', 'path': '/api/token/refresh/', 'json': {'refresh': u.refresh},
+        }, auth=False),
+        Scenario('register', register, expected=(201, ), auth=False),
+        Scenario('search', lambda i, u: {
+            'method': 'GET', 'path': '/api/search/', 'params': {'query': search_terms[i % len(search_terms)]},
+        }),
+        Scenario('search_fields', lambda i, u: {
+            'method': 'GET', 'path': '/api/search/',
+            'params': {'query': search_terms[i % len(search_terms)], 'fields': 'id,title,poster_path,vote_average'},
+        }),
+        Scenario('search_pages', lambda i, u: {
+            'method': 'GET', 'path': '/api/search/',
+            'params': {'query': search_terms[i % len(search_terms)], 'pages': 3},
+        }),
+        Scenario('favorites_list', lambda i, u: {'method': 'GET', 'path': '/api/favorites/'}),
+        Scenario('favorites_page', lambda i, u: {
+            'method': 'GET', 'path': '/api/favorites/', 'params': {'page_size': 20},
+        }),
+        Scenario('favorites_sync', lambda i, u: {
+            'method': 'GET', 'path': '/api/favorites/', 'params': {'since': 0},
+        }),
+        Scenario('favorites_add', add_favorite, expected=(201, )),
+        Scenario('favorites_delete', delete_favorite, expected=(204, )),
+        Scenario('favorites_import', import_favorites, expected=(200, 201)),
+        Scenario('favorites_status', lambda i, u: {
+            'method': 'POST', 'path': '/api/favorites/status/',
+            'json': {'tmdb_ids': u.tmdb_ids[:10] + new_ids.take(10)},
+        }),
+        Scenario('favorites_export', lambda i, u: {'method': 'GET', 'path': '/api/favorites/export/'}),
+        # A semente usa bulk_create: os resumos são calculados antes
+        Scenario('favorites_stats', lambda i, u: {'method': 'GET', 'path': '/api/favorites/stats/'},
+                 prepare=stats.rebuild_all),
+        Scenario('recommendations', lambda i, u: {'method': 'GET', 'path': '/api/recommendations/'},
+                 prepare=build_recommendations),
+        Scenario('share_generate', lambda i, u: {'method': 'POST', 'path': '/api/share/generate/'},
+                 expected=(200, 201)),
+        Scenario('share_retrieve', share_retrieve, auth=False, prepare=create_share_links),
+        Scenario('share_stats', lambda i, u: {'method': 'GET', 'path': f'/api/share/{u.share_hash}/stats/'},
+                 prepare=share_views.flush),
+        *overload,
+    ], user_for
+
+
+class Driver:
+    """Dispara as requisições de um cenário com `concurrency` clientes HTTP."""
+
+    def __init__(self, base_url, concurrency):
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.local = threading.local()
+
+    def session(self):
+        # Uma sessão (conexão keep-alive) por thread cliente
+        if not hasattr(self.local, 'session'):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def request(self, user, spec, auth):
+        headers = {'Authorization': f"Bearer {user.access}"} if auth else {}
+        start = time.perf_counter()
+        response = self.session().request(
+            spec['method'], self.base_url + spec['path'],
+            json=spec.get('json'), params=spec.get('params'), headers=headers, timeout=60,
+        )
+        elapsed = time.perf_counter() - start
+        return elapsed, response.status_code, int(response.headers.get(QUERY_COUNT_HEADER, 0))
+
+    def run(self, scenario, total, user_for):
+        if scenario.prepare:
+            scenario.prepare()
+
+        def one(i):
+            user = user_for(i)
+            return self.request(user, scenario.build(i, user), scenario.auth)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=scenario.concurrency or self.concurrency) as pool:
+            results = list(pool.map(one, range(total)))
+        elapsed = time.perf_counter() - start
+
+        latencies = [latency for latency, _, _ in results]
+        queries = [count for _, _, count in results]
+        statuses = {}
+        for _, status_code, _ in results:
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+
+        report = summarize(latencies, elapsed)
+        report.update({
+            'errors': sum(1 for _, status_code, _ in results if status_code not in scenario.expected),
+            'statuses': statuses,
+            'queries_avg': round(sum(queries) / len(queries), 2) if queries else 0.0,
+            'queries_max': max(queries, default=0),
+        })
+        return report
@@ -0,0 +1,98 @@
+import json
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from filmes_favoritos_api import compression
+from filmes_favoritos_api.exports import favorite_row_serializer
+from filmes_favoritos_api.management.commands.benchmark_serialization import fake_rows
+from filmes_favoritos_api.projection import project
+from filmes_favoritos_api.snapshots import render_json
+from filmes_favoritos_api.tmdb_stub import fake_movie
+
+# Campos que o front-end exibe na pesquisa e nas listas
+SEARCH_FIELDS = frozenset({'id', 'title', 'poster_path', 'vote_average', 'release_date'})
+FAVORITE_FIELDS = frozenset({'tmdb_id', 'title', 'poster_path', 'rating', 'release_date'})
+
+
+def payloads(favorites):
+    """Respostas realistas, completas e com ?fields=, já renderizadas."""
+    # Uma página de pesquisa do TMDb (20 resultados)
+    search = [fake_movie(603 + i, f"Matrix {i}") for i in range(20)]
+    rows = favorite_row_serializer.serialize(fake_rows(favorites))
+    shared = {'share_hash': str(uuid.uuid4()), 'created_at': timezone.now().isoformat()}
+    return {
+        'search': render_json(search),
+        'search?fields': render_json(project(search, SEARCH_FIELDS)),
+        'favorites': render_json(rows),
+        'favorites?fields': render_json(project(rows, FAVORITE_FIELDS)),
+        'share': render_json({**shared, 'favorites': rows}),
+        'share?fields': render_json({**shared, 'favorites': project(rows, FAVORITE_FIELDS)}),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede tamanho, taxa de compressão e custo de CPU (gzip e brotli, em vários "
+        "níveis) das respostas de pesquisa, favoritos e links compartilhados, com "
+        "e sem ?fields=."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--favorites', type=int, default=200,
+                            help="Favoritos na lista e no link compartilhado.")
+        parser.add_argument('--min-time', type=float, default=0.2,
+                            help="Tempo mínimo (s) de medição por payload e codificação.")
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def codecs(self):
+        codecs = [('gzip', level, {'GZIP_LEVEL': level}) for level in (1, 6, 9)]
+        if 'br' in compression.available_encodings():
+            codecs += [('br', quality, {'BROTLI_QUALITY': quality}) for quality in (1, 4, 11)]
+        return codecs
+
+    def measure(self, content, encoding, options, min_time):
+        """Repete a compressão até somar `min_time` segundos; retorna (µs por resposta, bytes)."""
+        runs, elapsed, output = 0, 0.0, b''
+        while elapsed < min_time or runs == 0:
+            start = time.perf_counter()
+            output = compression.compress(content, encoding, options)
+            elapsed += time.perf_counter() - start
+            runs += 1
+        return elapsed / runs * 1e6, len(output)
+
+    def handle(self, *args, **options):
+        report = []
+        full_sizes = {}
+        for name, content in payloads(options['favorites']).items():
+            base = name.split('?')[0]
+            full_sizes.setdefault(base, len(content))
+            for encoding, level, codec_options in self.codecs():
+                us, size = self.measure(content, encoding, codec_options, options['min_time'])
+                report.append({
+                    'payload': name,
+                    'encoding': f"{encoding}-{level}",
+                    'raw_bytes': len(content),
+                    'bytes': size,
+                    'ratio': round(len(content) / size, 2),
+                    # Redução em relação à resposta completa sem compressão
+                    'vs_full_raw': round(full_sizes[base] / size, 2),
+                    'cpu_us': round(us, 1),
+                    'mb_per_s': round(len(content) / us, 1),
+                })
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'payload':<18}{'codificação':<12}{'bytes':>9}{'comprimido':>11}"
+            f"{'taxa':>7}{'vs completo':>12}{'CPU µs':>10}{'MB/s':>8}"
+        )
+        for row in report:
+            self.stdout.write(
+                f"{row['payload']:<18}{row['encoding']:<12}{row['raw_bytes']:>9}{row['bytes']:>11}"
+                f"{row['ratio']:>6}x{row['vs_full_raw']:>11}x{row['cpu_us']:>10}{row['mb_per_s']:>8}"
+            )
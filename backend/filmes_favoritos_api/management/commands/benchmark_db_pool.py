@@ -0,0 +1,179 @@
+import copy
+import json
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.signals import request_finished, request_started
+from django.db import DatabaseError, connection, connections
+
+from filmes_favoritos_api.benchmarking import summarize
+from filmes_favoritos_api.loadtesting import seed
+from filmes_favoritos_api.models import FavoriteMovie
+
+# Modo -> (CONN_MAX_AGE, CONN_HEALTH_CHECKS, pool)
+MODES = {
+    # Como era em produção: conexão persistente por thread, sem verificação
+    'persistent': (600, False, False),
+    # Conexão persistente conferida no início de cada requisição
+    'checked': (600, True, False),
+    # Pool do psycopg 3 (DB_POOL), que confere a conexão antes de entregá-la
+    'pool': (0, True, True),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara as conexões persistentes (com e sem CONN_HEALTH_CHECKS) com o pool "
+        "do psycopg 3 (DB_POOL) em um banco de teste do PostgreSQL: N threads fazem "
+        "requisições simuladas (sinais request_started/request_finished, a consulta "
+        "da lista de favoritos e um tempo fora do banco). Mede vazão, latência, "
+        "conexões abertas no servidor e erros depois de derrubar as conexões."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help="Threads atendendo requisições (ex.: workers x threads do gunicorn).")
+        parser.add_argument('--requests', type=int, default=4000, help="Requisições por modo.")
+        parser.add_argument('--app-time', type=float, default=0.005,
+                            help="Segundos de trabalho fora do banco por requisição.")
+        parser.add_argument('--pool-min', type=int, default=settings.DB_POOL['MIN_SIZE'])
+        parser.add_argument('--pool-max', type=int, default=settings.DB_POOL['MAX_SIZE'])
+        parser.add_argument('--users', type=int, default=50, help="Usuários semeados.")
+        parser.add_argument('--favorites', type=int, default=50, help="Favoritos por usuário.")
+        parser.add_argument('--kill-connections', action='store_true',
+                            help="Na metade de cada modo, derruba as conexões (pg_terminate_backend).")
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("O benchmark do pool precisa do PostgreSQL (DATABASE_URL ou DB_ENGINE).")
+
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            seed(options['users'], options['favorites'])
+            user_ids = list(FavoriteMovie.objects.values_list('user_id', flat=True).distinct())
+            report = [self.run_mode(mode, user_ids, options) for mode in options['modes']]
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'modo':<11}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'conexões':>10}{'espera ms':>11}{'erros':>7}"
+        )
+        for row in report:
+            self.stdout.write(
+                f"{row['mode']:<11}{row['throughput_rps']:>9}{row['p50_ms']:>9}{row['p95_ms']:>9}"
+                f"{row['p99_ms']:>9}{row['peak_connections']:>10}{row['pool_wait_ms']:>11}{row['errors']:>7}"
+            )
+
+    def alias_for(self, mode, options):
+        """Um alias de banco por modo, com as configurações do default (já no banco de teste)."""
+        conn_max_age, health_checks, pooled = MODES[mode]
+        alias = f"benchmark_{mode}"
+        settings_dict = copy.deepcopy(connections.settings['default'])
+        settings_dict['CONN_MAX_AGE'] = conn_max_age
+        settings_dict['CONN_HEALTH_CHECKS'] = health_checks
+        options_dict = settings_dict.setdefault('OPTIONS', {})
+        # Identifica as conexões do modo no pg_stat_activity
+        options_dict['application_name'] = alias
+        options_dict.pop('pool', None)
+        if pooled:
+            options_dict['pool'] = {
+                'min_size': options['pool_min'],
+                'max_size': options['pool_max'],
+                'timeout': settings.DB_POOL['TIMEOUT'],
+            }
+        connections.settings[alias] = settings_dict
+        return alias
+
+    def run_mode(self, mode, user_ids, options):
+        alias = self.alias_for(mode, options)
+        latencies, errors = [], []
+        counter = iter(range(options['requests']))
+        counter_lock = threading.Lock()
+        done = threading.Event()
+        halfway = threading.Event()
+        peak = [0]
+
+        def one_request(i):
+            start = time.perf_counter()
+            # Fecha as conexões vencidas ou com erro, como no início de uma requisição
+            request_started.send(sender=self.__class__)
+            try:
+                user_id = user_ids[i % len(user_ids)]
+                list(FavoriteMovie.objects.using(alias).filter(user_id=user_id)
+                     .select_related('movie').order_by('-added_at')[:50])
+                # Serialização, TMDb etc.: a conexão continua presa à requisição
+                time.sleep(options['app_time'])
+                latencies.append(time.perf_counter() - start)
+            except DatabaseError as e:
+                errors.append(str(e))
+            finally:
+                request_finished.send(sender=self.__class__)
+
+        def worker():
+            try:
+                while True:
+                    with counter_lock:
+                        i = next(counter, None)
+                    if i is None:
+                        return
+                    if i == options['requests'] // 2:
+                        halfway.set()
+                    one_request(i)
+            finally:
+                connections[alias].close()
+
+        def monitor():
+            # Conexão própria (default) para contar as do modo no servidor
+            with connections['default'].cursor() as cursor:
+                killed = False
+                while not done.is_set():
+                    if options['kill_connections'] and halfway.is_set() and not killed:
+                        cursor.execute(
+                            "SELECT pg_terminate_backend(pid) FROM pg_stat_activity WHERE application_name = %s",
+                            [alias],
+                        )
+                        killed = True
+                    cursor.execute("SELECT count(*) FROM pg_stat_activity WHERE application_name = %s", [alias])
+                    peak[0] = max(peak[0], cursor.fetchone()[0])
+                    done.wait(0.02)
+            connections['default'].close()
+
+        monitor_thread = threading.Thread(target=monitor)
+        monitor_thread.start()
+        threads = [threading.Thread(target=worker) for _ in range(options['concurrency'])]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        done.set()
+        monitor_thread.join()
+
+        pool_wait_ms = 0.0
+        wrapper = connections[alias]
+        if MODES[mode][2]:
+            stats = wrapper.pool.get_stats()
+            pool_wait_ms = round(stats.get('requests_wait_ms', 0) / max(1, stats.get('requests_num', 1)), 2)
+            wrapper.close_pool()
+
+        row = summarize(latencies, elapsed)
+        self.stderr.write(f"{mode:<11}{row['throughput_rps']:>10} req/s{row['p95_ms']:>10} ms p95")
+        return {
+            'mode': mode,
+            **row,
+            'peak_connections': peak[0],
+            'pool_wait_ms': pool_wait_ms,
+            'errors': len(errors),
+            'first_error': errors[0] if errors else None,
+        }
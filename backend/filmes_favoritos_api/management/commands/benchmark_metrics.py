@@ -0,0 +1,68 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import resolve
+
+from filmes_favoritos_api import metrics
+from filmes_favoritos_api.middleware import MetricsMiddleware
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo do MetricsMiddleware por requisição e do execute_wrapper "
+        "por consulta SQL, em microssegundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100000)
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def per_call_us(self, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return (time.perf_counter() - start) / iterations * 1e6
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        request = RequestFactory().get('/api/favorites/')
+        request.resolver_match = resolve('/api/favorites/')
+        response = HttpResponse(b'[]', content_type='application/json')
+
+        def view(request):
+            return response
+
+        middleware = MetricsMiddleware(view)
+        bare_us = self.per_call_us(lambda: view(request), iterations)
+        wrapped_us = self.per_call_us(lambda: middleware(request), iterations)
+
+        # execute_wrapper: uma "consulta" que não faz nada, com e sem requisição ativa
+        def execute(sql, params, many, context):
+            return None
+
+        def query():
+            metrics.db_execute_wrapper(execute, 'SELECT 1', (), False, {})
+
+        idle_query_us = self.per_call_us(query, iterations)
+        token = metrics.current.set(metrics.RequestMetrics())
+        try:
+            active_query_us = self.per_call_us(query, iterations)
+        finally:
+            metrics.current.reset(token)
+        metrics.registry.reset()
+
+        report = {
+            'iterations': iterations,
+            'middleware_overhead_us': round(wrapped_us - bare_us, 3),
+            'db_wrapper_overhead_us': round(active_query_us, 3),
+            'db_wrapper_idle_us': round(idle_query_us, 3),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        self.stdout.write(f"middleware por requisição: {report['middleware_overhead_us']} µs")
+        self.stdout.write(f"execute_wrapper por consulta: {report['db_wrapper_overhead_us']} µs")
+        self.stdout.write(f"execute_wrapper fora de requisição: {report['db_wrapper_idle_us']} µs")
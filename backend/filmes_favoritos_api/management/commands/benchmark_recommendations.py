@@ -0,0 +1,80 @@
+import json
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from filmes_favoritos_api import recommendations
+from filmes_favoritos_api.recommendations import (DECADE_BLOCK, DIMENSIONS, GENRE_BLOCK, KEYWORD_BLOCK,
+                                                  RATING_BLOCK, RecommendationIndex, write_generation)
+
+
+def synthetic_vectors(count, rng):
+    """
+    Matriz com a mesma forma das reais (2 gêneros, década, faixa de nota e
+    4 palavras-chave por filme), montada direto no numpy.
+    """
+    np = recommendations.np
+    vectors = np.zeros((count, DIMENSIONS), dtype=np.float32)
+    rows = np.arange(count)
+    for (start, size, weight), per_movie in ((GENRE_BLOCK, 2), (DECADE_BLOCK, 1),
+                                             (RATING_BLOCK, 1), (KEYWORD_BLOCK, 4)):
+        for _ in range(per_movie):
+            vectors[rows, start + rng.integers(0, size, count)] = weight
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede a latência das recomendações (produto matriz-vetor + argpartition) "
+        "com catálogos sintéticos de vários tamanhos, lidos por mmap como em produção."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000],
+                            help="Quantidades de filmes no catálogo.")
+        parser.add_argument('--requests', type=int, default=200, help="Recomendações medidas por tamanho.")
+        parser.add_argument('--favorites', type=int, default=20, help="Favoritos por usuário.")
+        parser.add_argument('--k', type=int, default=20, help="Recomendações por requisição.")
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def handle(self, *args, **options):
+        np = recommendations.np
+        if np is None:
+            raise CommandError("numpy não está instalado.")
+
+        rng = np.random.default_rng(42)
+        report = []
+        for size in options['sizes']:
+            with tempfile.TemporaryDirectory() as base:
+                write_generation(base, np.arange(1, size + 1), synthetic_vectors(size, rng), {})
+                index = RecommendationIndex(recommendations.current_generation(base))
+
+                latencies = []
+                for _ in range(options['requests']):
+                    favorites = rng.integers(1, size + 1, options['favorites'])
+                    start = time.perf_counter()
+                    index.recommend(favorites, options['k'])
+                    latencies.append((time.perf_counter() - start) * 1000)
+                del index
+
+            latencies.sort()
+            report.append({
+                'movies': size,
+                'matrix_mb': round(size * DIMENSIONS * 4 / 2 ** 20, 1),
+                'p50_ms': round(statistics.median(latencies), 2),
+                'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 2),
+                'max_ms': round(latencies[-1], 2),
+            })
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{'filmes':>9}{'matriz MB':>11}{'p50 ms':>9}{'p95 ms':>9}{'máx ms':>9}")
+        for row in report:
+            self.stdout.write(
+                f"{row['movies']:>9}{row['matrix_mb']:>11}{row['p50_ms']:>9}{row['p95_ms']:>9}{row['max_ms']:>9}"
+            )
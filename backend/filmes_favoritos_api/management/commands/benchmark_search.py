@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory
+
+from filmes_favoritos_api import tmdb
+from filmes_favoritos_api.async_views import AsyncMovieSearchView
+from filmes_favoritos_api.benchmarking import summarize
+from filmes_favoritos_api.tmdb_stub import TMDbStub
+from filmes_favoritos_api.views import MovieSearchView
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a vazão da pesquisa síncrona (workers sync do gunicorn) com a "
+        "view assíncrona (um único processo ASGI) usando um TMDb falso local."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=400, help="Pesquisas por modo.")
+        parser.add_argument('--concurrency', type=int, default=200,
+                            help="Pesquisas abertas ao mesmo tempo no modo async.")
+        parser.add_argument('--sync-workers', type=int, default=4,
+                            help="Workers sync simulados (uma requisição por vez cada).")
+        parser.add_argument('--latency', type=float, default=0.1,
+                            help="Latência (s) de cada resposta do TMDb falso.")
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def handle(self, *args, **options):
+        total = options['requests']
+        concurrency = options['concurrency']
+
+        with TMDbStub(latency=options['latency']) as stub:
+            settings.TMDB['BASE_URL'] = stub.url
+            settings.TMDB['ASYNC_POOL_SIZE'] = max(settings.TMDB['ASYNC_POOL_SIZE'], concurrency)
+            # Mede só a vazão: sem limite de chamadas simultâneas nem rate limit
+            settings.TMDB['MAX_CONCURRENCY'] = 0
+            settings.THROTTLING['ENABLED'] = False
+            tmdb.reset_client()
+
+            # Termos distintos: o cache de pesquisa não pode mascarar a latência do TMDb
+            report = {
+                'sync': self.run_sync(total, options['sync_workers']),
+                'async': asyncio.run(self.run_async(total, concurrency)),
+                'tmdb_latency_s': options['latency'],
+            }
+            tmdb.reset_client()
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{'modo':<8}{'conc.':>7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+        for mode, concurrency_label in (('sync', options['sync_workers']), ('async', concurrency)):
+            row = report[mode]
+            self.stdout.write(
+                f"{mode:<8}{concurrency_label:>7}{row['throughput_rps']:>10}"
+                f"{row['p50_ms']:>10}{row['p99_ms']:>10}"
+            )
+
+    def run_sync(self, total, workers):
+        factory = RequestFactory()
+        view = MovieSearchView.as_view()
+
+        def one(i, submitted):
+            response = view(factory.get('/api/search/', {'query': f"sync {i}"}))
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - submitted
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(one, i, time.perf_counter()) for i in range(total)]
+            latencies = [future.result() for future in futures]
+        return summarize(latencies, time.perf_counter() - start)
+
+    async def run_async(self, total, concurrency):
+        factory = AsyncRequestFactory()
+        view = AsyncMovieSearchView.as_view()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            submitted = time.perf_counter()
+            async with semaphore:
+                response = await view(factory.get('/api/search/', {'query': f"async {i}"}))
+            assert response.status_code == 200, response.status_code
+            return time.perf_counter() - submitted
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+        await tmdb.get_async_client().aclose()
+        return summarize(latencies, elapsed)
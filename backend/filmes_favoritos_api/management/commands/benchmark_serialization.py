@@ -0,0 +1,109 @@
+import datetime
+import json
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from filmes_favoritos_api.exports import favorite_row_serializer
+from filmes_favoritos_api.models import FavoriteMovie, Movie
+from filmes_favoritos_api.renderers import OrjsonRenderer, orjson
+from filmes_favoritos_api.serializers import FavoriteMovieSerializer
+
+# Inclui acentos, CJK, U+2028 e caracteres escapados para conferir os bytes
+TITLES = [
+    "Matrix", "Cidade de Deus", "Amélie", "千と千尋の神隠し",
+    "Linha\u2028nova", "Aspas \"e\" \t tab",
+]
+
+
+def fake_rows(count):
+    """Tuplas como as de .values_list() nos campos do FavoriteMovieSerializer."""
+    now = timezone.now()
+    return [
+        (
+            i + 1,
+            100 + i,
+            TITLES[i % len(TITLES)],
+            f"/poster{i}.jpg" if i % 4 else None,
+            Decimal(i % 100).scaleb(-1).quantize(Decimal('0.1')),
+            datetime.date(1950 + i % 70, 1 + i % 12, 1 + i % 28) if i % 5 else None,
+            now - datetime.timedelta(seconds=i, microseconds=i % 1000),
+        )
+        for i in range(count)
+    ]
+
+
+def favorite_from_row(row):
+    """FavoriteMovie (com o Movie) equivalente a uma tupla de fake_rows."""
+    favorite_id, tmdb_id, title, poster_path, rating, release_date, added_at = row
+    movie = Movie(tmdb_id=tmdb_id, title=title, poster_path=poster_path, rating=rating, release_date=release_date)
+    return FavoriteMovie(id=favorite_id, movie=movie, added_at=added_at)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede linhas/s da lista de favoritos: FavoriteMovieSerializer + JSONRenderer "
+        "contra o caminho rápido (tuplas de .values_list() + OrjsonRenderer), "
+        "conferindo que os bytes gerados são idênticos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000],
+                            help="Quantidades de favoritos medidas.")
+        parser.add_argument('--min-time', type=float, default=0.5,
+                            help="Tempo mínimo (s) de medição por tamanho e caminho.")
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def measure(self, render, rows, min_time):
+        """Repete `render` até somar `min_time` segundos; retorna (linhas/s, bytes)."""
+        runs, elapsed, output = 0, 0.0, b''
+        while elapsed < min_time or runs == 0:
+            start = time.perf_counter()
+            output = render()
+            elapsed += time.perf_counter() - start
+            runs += 1
+        return round(runs * len(rows) / elapsed), output
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson não está instalado.")
+
+        report = []
+        with override_settings(FAST_READ_PATH=True):
+            for size in options['sizes']:
+                rows = fake_rows(size)
+                instances = [favorite_from_row(row) for row in rows]
+
+                drf_rps, drf_bytes = self.measure(
+                    lambda: JSONRenderer().render(FavoriteMovieSerializer(instances, many=True).data),
+                    rows, options['min_time'],
+                )
+                fast_rps, fast_bytes = self.measure(
+                    lambda: OrjsonRenderer().render(favorite_row_serializer.serialize(rows)),
+                    rows, options['min_time'],
+                )
+                if drf_bytes != fast_bytes:
+                    raise CommandError(f"Saídas diferentes com {size} favoritos.")
+
+                report.append({
+                    'rows': size,
+                    'serializer_rows_per_s': drf_rps,
+                    'fast_path_rows_per_s': fast_rps,
+                    'speedup': round(fast_rps / drf_rps, 2),
+                    'bytes': len(fast_bytes),
+                })
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{'linhas':>8}{'serializer/s':>15}{'rápido/s':>15}{'ganho':>8}")
+        for row in report:
+            self.stdout.write(
+                f"{row['rows']:>8}{row['serializer_rows_per_s']:>15}"
+                f"{row['fast_path_rows_per_s']:>15}{row['speedup']:>7}x"
+            )
@@ -0,0 +1,156 @@
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from filmes_favoritos_api.benchmarking import summarize
+
+PROFILES = ('sync', 'gthread', 'asgi')
+WARMED_LINE = re.compile(r"Worker \d+ aquecido")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def children(pid):
+    path = Path(f"/proc/{pid}/task/{pid}/children")
+    return [int(child) for child in path.read_text().split()] if path.exists() else []
+
+
+def memory_kb(pid):
+    """{'rss': kB, 'pss': kB} do processo, pelo /proc/<pid>/smaps_rollup (Linux)."""
+    values = {}
+    for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+        name, _, rest = line.partition(':')
+        if name in ('Rss', 'Pss'):
+            values[name.lower()] = int(rest.split()[0])
+    return values
+
+
+def request(url):
+    """(segundos, status) de um GET; status None se o servidor não respondeu."""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            status = response.status
+            response.read()
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return time.perf_counter() - start, status
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe o gunicorn (verzel_filmes_app/gunicorn_config.py) em cada perfil, com e "
+        "sem preload, e mede o tempo até todos os workers estarem aquecidos, a "
+        "primeira resposta e a memória (RSS e PSS) do mestre + workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', choices=PROFILES, default=list(PROFILES))
+        parser.add_argument('--workers', type=int, default=None,
+                            help="WEB_CONCURRENCY (padrão: o do perfil, pelos núcleos).")
+        parser.add_argument('--requests', type=int, default=200,
+                            help="Requisições feitas depois de subir, antes de medir a memória.")
+        parser.add_argument('--path', default='/api/favorites/',
+                            help="Rota usada (sem autenticação responde 401 sem tocar no banco).")
+        parser.add_argument('--startup-timeout', type=float, default=60)
+        parser.add_argument('--json', action='store_true', help="Imprime o resultado em JSON.")
+
+    def run_server(self, profile, preload, options):
+        port = free_port()
+        env = {
+            **os.environ,
+            'GUNICORN_PROFILE': profile,
+            'GUNICORN_PRELOAD': str(preload),
+            'PORT': str(port),
+            # Sem reciclar workers durante a medição
+            'GUNICORN_MAX_REQUESTS': '0',
+        }
+        if options['workers']:
+            env['WEB_CONCURRENCY'] = str(options['workers'])
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'python:verzel_filmes_app.gunicorn_config',
+                   '--bind', f"127.0.0.1:{port}"]
+        url = f"http://127.0.0.1:{port}{options['path']}"
+
+        start = time.perf_counter()
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR, env=env, stderr=subprocess.PIPE, text=True)
+        try:
+            first_response = None
+            while first_response is None:
+                if server.poll() is not None or time.perf_counter() - start > options['startup_timeout']:
+                    raise CommandError(f"O gunicorn ({profile}) não respondeu:\n{server.stderr.read()[-2000:]}")
+                elapsed, status = request(url)
+                if status is not None and status < 500:
+                    first_response = time.perf_counter() - start
+                else:
+                    time.sleep(0.05)
+
+            workers = children(server.pid)
+            warmed = 0
+            while warmed < len(workers):
+                line = server.stderr.readline()
+                if not line:
+                    raise CommandError(f"O gunicorn ({profile}) terminou antes de aquecer os workers.")
+                warmed += bool(WARMED_LINE.search(line))
+            all_ready = time.perf_counter() - start
+
+            latencies = [request(url)[0] for _ in range(options['requests'])]
+            usage = [memory_kb(pid) for pid in [server.pid, *children(server.pid)]]
+        finally:
+            server.terminate()
+            try:
+                server.communicate(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.communicate()
+
+        return {
+            'profile': profile,
+            'preload': preload,
+            'workers': len(workers),
+            'first_response_s': round(first_response, 2),
+            'all_warm_s': round(all_ready, 2),
+            'master_rss_mb': round(usage[0]['rss'] / 1024, 1),
+            'worker_rss_mb': round(sum(row['rss'] for row in usage[1:]) / 1024 / max(1, len(usage) - 1), 1),
+            'total_pss_mb': round(sum(row['pss'] for row in usage) / 1024, 1),
+            'p50_ms': summarize(latencies, 1)['p50_ms'],
+        }
+
+    def handle(self, *args, **options):
+        if not Path('/proc/self/smaps_rollup').exists():
+            raise CommandError("A medição de memória usa o /proc/<pid>/smaps_rollup (Linux).")
+        report = [
+            self.run_server(profile, preload, options)
+            for profile in options['profiles']
+            for preload in (True, False)
+        ]
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(
+            f"{'perfil':<9}{'preload':>8}{'workers':>8}{'1ª resp s':>10}{'aquecidos s':>12}"
+            f"{'mestre MB':>10}{'worker MB':>10}{'PSS total MB':>13}{'p50 ms':>8}"
+        )
+        for row in report:
+            self.stdout.write(
+                f"{row['profile']:<9}{'sim' if row['preload'] else 'não':>8}{row['workers']:>8}"
+                f"{row['first_response_s']:>10}{row['all_warm_s']:>12}{row['master_rss_mb']:>10}"
+                f"{row['worker_rss_mb']:>10}{row['total_pss_mb']:>13}{row['p50_ms']:>8}"
+            )
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from filmes_favoritos_api import recommendations
+
+
+class Command(BaseCommand):
+    help = (
+        "Gera a matriz de vetores das recomendações a partir do catálogo (Movie). "
+        "Por padrão só recalcula os filmes alterados desde a última geração; "
+        "--full refaz tudo (necessário para tirar filmes apagados do catálogo)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Recalcula todos os filmes.")
+        parser.add_argument('--dir', help="Pasta da matriz (padrão: RECOMMENDATIONS_DIR).")
+        parser.add_argument('--chunk-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if recommendations.np is None:
+            raise CommandError("numpy não está instalado.")
+
+        start = time.perf_counter()
+        path, changed, total = recommendations.build_index(
+            options['dir'], full=options['full'], chunk_size=options['chunk_size'],
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{changed} filmes recalculados, {total} na matriz ({path.name}) em {elapsed:.1f}s."
+        ))
@@ -0,0 +1,24 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from filmes_favoritos_api.sync import compact_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga os registros de favoritos removidos mais antigos que --days dias. "
+        "Clientes que sincronizam a partir de uma versão anterior recebem 410 e "
+        "buscam a lista completa. Rode periodicamente (ex.: cron diário)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.FAVORITES_SYNC['TOMBSTONE_DAYS'])
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        before = timezone.now() - timedelta(days=options['days'])
+        deleted = compact_tombstones(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted} remoções anteriores a {before:%Y-%m-%d %H:%M} compactadas."))
@@ -0,0 +1,146 @@
+import gzip
+import json
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from filmes_favoritos_api.models import Movie
+
+# Campos atualizados em cada tipo de arquivo
+ID_EXPORT_FIELDS = ['original_title', 'popularity', 'adult']
+DETAIL_FIELDS = [
+    'title', 'original_title', 'overview', 'poster_path', 'rating',
+    'release_date', 'popularity', 'genre_ids', 'keyword_ids', 'adult',
+]
+
+
+def open_lines(path):
+    """Abre o arquivo (gzip ou texto) para leitura linha a linha."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_rating(value):
+    if value is None:
+        return None
+    return round(float(value), 1)
+
+
+def parse_keyword_ids(record):
+    """IDs de {"keywords": {"keywords": [{"id", "name"}]}} (append_to_response=keywords)."""
+    keywords = record.get('keywords')
+    if isinstance(keywords, dict):
+        keywords = keywords.get('keywords')
+    if not keywords:
+        return None
+    return [keyword['id'] for keyword in keywords if isinstance(keyword, dict) and 'id' in keyword]
+
+
+def movie_from_id_export(record):
+    """Linha do export diário de IDs: {"id", "original_title", "popularity", "adult", ...}"""
+    return Movie(
+        tmdb_id=record['id'],
+        title=record.get('original_title', '')[:255],
+        original_title=record.get('original_title', '')[:255],
+        popularity=record.get('popularity') or 0,
+        adult=record.get('adult', False),
+    )
+
+
+def movie_from_details(record):
+    """Linha de um dump de detalhes (resposta de /movie/{id} do TMDb)."""
+    genre_ids = record.get('genre_ids')
+    if genre_ids is None:
+        genre_ids = [genre['id'] for genre in record.get('genres', [])]
+    return Movie(
+        tmdb_id=record['id'],
+        title=(record.get('title') or record.get('original_title') or '')[:255],
+        original_title=(record.get('original_title') or '')[:255],
+        overview=record.get('overview') or '',
+        poster_path=record.get('poster_path'),
+        rating=parse_rating(record.get('vote_average')),
+        release_date=parse_date(record.get('release_date')),
+        popularity=record.get('popularity') or 0,
+        genre_ids=genre_ids,
+        keyword_ids=parse_keyword_ids(record),
+        adult=record.get('adult', False),
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa para a tabela Movie os exports diários de IDs do TMDb e dumps de "
+        "detalhes (JSON lines, opcionalmente .gz), em lotes e com memória constante."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help="Arquivos .json/.json.gz (uma linha por filme).")
+        parser.add_argument(
+            '--kind', choices=['auto', 'ids', 'details'], default='auto',
+            help="Tipo do arquivo; 'auto' usa 'ids' quando o nome contém 'movie_ids'.",
+        )
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        for path in options['files']:
+            kind = options['kind']
+            if kind == 'auto':
+                kind = 'ids' if 'movie_ids' in path else 'details'
+            self.import_file(path, kind, options['batch_size'])
+
+    def import_file(self, path, kind, batch_size):
+        build = movie_from_id_export if kind == 'ids' else movie_from_details
+        update_fields = ID_EXPORT_FIELDS if kind == 'ids' else DETAIL_FIELDS
+
+        imported = skipped = 0
+        batch = []
+        start = time.perf_counter()
+
+        try:
+            lines = open_lines(path)
+        except OSError as e:
+            raise CommandError(f"Não foi possível abrir {path}: {e}") from e
+
+        with lines:
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    batch.append(build(json.loads(line)))
+                except (ValueError, KeyError, TypeError):
+                    skipped += 1
+                    continue
+
+                if len(batch) >= batch_size:
+                    imported += self.flush(batch, update_fields)
+                    batch = []
+
+            imported += self.flush(batch, update_fields)
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{path}: {imported} filmes importados ({kind}), {skipped} linhas ignoradas "
+            f"em {elapsed:.1f}s ({imported / elapsed if elapsed else 0:.0f} filmes/s)."
+        ))
+
+    def flush(self, batch, update_fields):
+        if not batch:
+            return 0
+        # Um export pode repetir o mesmo ID: o upsert não aceita duplicatas no mesmo lote
+        unique = list({movie.tmdb_id: movie for movie in batch}.values())
+        Movie.objects.bulk_create(
+            unique,
+            update_conflicts=True,
+            unique_fields=['tmdb_id'],
+            update_fields=update_fields + ['updated_at'],
+        )
+        return len(unique)
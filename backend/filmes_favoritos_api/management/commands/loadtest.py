@@ -0,0 +1,126 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from filmes_favoritos_api import share_views, tmdb
+from filmes_favoritos_api.benchmarking import compare_reports
+from filmes_favoritos_api.loadtesting import AppServer, Driver, TmdbIds, build_scenarios, seed
+from filmes_favoritos_api.tmdb_stub import TMDbStub
+
+
+class Command(BaseCommand):
+    help = (
+        "Teste de carga ponta a ponta: sobe a aplicação num banco de teste (SQLite "
+        "ou o Postgres configurado) com um TMDb falso local, semeia usuários e "
+        "favoritos e mede cada rota da API e dos tokens JWT."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help="Usuários semeados.")
+        parser.add_argument('--favorites', type=int, default=100, help="Favoritos por usuário.")
+        parser.add_argument('--requests', type=int, default=200, help="Requisições por endpoint.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Clientes simultâneos.")
+        parser.add_argument('--endpoints', nargs='+', help="Só estes endpoints (padrão: todos).")
+        parser.add_argument('--search-terms', type=int, default=50,
+                            help="Termos distintos na pesquisa (menos termos = mais acertos no cache).")
+        parser.add_argument('--tmdb-latency', type=float, default=0.05,
+                            help="Latência (s) de cada resposta do TMDb falso.")
+        parser.add_argument('--tmdb-jitter', type=float, default=0.0)
+        parser.add_argument('--tmdb-error-rate', type=float, default=0.0,
+                            help="Fração de respostas 500 do TMDb falso.")
+        parser.add_argument('--overload', type=int, metavar='CONCURRENCY',
+                            help="Inclui cenários de sobrecarga (login e pesquisas sem cache) com os "
+                                 "rate limits ligados e esta concorrência; 429 conta como resposta esperada.")
+        parser.add_argument('--output', help="Grava o relatório JSON neste arquivo.")
+        parser.add_argument('--baseline', help="Relatório salvo para comparar; falha se houver regressão.")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Piora aceita em p95/vazão em relação ao baseline (0.2 = 20%%).")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['favorites'] < 1:
+            raise CommandError("--users e --favorites precisam ser pelo menos 1.")
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report = self.run(options, tmpdir)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            Path(options['output']).write_text(output + '\n')
+        self.stdout.write(output)
+
+        if options['baseline']:
+            baseline = json.loads(Path(options['baseline']).read_text())
+            regressions = compare_reports(report, baseline, options['tolerance'])
+            if regressions:
+                raise CommandError("Regressões em relação ao baseline:\n" + '\n'.join(regressions))
+            self.stderr.write("Sem regressões em relação ao baseline.")
+
+    def run(self, options, tmpdir):
+        # Banco de teste descartável: arquivo temporário no SQLite (as threads
+        # do servidor não compartilham um banco em memória) ou test_<nome> no Postgres
+        if connection.vendor == 'sqlite':
+            connection.settings_dict.setdefault('TEST', {})['NAME'] = str(Path(tmpdir) / 'loadtest.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        original_tmdb = dict(settings.TMDB)
+        throttling_enabled = settings.THROTTLING['ENABLED']
+        try:
+            for alias in settings.CACHES:
+                caches[alias].clear()
+
+            users = seed(options['users'], options['favorites'])
+            new_ids = TmdbIds(start=options['users'] * options['favorites'] + 1)
+            search_terms = [f"filme {i}" for i in range(options['search_terms'])]
+            scenarios, user_for = build_scenarios(users, new_ids, search_terms, options['overload'])
+            if options['endpoints']:
+                unknown = set(options['endpoints']) - {scenario.name for scenario in scenarios}
+                if unknown:
+                    raise CommandError(f"Endpoints desconhecidos: {', '.join(sorted(unknown))}")
+                scenarios = [scenario for scenario in scenarios if scenario.name in options['endpoints']]
+
+            stub = TMDbStub(
+                latency=options['tmdb_latency'],
+                jitter=options['tmdb_jitter'],
+                error_rate=options['tmdb_error_rate'],
+            )
+            with stub, AppServer() as server:
+                settings.TMDB['BASE_URL'] = stub.url
+                tmdb.reset_client()
+                driver = Driver(server.url, options['concurrency'])
+                endpoints = {}
+                for scenario in scenarios:
+                    # Os cenários comuns medem o custo das rotas, sem os rate limits
+                    settings.THROTTLING['ENABLED'] = scenario.throttled
+                    endpoints[scenario.name] = driver.run(scenario, options['requests'], user_for)
+                    self.stderr.write(
+                        f"{scenario.name:<18}{endpoints[scenario.name]['throughput_rps']:>10} req/s"
+                        f"{endpoints[scenario.name]['p95_ms']:>10} ms p95"
+                    )
+                tmdb_requests = stub.requests
+            # Acessos aos links ainda em memória: gravados no banco de teste, antes de apagá-lo
+            share_views.flush()
+        finally:
+            settings.TMDB.clear()
+            settings.TMDB.update(original_tmdb)
+            settings.THROTTLING['ENABLED'] = throttling_enabled
+            tmdb.reset_client()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        return {
+            'config': {
+                'database': connection.vendor,
+                'users': options['users'],
+                'favorites_per_user': options['favorites'],
+                'requests_per_endpoint': options['requests'],
+                'concurrency': options['concurrency'],
+                'tmdb_latency_s': options['tmdb_latency'],
+                'tmdb_error_rate': options['tmdb_error_rate'],
+                'overload_concurrency': options['overload'],
+            },
+            'tmdb_requests': tmdb_requests,
+            'endpoints': endpoints,
+        }
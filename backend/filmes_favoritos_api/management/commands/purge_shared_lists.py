@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from filmes_favoritos_api.snapshots import purge_lists, purgeable_lists
+
+
+class Command(BaseCommand):
+    help = (
+        "Apaga os links compartilhados expirados e as listas antigas (anteriores aos "
+        "snapshots) sem nenhum favorito, em lotes curtos para não segurar travas. "
+        "Rode periodicamente (ex.: cron diário)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help="Listas apagadas por transação.")
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help="Pausa (s) entre os lotes, para aliviar o banco.")
+
+    def handle(self, *args, **options):
+        stats = purge_lists(purgeable_lists(), batch_size=options['batch_size'], pause=options['pause'])
+        rows = stats.lists + stats.join_rows + stats.daily_rows
+        rate = rows / stats.seconds if stats.seconds else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats.lists} listas, {stats.join_rows} linhas do M2M e {stats.daily_rows} dias de acessos "
+            f"apagados em {stats.batches} lotes ({stats.seconds:.2f}s, {rate:.0f} linhas/s)."
+        ))
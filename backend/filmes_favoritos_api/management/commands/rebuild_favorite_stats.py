@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from filmes_favoritos_api.stats import rebuild_all, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula o resumo da lista de favoritos (GET /api/favorites/stats/) a "
+        "partir dos favoritos, em lotes de usuários. Rode depois de criar a tabela, "
+        "de gravações que não passam pelo ORM ou para corrigir divergências."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, nargs='+', help="Só estes usuários (IDs).")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['users']:
+            users = get_user_model().objects.filter(pk__in=options['users']).values_list('pk', flat=True)
+            with transaction.atomic():
+                rebuilt = rebuild_stats(users)
+        else:
+            rebuilt = rebuild_all(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"{rebuilt} resumos de favoritos recalculados."))
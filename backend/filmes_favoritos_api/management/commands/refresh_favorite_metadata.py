@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from filmes_favoritos_api import tmdb
+from filmes_favoritos_api.refresh import Checkpoint, MetadataRefresher
+from filmes_favoritos_api.views import TMDB_LANGUAGE
+
+
+class Command(BaseCommand):
+    help = (
+        "Atualiza título, poster, nota e data de lançamento dos favoritos a partir "
+        "do TMDb: cada filme é buscado uma vez, em paralelo e sob rate limit, e as "
+        "mudanças são gravadas em lote. Com --checkpoint, uma execução interrompida "
+        "continua de onde parou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Chamadas simultâneas ao TMDb.")
+        parser.add_argument('--rate', type=float, default=40,
+                            help="Máximo de chamadas por segundo ao TMDb (0 = sem limite).")
+        parser.add_argument('--batch-size', type=int, default=200, help="Filmes por lote gravado.")
+        parser.add_argument('--checkpoint', help="Arquivo JSON de progresso (criado ou retomado).")
+        parser.add_argument('--restart', action='store_true', help="Ignora o progresso salvo no checkpoint.")
+        parser.add_argument('--language', default=TMDB_LANGUAGE)
+
+    def handle(self, *args, **options):
+        limit = settings.TMDB['MAX_CONCURRENCY']
+        if options['workers'] < 1 or (limit and options['workers'] > limit):
+            raise CommandError(f"--workers deve estar entre 1 e TMDB_MAX_CONCURRENCY ({limit}).")
+
+        checkpoint = Checkpoint()
+        if options['checkpoint']:
+            checkpoint = Checkpoint.load(options['checkpoint'])
+            if options['restart']:
+                checkpoint = Checkpoint(checkpoint.path)
+            elif checkpoint.last_tmdb_id or checkpoint.failed:
+                self.stdout.write(
+                    f"Retomando depois do tmdb_id {checkpoint.last_tmdb_id} "
+                    f"({len(checkpoint.failed)} falhas para tentar de novo)."
+                )
+
+        refresher = MetadataRefresher(
+            workers=options['workers'],
+            rate=options['rate'],
+            batch_size=options['batch_size'],
+            language=options['language'],
+        )
+
+        def progress(stats, checkpoint):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  até o tmdb_id {checkpoint.last_tmdb_id}: {stats.movies} filmes")
+
+        try:
+            stats = refresher.run(checkpoint, progress)
+        except tmdb.TMDbError as e:
+            raise CommandError(f"Erro do TMDb; o progresso até o último lote foi salvo: {e}") from e
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats.movies} filmes consultados, {stats.updated_rows} favoritos atualizados, "
+            f"{stats.missing} não existem mais no TMDb, {stats.failed} falharam."
+        ))
@@ -0,0 +1,313 @@
+"""
+Métricas por requisição (latência, consultas SQL, chamadas ao TMDb, tamanho
+da resposta) no formato de texto do Prometheus.
+
+Cada processo acumula os valores em memória. Com settings.METRICS['DIR'],
+cada worker grava um snapshot `<pid>.json` nesse diretório (no máximo a cada
+FLUSH_INTERVAL segundos) e o /metrics soma os arquivos de todos os workers.
+"""
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+
+# Limites (segundos / bytes) dos buckets dos histogramas
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+# name -> (tipo, help, labels, buckets)
+METRICS = {
+    'http_requests_total': (
+        'counter', "Requisições atendidas.", ('route', 'method', 'status'), None),
+    'http_request_duration_seconds': (
+        'histogram', "Latência das requisições.", ('route', 'method'), LATENCY_BUCKETS),
+    'http_response_size_bytes': (
+        'histogram', "Tamanho do corpo das respostas.", ('route', 'method'), SIZE_BUCKETS),
+    'db_queries_total': (
+        'counter', "Consultas SQL feitas pelas requisições.", ('route', ), None),
+    'db_query_duration_seconds_total': (
+        'counter', "Tempo gasto em consultas SQL.", ('route', ), None),
+    'tmdb_requests_total': (
+        'counter', "Chamadas ao TMDb feitas pelas requisições.", ('route', ), None),
+    'tmdb_request_duration_seconds_total': (
+        'counter', "Tempo gasto esperando o TMDb.", ('route', ), None),
+    'search_cache_events_total': (
+        'counter', "Hits, misses e chamadas agrupadas do cache de pesquisa.", ('event', ), None),
+    'db_pool_connections': (
+        'gauge', "Conexões dos pools do banco (DB_POOL) e requisições esperando uma.",
+        ('database', 'state'), None),
+    'db_pool_requests_total': (
+        'counter', "Conexões pedidas aos pools do banco.", ('database', ), None),
+    'db_pool_wait_seconds_total': (
+        'counter', "Tempo esperando uma conexão livre no pool.", ('database', ), None),
+    'db_pool_errors_total': (
+        'counter', "Timeouts do pool, falhas ao conectar e conexões perdidas ou devolvidas quebradas.",
+        ('database', 'kind'), None),
+}
+
+# Estatísticas do psycopg_pool (get_stats) -> (métrica, label extra, escala)
+POOL_STATS = {
+    'pool_size': ('db_pool_connections', 'open', 1),
+    'pool_available': ('db_pool_connections', 'idle', 1),
+    'pool_max': ('db_pool_connections', 'max', 1),
+    'requests_waiting': ('db_pool_connections', 'waiting', 1),
+    'requests_num': ('db_pool_requests_total', None, 1),
+    'requests_wait_ms': ('db_pool_wait_seconds_total', None, 0.001),
+    'requests_errors': ('db_pool_errors_total', 'timeout', 1),
+    'connections_errors': ('db_pool_errors_total', 'connect', 1),
+    'connections_lost': ('db_pool_errors_total', 'lost', 1),
+    'returns_bad': ('db_pool_errors_total', 'bad_return', 1),
+}
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class RequestMetrics:
+    """Tempos acumulados durante uma requisição (por ContextVar, vale no sync e no async)."""
+
+    __slots__ = ('db_count', 'db_time', 'tmdb_count', 'tmdb_time')
+
+    def __init__(self):
+        self.db_count = 0
+        self.db_time = 0.0
+        self.tmdb_count = 0
+        self.tmdb_time = 0.0
+
+
+current = ContextVar('request_metrics', default=None)
+
+
+def db_execute_wrapper(execute, sql, params, many, context):
+    """execute_wrapper instalado nas conexões: mede as consultas da requisição atual."""
+    request_metrics = current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        request_metrics.db_time += time.perf_counter() - start
+        request_metrics.db_count += 1
+
+
+def install_db_wrapper(connection, **kwargs):
+    """Receptor de connection_created e chamado pelo middleware (idempotente)."""
+    if db_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(db_execute_wrapper)
+
+
+def record_tmdb(elapsed):
+    """Chamado pelo cliente do TMDb ao fim de cada chamada."""
+    request_metrics = current.get()
+    if request_metrics is not None:
+        request_metrics.tmdb_count += 1
+        request_metrics.tmdb_time += elapsed
+
+
+class Registry:
+    """Contadores e histogramas do processo, rotulados por tupla de labels."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {name: {} for name in METRICS}
+        self.pid = os.getpid()
+        self.last_flush = 0.0
+
+    def inc(self, name, labels, amount=1):
+        series = self.values[name]
+        series[labels] = series.get(labels, 0) + amount
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][3]
+        series = self.values[name]
+        row = series.get(labels)
+        if row is None:
+            # contagem por bucket (não cumulativa) + +Inf, soma
+            row = series[labels] = [0] * (len(buckets) + 1) + [0.0]
+        row[bisect_left(buckets, value)] += 1
+        row[-1] += value
+
+    def record(self, route, method, status, duration, size, request_metrics):
+        with self.lock:
+            self.inc('http_requests_total', (route, method, str(status)))
+            self.observe('http_request_duration_seconds', (route, method), duration)
+            if size is not None:
+                self.observe('http_response_size_bytes', (route, method), size)
+            if request_metrics.db_count:
+                self.inc('db_queries_total', (route, ), request_metrics.db_count)
+                self.inc('db_query_duration_seconds_total', (route, ), request_metrics.db_time)
+            if request_metrics.tmdb_count:
+                self.inc('tmdb_requests_total', (route, ), request_metrics.tmdb_count)
+                self.inc('tmdb_request_duration_seconds_total', (route, ), request_metrics.tmdb_time)
+
+    def snapshot(self):
+        """Cópia serializável em JSON: {nome: [[labels, valor], ...]}."""
+        from .search_cache import search_cache
+
+        with self.lock:
+            data = {
+                name: [[list(labels), value] for labels, value in series.items()]
+                for name, series in self.values.items()
+            }
+        data['search_cache_events_total'] = [
+            [[event], count] for event, count in search_cache.stats().items()
+        ]
+        for name, rows in pool_stats().items():
+            data[name] = rows
+        return data
+
+    def reset(self):
+        with self.lock:
+            self.values = {name: {} for name in METRICS}
+
+    # --- Vários workers ---
+
+    def flush(self, force=False):
+        """Grava o snapshot do processo em METRICS['DIR']/<pid>.json (escrita atômica)."""
+        directory = settings.METRICS['DIR']
+        now = time.monotonic()
+        if not directory or (not force and now - self.last_flush < settings.METRICS['FLUSH_INTERVAL']):
+            return
+        pid = os.getpid()
+        if pid != self.pid:
+            # Processo filho de um fork: não herda os números do pai
+            self.pid = pid
+            self.reset()
+        self.last_flush = now
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        tmp = path / f".{pid}.json.tmp"
+        tmp.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp, path / f"{pid}.json")
+
+
+registry = Registry()
+
+
+def mark_process_dead(pid, directory=None):
+    """
+    Soma o snapshot de um worker encerrado em `archive.json` e remove o
+    arquivo dele, para os contadores não voltarem para trás nem os arquivos
+    se acumularem (usado no child_exit do gunicorn).
+    """
+    directory = Path(directory or settings.METRICS['DIR'])
+    dead = directory / f"{pid}.json"
+    if not dead.exists():
+        return
+    archive = directory / 'archive.json'
+    snapshots = [load(path) for path in (archive, dead) if path.exists()]
+    merged = merge(snapshots, as_json=True)
+    # Gauges (ex.: conexões abertas no pool) morrem com o processo
+    for name, (kind, *_) in METRICS.items():
+        if kind == 'gauge':
+            del merged[name]
+    tmp = directory / '.archive.json.tmp'
+    tmp.write_text(json.dumps(merged))
+    os.replace(tmp, archive)
+    dead.unlink()
+
+
+def load(path):
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        # Arquivo sumiu (worker arquivado) ou está sendo trocado: ignora
+        return {}
+
+
+def pool_stats():
+    """
+    Estatísticas dos pools de conexão do processo (bancos com DB_POOL), no
+    formato do snapshot. Os pools são por processo: o /metrics soma os workers.
+    """
+    from django.db import connections
+
+    data = {}
+    for alias in connections:
+        if 'pool' not in connections.settings[alias].get('OPTIONS', {}):
+            continue
+        pool = connections[alias].pool
+        if pool.closed:
+            # Ainda não aberto neste processo (o Django abre na primeira conexão)
+            continue
+        stats = pool.get_stats()
+        for key, (name, kind, scale) in POOL_STATS.items():
+            labels = [alias] if kind is None else [alias, kind]
+            data.setdefault(name, []).append([labels, stats.get(key, 0) * scale])
+    return data
+
+
+def merge(snapshots, as_json=False):
+    """Soma snapshots de vários processos: {nome: {labels: valor}}."""
+    merged = {name: {} for name in METRICS}
+    for snapshot in snapshots:
+        for name, rows in snapshot.items():
+            if name not in merged:
+                continue
+            series = merged[name]
+            for labels, value in rows:
+                labels = tuple(labels)
+                if isinstance(value, list):
+                    current_value = series.get(labels)
+                    series[labels] = value if current_value is None else [a + b for a, b in zip(current_value, value)]
+                else:
+                    series[labels] = series.get(labels, 0) + value
+    if as_json:
+        return {name: [[list(labels), value] for labels, value in series.items()] for name, series in merged.items()}
+    return merged
+
+
+def collect():
+    """Métricas de todos os workers (ou só do processo atual, sem METRICS['DIR'])."""
+    directory = settings.METRICS['DIR']
+    if not directory:
+        return merge([registry.snapshot()])
+    registry.flush(force=True)
+    return merge(load(path) for path in Path(directory).glob('*.json'))
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render(merged):
+    """Formato de texto do Prometheus (version 0.0.4)."""
+    lines = []
+    for name, (kind, help_text, label_names, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in sorted(merged[name].items()):
+            if kind != 'histogram':
+                lines.append(f"{name}{format_labels(label_names, labels)} {value}")
+                continue
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), value[:-1]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{format_labels(label_names, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(label_names, labels)} {value[-1]}")
+            lines.append(f"{name}_count{format_labels(label_names, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def server_timing(duration, request_metrics):
+    """Valor do cabeçalho Server-Timing (durações em ms)."""
+    parts = [f"app;dur={duration * 1000:.2f}"]
+    if request_metrics.db_count:
+        parts.append(f'db;dur={request_metrics.db_time * 1000:.2f};desc="{request_metrics.db_count} queries"')
+    if request_metrics.tmdb_count:
+        parts.append(f'tmdb;dur={request_metrics.tmdb_time * 1000:.2f};desc="{request_metrics.tmdb_count} calls"')
+    return ', '.join(parts)
@@ -0,0 +1,172 @@
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import compression, metrics
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware que também funciona de forma nativa no ASGI.
+
+    O middleware original é apenas síncrono; no ASGI isso obriga o Django a
+    passar todas as requisições por uma única thread, o que anula as views async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class MetricsMiddleware:
+    """
+    Mede cada requisição (latência, consultas SQL, chamadas ao TMDb e tamanho
+    da resposta) para o /metrics e envia o resumo no cabeçalho Server-Timing.
+
+    Deve ser o primeiro do MIDDLEWARE, para que a latência inclua os demais.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.server_timing = settings.METRICS['SERVER_TIMING']
+        connection_created.connect(metrics.install_db_wrapper)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics.install_db_wrapper(connection)
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        token = metrics.current.set(request_metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, time.perf_counter() - start, request_metrics)
+
+    def finish(self, request, response, duration, request_metrics):
+        match = request.resolver_match
+        route = match.route if match is not None else '<unmatched>'
+        # Respostas em streaming não têm tamanho conhecido ao sair do middleware
+        size = None if response.streaming else len(response.content)
+        metrics.registry.record(route, request.method, response.status_code, duration, size, request_metrics)
+        metrics.registry.flush()
+
+        if self.server_timing:
+            response['Server-Timing'] = metrics.server_timing(duration, request_metrics)
+        return response
+
+
+re_no_transform = re.compile(r'\bno-transform\b')
+
+
+class CompressionMiddleware:
+    """
+    Comprime as respostas com brotli ou gzip (settings.COMPRESSION), a partir
+    de MIN_SIZE bytes. Respostas já codificadas (ex.: o gzip pronto dos links
+    compartilhados), com Cache-Control: no-transform ou de tipos que já vêm
+    comprimidos passam direto. Respostas em streaming (exportação) são
+    comprimidas pedaço a pedaço.
+
+    Fica logo abaixo do MetricsMiddleware, que assim mede o tamanho comprimido.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.options = settings.COMPRESSION
+        if not self.options['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        if (
+            response.has_header('Content-Encoding')
+            or re_no_transform.search(response.get('Cache-Control', ''))
+            or not compression.is_compressible(response.get('Content-Type', ''))
+        ):
+            return response
+        if response.streaming:
+            # Conteúdo async (views async em streaming) fica como está
+            if response.is_async:
+                return response
+        elif len(response.content) < self.options['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        encoding = compression.choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                response.streaming_content, encoding, self.options)
+            del response['Content-Length']
+        else:
+            compressed = compression.compress(response.content, encoding, self.options)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        # Como no GZipMiddleware do Django: o ETag forte passa a fraco, pois os
+        # bytes mudaram (If-None-Match usa comparação fraca e continua valendo)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,121 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:40
+
+from django.db import migrations, models
+
+# Índices de busca textual do catálogo: FTS5 no SQLite, full-text + trigram no Postgres
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE filmes_favoritos_api_movie_fts USING fts5(
+        title, original_title,
+        content='filmes_favoritos_api_movie', content_rowid='tmdb_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER filmes_favoritos_api_movie_fts_ai AFTER INSERT ON filmes_favoritos_api_movie
+    BEGIN
+        INSERT INTO filmes_favoritos_api_movie_fts(rowid, title, original_title)
+        VALUES (new.tmdb_id, new.title, new.original_title);
+    END
+    """,
+    """
+    CREATE TRIGGER filmes_favoritos_api_movie_fts_ad AFTER DELETE ON filmes_favoritos_api_movie
+    BEGIN
+        INSERT INTO filmes_favoritos_api_movie_fts(filmes_favoritos_api_movie_fts, rowid, title, original_title)
+        VALUES ('delete', old.tmdb_id, old.title, old.original_title);
+    END
+    """,
+    """
+    CREATE TRIGGER filmes_favoritos_api_movie_fts_au AFTER UPDATE OF title, original_title
+    ON filmes_favoritos_api_movie
+    BEGIN
+        INSERT INTO filmes_favoritos_api_movie_fts(filmes_favoritos_api_movie_fts, rowid, title, original_title)
+        VALUES ('delete', old.tmdb_id, old.title, old.original_title);
+        INSERT INTO filmes_favoritos_api_movie_fts(rowid, title, original_title)
+        VALUES (new.tmdb_id, new.title, new.original_title);
+    END
+    """,
+]
+
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS filmes_favoritos_api_movie_fts_au",
+    "DROP TRIGGER IF EXISTS filmes_favoritos_api_movie_fts_ad",
+    "DROP TRIGGER IF EXISTS filmes_favoritos_api_movie_fts_ai",
+    "DROP TABLE IF EXISTS filmes_favoritos_api_movie_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX filmes_favoritos_api_movie_tsv_idx ON filmes_favoritos_api_movie
+    USING gin (to_tsvector('simple', title || ' ' || original_title))
+    """,
+    """
+    CREATE INDEX filmes_favoritos_api_movie_title_trgm_idx ON filmes_favoritos_api_movie
+    USING gin (title gin_trgm_ops)
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS filmes_favoritos_api_movie_title_trgm_idx",
+    "DROP INDEX IF EXISTS filmes_favoritos_api_movie_tsv_idx",
+]
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _run(schema_editor, SQLITE_FORWARD)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        _run(schema_editor, SQLITE_BACKWARD)
+    elif vendor == "postgresql":
+        _run(schema_editor, POSTGRES_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0002_favoritemovie_user_shareablelist_user_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Movie",
+            fields=[
+                ("tmdb_id", models.IntegerField(primary_key=True, serialize=False)),
+                ("title", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "original_title",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("overview", models.TextField(blank=True, default="")),
+                (
+                    "poster_path",
+                    models.CharField(blank=True, max_length=255, null=True),
+                ),
+                (
+                    "rating",
+                    models.DecimalField(
+                        blank=True, decimal_places=1, max_digits=3, null=True
+                    ),
+                ),
+                ("release_date", models.DateField(blank=True, null=True)),
+                ("popularity", models.FloatField(default=0)),
+                ("genre_ids", models.JSONField(blank=True, default=list)),
+                ("adult", models.BooleanField(default=False)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
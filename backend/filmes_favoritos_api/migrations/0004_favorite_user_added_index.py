@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0003_movie_catalog"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="favoritemovie",
+            index=models.Index(
+                fields=["user", "-added_at", "-id"], name="favorite_user_added_idx"
+            ),
+        ),
+    ]
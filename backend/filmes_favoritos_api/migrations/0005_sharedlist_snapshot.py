@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-18 11:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0004_favorite_user_added_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shareablelist",
+            name="content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="shareablelist",
+            name="payload",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="shareablelist",
+            name="payload_gzip",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="shareablelist",
+            index=models.Index(
+                fields=["user", "content_hash"], name="sharedlist_user_hash_idx"
+            ),
+        ),
+    ]
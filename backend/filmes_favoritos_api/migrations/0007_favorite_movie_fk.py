@@ -0,0 +1,159 @@
+# Generated by Django 5.2.7 on 2026-10-18 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+# Favoritos copiados por lote
+BATCH_SIZE = 1000
+
+# Campos do filme que saem do FavoriteMovie e passam a ser lidos do Movie
+MOVIE_FIELDS = ("title", "poster_path", "rating", "release_date")
+
+
+def is_blank(value):
+    return value is None or value == ""
+
+
+def copy_movies(apps, schema_editor):
+    """
+    Cria um Movie por tmdb_id a partir dos favoritos (os dados do favorito
+    mais recente de cada filme) e liga cada favorito ao seu filme, em lotes
+    por id. Filmes que já estão no catálogo só têm os campos vazios preenchidos.
+    """
+    FavoriteMovie = apps.get_model("filmes_favoritos_api", "FavoriteMovie")
+    Movie = apps.get_model("filmes_favoritos_api", "Movie")
+
+    last_id = 0
+    while True:
+        batch = list(
+            FavoriteMovie.objects.filter(id__gt=last_id)
+            .order_by("id").only("id", "tmdb_id", "added_at", *MOVIE_FIELDS)[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+
+        latest = {}
+        for favorite in sorted(batch, key=lambda favorite: favorite.added_at):
+            latest[favorite.tmdb_id] = favorite
+
+        existing = Movie.objects.in_bulk(list(latest))
+        Movie.objects.bulk_create(
+            [
+                Movie(tmdb_id=tmdb_id, **{name: getattr(favorite, name) for name in MOVIE_FIELDS})
+                for tmdb_id, favorite in latest.items()
+                if tmdb_id not in existing
+            ],
+            ignore_conflicts=True,
+        )
+        incomplete = []
+        for tmdb_id, movie in existing.items():
+            blanks = [
+                name for name in MOVIE_FIELDS
+                if is_blank(getattr(movie, name)) and not is_blank(getattr(latest[tmdb_id], name))
+            ]
+            for name in blanks:
+                setattr(movie, name, getattr(latest[tmdb_id], name))
+            if blanks:
+                incomplete.append(movie)
+        Movie.objects.bulk_update(incomplete, MOVIE_FIELDS)
+
+        FavoriteMovie.objects.filter(id__gt=last_id, id__lte=batch[-1].id).update(movie_id=F("tmdb_id"))
+        last_id = batch[-1].id
+
+
+def restore_movies(apps, schema_editor):
+    """Volta os dados do filme para cada favorito (reversão da migração)."""
+    FavoriteMovie = apps.get_model("filmes_favoritos_api", "FavoriteMovie")
+
+    last_id = 0
+    while True:
+        batch = list(
+            FavoriteMovie.objects.filter(id__gt=last_id).select_related("movie").order_by("id")[:BATCH_SIZE]
+        )
+        if not batch:
+            return
+        for favorite in batch:
+            favorite.tmdb_id = favorite.movie_id
+            favorite.title = favorite.movie.title
+            favorite.poster_path = favorite.movie.poster_path
+            favorite.rating = favorite.movie.rating if favorite.movie.rating is not None else 0
+            favorite.release_date = favorite.movie.release_date
+        FavoriteMovie.objects.bulk_update(batch, ["tmdb_id", *MOVIE_FIELDS])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0006_favorites_sync"),
+    ]
+
+    operations = [
+        # 1. Campos antigos passam a aceitar nulo (a reversão os recria vazios)
+        migrations.AlterUniqueTogether(
+            name="favoritemovie",
+            unique_together=set(),
+        ),
+        migrations.AlterField(
+            model_name="favoritemovie",
+            name="tmdb_id",
+            field=models.IntegerField(null=True),
+        ),
+        migrations.AlterField(
+            model_name="favoritemovie",
+            name="title",
+            field=models.CharField(max_length=255, null=True),
+        ),
+        migrations.AlterField(
+            model_name="favoritemovie",
+            name="rating",
+            field=models.DecimalField(decimal_places=1, max_digits=3, null=True),
+        ),
+        migrations.AddField(
+            model_name="favoritemovie",
+            name="movie",
+            field=models.ForeignKey(
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="favorites",
+                to="filmes_favoritos_api.movie",
+            ),
+        ),
+        # 2. Um Movie por filme; os favoritos apontam para ele
+        migrations.RunPython(copy_movies, restore_movies),
+        # 3. Os dados do filme saem do favorito
+        migrations.RemoveField(
+            model_name="favoritemovie",
+            name="tmdb_id",
+        ),
+        migrations.RemoveField(
+            model_name="favoritemovie",
+            name="title",
+        ),
+        migrations.RemoveField(
+            model_name="favoritemovie",
+            name="poster_path",
+        ),
+        migrations.RemoveField(
+            model_name="favoritemovie",
+            name="rating",
+        ),
+        migrations.RemoveField(
+            model_name="favoritemovie",
+            name="release_date",
+        ),
+        migrations.AlterField(
+            model_name="favoritemovie",
+            name="movie",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="favorites",
+                to="filmes_favoritos_api.movie",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="favoritemovie",
+            unique_together={("movie", "user")},
+        ),
+    ]
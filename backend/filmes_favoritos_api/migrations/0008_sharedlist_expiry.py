@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0007_favorite_movie_fk"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shareablelist",
+            name="expires_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="shareablelist",
+            index=models.Index(fields=["expires_at"], name="sharedlist_expires_idx"),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0008_sharedlist_expiry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="movie",
+            name="keyword_ids",
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
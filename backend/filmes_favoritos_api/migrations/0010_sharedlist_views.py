@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("filmes_favoritos_api", "0009_movie_keyword_ids"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="shareablelist",
+            name="last_viewed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="shareablelist",
+            name="view_count",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="SharedListDailyViews",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("views", models.PositiveIntegerField(default=0)),
+                ("visitors_sketch", models.BinaryField(default=bytes)),
+                ("unique_visitors", models.PositiveIntegerField(default=0)),
+                (
+                    "shared_list",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_views",
+                        to="filmes_favoritos_api.shareablelist",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("shared_list", "day")},
+            },
+        ),
+    ]
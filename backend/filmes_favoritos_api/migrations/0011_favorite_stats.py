@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-18 12:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("filmes_favoritos_api", "0010_sharedlist_views"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FavoriteStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="favorite_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                ("rated_count", models.PositiveIntegerField(default=0)),
+                (
+                    "rating_sum",
+                    models.DecimalField(decimal_places=1, default=0, max_digits=12),
+                ),
+                ("decades", models.JSONField(blank=True, default=dict)),
+                ("recent", models.JSONField(blank=True, default=list)),
+            ],
+        ),
+    ]
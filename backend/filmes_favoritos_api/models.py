@@ -2,36 +2,152 @@ from django.db import models
 from django.contrib.auth.models import User
 import uuid
 
-# Armazena os dados essenciais de um filme favorito.
-class FavoriteMovie(models.Model):
-    """Representa um filme que foi salvo como favorito."""
+# Filmes conhecidos pela API: os favoritados e o catálogo local (exports do TMDb).
+class Movie(models.Model):
+    """
+    Dados de um filme, compartilhados pelos favoritos de todos os usuários e
+    usados pela pesquisa no catálogo local sem depender do TMDb.
+    """
 
-    # Chave que liga ao usuário que favoritou
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
-    
-    # ID do filme na API do TMDb.
-    tmdb_id = models.IntegerField(unique=True) 
-    
-    # Título do filme
-    title = models.CharField(max_length=255)
-    
-    # Campo para salvar a URL parcial da imagem do poster
+    # ID do filme na API do TMDb (também é o rowid do índice FTS5 no SQLite)
+    tmdb_id = models.IntegerField(primary_key=True)
+
+    # Título traduzido e título original
+    title = models.CharField(max_length=255, blank=True, default='')
+    original_title = models.CharField(max_length=255, blank=True, default='')
+
+    # Sinopse
+    overview = models.TextField(blank=True, default='')
+
+    # URL parcial da imagem do poster
     poster_path = models.CharField(max_length=255, blank=True, null=True)
-    
-    # Nota do TMDb
-    rating = models.DecimalField(max_digits=3, decimal_places=1)
-    
+
+    # Nota do TMDb (os exports de IDs não trazem nota)
+    rating = models.DecimalField(max_digits=3, decimal_places=1, null=True, blank=True)
+
     # Data de Lançamento
     release_date = models.DateField(null=True, blank=True)
+
+    # Popularidade do TMDb, usada para desempatar os resultados
+    popularity = models.FloatField(default=0)
+
+    # IDs dos gêneros do TMDb
+    genre_ids = models.JSONField(default=list, blank=True)
+
+    # IDs das palavras-chave do TMDb (dumps com append_to_response=keywords),
+    # usadas pelas recomendações. Nulo sem default: no SQLite a coluna é
+    # adicionada sem recriar a tabela (e os gatilhos do índice FTS5)
+    keyword_ids = models.JSONField(null=True, blank=True)
+
+    adult = models.BooleanField(default=False)
+
+    # Última vez que a linha foi atualizada pela importação
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.title or self.original_title
+
+
+# Liga um usuário a um filme favorito.
+class FavoriteMovie(models.Model):
+    """
+    Representa um filme que foi salvo como favorito. Os dados do filme (título,
+    poster, nota, lançamento) ficam no Movie, uma linha por filme para todos
+    os usuários que o favoritaram.
+    """
+
+    # Chave que liga ao usuário que favoritou
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorites')
+
+    # Filme favoritado (a chave é o ID do filme na API do TMDb)
+    movie = models.ForeignKey(Movie, on_delete=models.PROTECT, related_name='favorites')
     
     # Data em que o filme foi salvo
     added_at = models.DateTimeField(auto_now_add=True)
+
+    # Versão da lista (FavoriteListState.version) em que o filme foi gravado pela última vez
+    version = models.PositiveBigIntegerField(default=0)
     
     class Meta:
-        unique_together = ('tmdb_id', 'user')
+        unique_together = ('movie', 'user')
+        indexes = [
+            # Lista de favoritos do usuário em ordem (added_at, id) decrescente
+            models.Index(fields=['user', '-added_at', '-id'], name='favorite_user_added_idx'),
+            # Sincronização incremental (?since=)
+            models.Index(fields=['user', 'version'], name='favorite_user_version_idx'),
+        ]
 
     def __str__(self):
-        return self.title
+        return f"{self.movie_id} favoritado por {self.user_id}"
+
+
+# Estado da lista de favoritos de cada usuário.
+class FavoriteListState(models.Model):
+    """
+    Contador de versão da lista de favoritos do usuário: toda inclusão,
+    alteração ou remoção aumenta `version` (ver filmes_favoritos_api/sync.py).
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='favorite_list_state')
+
+    # Versão atual da lista (0 = nenhuma gravação desde a criação da tabela)
+    version = models.PositiveBigIntegerField(default=0)
+
+    # Maior versão das remoções já compactadas: sincronizações a partir de
+    # uma versão anterior não podem mais ser respondidas com o delta
+    compacted_version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Favoritos de {self.user_id} (v{self.version})"
+
+
+# Resumo da lista de favoritos de cada usuário.
+class FavoriteStats(models.Model):
+    """
+    Estatísticas da lista de favoritos do usuário, mantidas a cada inclusão e
+    remoção (ver filmes_favoritos_api/stats.py) para serem lidas pela chave
+    primária. O rebuild_favorite_stats as recalcula a partir dos favoritos.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='favorite_stats')
+
+    # Favoritos na lista
+    count = models.PositiveIntegerField(default=0)
+
+    # Favoritos com nota e a soma das notas (média = rating_sum / rated_count)
+    rated_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.DecimalField(max_digits=12, decimal_places=1, default=0)
+
+    # Favoritos por década de lançamento: {"1990": 3, ...} (sem data ficam de fora)
+    decades = models.JSONField(default=dict, blank=True)
+
+    # Últimos favoritos adicionados (tmdb_id, title, poster_path, added_at), do mais recente
+    recent = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"Resumo dos favoritos de {self.user_id} ({self.count})"
+
+
+# Registro de um favorito removido, para a sincronização incremental.
+class FavoriteTombstone(models.Model):
+    """Remoção de um favorito, guardada até a compactação (compact_favorite_tombstones)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='favorite_tombstones')
+
+    # ID do filme removido na API do TMDb
+    tmdb_id = models.IntegerField()
+
+    # Versão da lista gerada pela remoção
+    version = models.PositiveBigIntegerField()
+
+    # Data da remoção (usada pela compactação)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'version'], name='tombstone_user_version_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.tmdb_id} removido de {self.user_id} (v{self.version})"
 
 
 # Representa a URL única de compartilhamento.
@@ -50,6 +166,7 @@ class ShareableList(models.Model):
     )
     
     # Uma lista pode ter muitos filmes, e um filme pode estar em várias listas 
+    # (só as listas antigas usam o M2M; as novas guardam o snapshot abaixo)
     favorites = models.ManyToManyField(
         FavoriteMovie, 
         related_name='shared_lists'
@@ -57,6 +174,48 @@ class ShareableList(models.Model):
     
     # Data de criação da lista
     created_at = models.DateTimeField(auto_now_add=True)
+
+    # sha256 dos favoritos renderizados: o mesmo conteúdo reaproveita o link
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+
+    # Resposta JSON pronta do link (e a versão gzip, quando compensa)
+    payload = models.TextField(blank=True, default='')
+    payload_gzip = models.BinaryField(null=True, blank=True)
+
+    # Fim da validade do link (None = não expira); apagado pelo purge_shared_lists
+    expires_at = models.DateTimeField(null=True, blank=True)
+
+    # Acessos ao link, somados em lote pelos workers (ver share_views.py)
+    view_count = models.PositiveBigIntegerField(default=0)
+    last_viewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Busca de um snapshot com o mesmo conteúdo ao gerar um link
+            models.Index(fields=['user', 'content_hash'], name='sharedlist_user_hash_idx'),
+            # Listas expiradas, para a limpeza em lotes
+            models.Index(fields=['expires_at'], name='sharedlist_expires_idx'),
+        ]
     
     def __str__(self):
         return f"Lista Compartilhada {self.share_hash}"
+
+
+class SharedListDailyViews(models.Model):
+    """
+    Acessos de um link compartilhado em um dia (UTC). Os visitantes únicos são
+    estimados por um HyperLogLog: `visitors_sketch` guarda os registradores
+    (um byte cada), que podem ser combinados entre workers e entre dias.
+    """
+    shared_list = models.ForeignKey(ShareableList, on_delete=models.CASCADE, related_name='daily_views')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    visitors_sketch = models.BinaryField(default=bytes)
+    # Estimativa do sketch, gravada junto para não recalcular na leitura
+    unique_visitors = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('shared_list', 'day')
+
+    def __str__(self):
+        return f"{self.shared_list_id} em {self.day}: {self.views} acessos"
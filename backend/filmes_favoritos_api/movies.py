@@ -0,0 +1,111 @@
+"""
+Linhas compartilhadas de Movie para os filmes favoritados: cada filme tem uma
+só linha, qualquer que seja o número de usuários que o favoritaram.
+
+Os dados do filme nunca vêm do cliente: um favorito informa só o tmdb_id e o
+Movie que ainda não existe (pelo catálogo local ou por outro favorito) é
+criado com os detalhes do TMDb. As linhas do export de IDs do catálogo
+(import_tmdb_catalog --kind ids) não têm poster, nota nem data e são
+completadas com os detalhes na primeira vez que o filme é favoritado. Os
+demais filmes já gravados não mudam ao serem favoritados; a atualização fica
+com o refresh_favorite_metadata.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import tmdb
+from .models import Movie
+from .refresh import REFRESH_FIELDS, metadata_from_details
+from .sync import touch_movie_favorites
+
+# Campos gravados ao completar uma linha do export de IDs
+DETAIL_FIELDS = ('original_title', 'overview', 'popularity', 'genre_ids', 'adult', *REFRESH_FIELDS)
+
+
+def movie_from_details(tmdb_id, details):
+    """Movie a partir da resposta de /movie/{id}."""
+    return Movie(
+        tmdb_id=tmdb_id,
+        original_title=(details.get('original_title') or '')[:255],
+        overview=details.get('overview') or '',
+        popularity=details.get('popularity') or 0,
+        genre_ids=[genre['id'] for genre in details.get('genres') or []],
+        adult=bool(details.get('adult')),
+        **metadata_from_details(details),
+    )
+
+
+def is_incomplete(movie):
+    """Linha só com os dados do export de IDs: sem poster, nota nem data de lançamento."""
+    return movie.rating is None and movie.release_date is None and not movie.poster_path
+
+
+def fetch_details(tmdb_id, language='pt-BR'):
+    """(tmdb_id, detalhes | None se o filme não existe no TMDb | exceção, se o TMDb falhou)."""
+    try:
+        return tmdb_id, tmdb.get_client().movie_details(tmdb_id, language)
+    except tmdb.TMDbNotFound:
+        return tmdb_id, None
+    except tmdb.TMDbError as e:
+        return tmdb_id, e
+
+
+@dataclass
+class EnsuredMovies:
+    movies: dict = field(default_factory=dict)
+    # tmdb_ids que o TMDb não conhece
+    not_found: set = field(default_factory=set)
+    # tmdb_ids que não puderam ser buscados (TMDb fora do ar ou ocupado, ou
+    # além de `max_fetches`): podem ser enviados de novo
+    unavailable: set = field(default_factory=set)
+
+
+def ensure_movies(tmdb_ids, max_fetches=None):
+    """
+    Garante um Movie completo para cada tmdb_id. Os que faltam (ou só têm os
+    dados do export de IDs) são buscados no TMDb, até FAVORITES_TMDB_WORKERS
+    ao mesmo tempo e no máximo `max_fetches` por chamada, e gravados; o
+    resultado traz os {tmdb_id: Movie} disponíveis e os que não puderam ser
+    buscados. Chame fora da transação que grava os favoritos (não prende o
+    banco esperando o TMDb).
+    """
+    stored = Movie.objects.in_bulk(list(tmdb_ids))
+    result = EnsuredMovies(movies={
+        tmdb_id: movie for tmdb_id, movie in stored.items() if not is_incomplete(movie)
+    })
+    missing = [tmdb_id for tmdb_id in tmdb_ids if tmdb_id not in result.movies]
+    if max_fetches is not None:
+        result.unavailable.update(missing[max_fetches:])
+        missing = missing[:max_fetches]
+    if not missing:
+        return result
+
+    created, completed = [], []
+    workers = min(len(missing), settings.FAVORITES_TMDB_WORKERS)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tmdb-movies') as executor:
+        for tmdb_id, details in executor.map(fetch_details, missing):
+            if isinstance(details, Exception):
+                result.unavailable.add(tmdb_id)
+            elif details is None:
+                result.not_found.add(tmdb_id)
+            else:
+                movie = movie_from_details(tmdb_id, details)
+                (completed if tmdb_id in stored else created).append(movie)
+
+    # Um filme criado ao mesmo tempo por outra requisição é ignorado (mesmos dados do TMDb)
+    Movie.objects.bulk_create(created, ignore_conflicts=True)
+    if completed:
+        now = timezone.now()
+        for movie in completed:
+            # O bulk_update não preenche o auto_now (usado pelo build_recommendations)
+            movie.updated_at = now
+        with transaction.atomic():
+            Movie.objects.bulk_update(completed, [*DETAIL_FIELDS, 'updated_at'])
+            # Favoritos anteriores de uma linha incompleta chegam à sincronização
+            touch_movie_favorites([movie.tmdb_id for movie in completed])
+    result.movies.update((movie.tmdb_id, movie) for movie in created + completed)
+    return result
@@ -0,0 +1,86 @@
+import base64
+import binascii
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class FavoriteCursorPagination(BasePagination):
+    """
+    Paginação por cursor (keyset) dos favoritos em (added_at, id), do mais novo
+    ao mais antigo.
+
+    O cursor guarda o (added_at, id) do último item da página, então cada página
+    é uma faixa do índice (user, -added_at, -id): o custo não depende da
+    profundidade. Só é usada quando a requisição envia `cursor` ou `page_size`;
+    sem eles a resposta continua sendo a lista completa.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-added_at', '-id')
+    invalid_cursor_message = "Cursor inválido."
+    # Lê (added_at, id) de um item da página; trocado ao paginar tuplas de .values_list()
+    position = attrgetter('added_at', 'pk')
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.FAVORITES_PAGE_SIZE
+        return max(1, min(page_size, settings.FAVORITES_MAX_PAGE_SIZE))
+
+    def encode_cursor(self, added_at, pk):
+        raw = f"{added_at.isoformat()}|{pk}".encode('ascii')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('ascii')
+            added_at, pk = raw.rsplit('|', 1)
+            added_at = parse_datetime(added_at)
+            pk = int(pk)
+        except (binascii.Error, UnicodeError, ValueError) as e:
+            raise NotFound(self.invalid_cursor_message) from e
+        if added_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return added_at, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            added_at, pk = self.decode_cursor(cursor)
+            # added_at <= cursor delimita a faixa do índice; o Q resolve os empates
+            queryset = queryset.filter(added_at__lte=added_at).filter(
+                Q(added_at__lt=added_at) | Q(id__lt=pk)
+            )
+
+        # Um item a mais só para saber se existe próxima página
+        page = list(queryset[:page_size + 1])
+        self.has_next = len(page) > page_size
+        page = page[:page_size]
+        self.next_cursor = self.encode_cursor(*self.position(page[-1])) if self.has_next else None
+        return page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'results': data})
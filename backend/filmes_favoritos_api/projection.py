@@ -0,0 +1,48 @@
+"""
+Projeção de campos (?fields=id,title,poster_path) nas respostas de pesquisa,
+favoritos e links compartilhados: o cliente recebe só o que vai exibir.
+"""
+import re
+
+FIELD_RE = re.compile(r'^[a-z_][a-z0-9_]{0,39}$')
+MAX_FIELDS = 30
+
+
+class InvalidFields(ValueError):
+    """O parâmetro `fields` tem nomes inválidos (a mensagem vai no 400)."""
+
+
+def parse_fields(raw, allowed=None):
+    """
+    Converte o valor de `fields` em um frozenset de nomes, ou None quando o
+    parâmetro não foi enviado (resposta completa). Com `allowed`, nomes fora
+    dessa lista são rejeitados; sem ela (pesquisa do TMDb, campos em aberto),
+    só o formato do nome é validado.
+    """
+    if raw is None:
+        return None
+    fields = [name.strip() for name in raw.split(',') if name.strip()]
+    if not fields:
+        raise InvalidFields("O parâmetro 'fields' está vazio.")
+    if len(fields) > MAX_FIELDS:
+        raise InvalidFields(f"Envie no máximo {MAX_FIELDS} campos em 'fields'.")
+
+    invalid = [name for name in fields if not FIELD_RE.match(name) or (allowed is not None and name not in allowed)]
+    if invalid:
+        message = f"Campos inválidos em 'fields': {', '.join(invalid)}."
+        if allowed is not None:
+            message += f" Use: {', '.join(allowed)}."
+        raise InvalidFields(message)
+    return frozenset(fields)
+
+
+def project(rows, fields):
+    """Cópias dos dicts só com os campos pedidos (na ordem original). Sem `fields`, não altera."""
+    if fields is None:
+        return rows
+    return [{name: value for name, value in row.items() if name in fields} for row in rows]
+
+
+def fields_tag(fields):
+    """Identificador estável da projeção, para compor o ETag."""
+    return '.'.join(sorted(fields))
@@ -0,0 +1,276 @@
+"""
+Recomendações "parecidos com os seus favoritos" a partir do catálogo local.
+
+Cada filme do catálogo vira um vetor de características (gêneros, década,
+faixa de nota e hashes das palavras-chave), com cada bloco normalizado e os
+vetores de norma 1. Os vetores ficam em uma matriz float32 salva em .npy e
+aberta com mmap: os workers do gunicorn leem as mesmas páginas do cache do
+sistema operacional, sem uma cópia por processo.
+
+O perfil do usuário é a média dos vetores dos favoritos; a recomendação é um
+único produto matriz-vetor (similaridade do cosseno com todo o catálogo) e
+os k maiores valores saem por argpartition, sem ordenar a matriz inteira.
+
+A matriz é gerada pelo build_recommendations em uma nova pasta (geração) e
+publicada trocando o arquivo CURRENT; os processos trocam de geração sozinhos
+(ver get_index).
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele, o endpoint responde 503
+    np = None
+
+from .models import Movie
+
+# Muda quando o formato dos vetores muda: a matriz antiga é refeita do zero
+LAYOUT_VERSION = 1
+
+# Gêneros de filmes do TMDb (/genre/movie/list)
+GENRE_IDS = (28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37)
+GENRE_INDEX = {genre_id: index for index, genre_id in enumerate(GENRE_IDS)}
+
+# Décadas de 1920 (e antes) a 2020 (e depois)
+FIRST_DECADE, LAST_DECADE = 1920, 2020
+DECADES = (LAST_DECADE - FIRST_DECADE) // 10 + 1
+
+# Faixas de nota: [0, 2), [2, 4), ..., [8, 10]
+RATING_BANDS = 5
+
+# Palavras-chave do TMDb espalhadas (feature hashing) em um número fixo de colunas
+KEYWORD_BUCKETS = 32
+
+# Blocos do vetor: (início, tamanho, peso)
+GENRE_BLOCK = (0, len(GENRE_IDS), 1.0)
+DECADE_BLOCK = (GENRE_BLOCK[0] + GENRE_BLOCK[1], DECADES, 0.5)
+RATING_BLOCK = (DECADE_BLOCK[0] + DECADE_BLOCK[1], RATING_BANDS, 0.5)
+KEYWORD_BLOCK = (RATING_BLOCK[0] + RATING_BLOCK[1], KEYWORD_BUCKETS, 1.0)
+DIMENSIONS = KEYWORD_BLOCK[0] + KEYWORD_BLOCK[1]
+
+# Colunas lidas do Movie para montar os vetores
+VECTOR_FIELDS = ('tmdb_id', 'genre_ids', 'release_date', 'rating', 'keyword_ids', 'updated_at')
+
+CURRENT_FILE = 'CURRENT'
+# Gerações antigas mantidas (processos que ainda não trocaram continuam lendo)
+KEEP_GENERATIONS = 2
+
+
+def keyword_bucket(keyword_id):
+    return zlib.crc32(str(keyword_id).encode('ascii')) % KEYWORD_BUCKETS
+
+
+def decade_index(year):
+    return (min(max(year, FIRST_DECADE), LAST_DECADE) - FIRST_DECADE) // 10
+
+
+def rating_band(rating):
+    return min(int(float(rating) // 2), RATING_BANDS - 1)
+
+
+def movie_vector(genre_ids, release_date, rating, keyword_ids):
+    """
+    Vetor (float32, norma 1) de um filme, ou None se o filme não tem nenhuma
+    característica (ex.: só veio do export de IDs).
+    """
+    blocks = []
+    genres = [GENRE_INDEX[genre_id] for genre_id in genre_ids or () if genre_id in GENRE_INDEX]
+    if genres:
+        blocks.append((GENRE_BLOCK, genres))
+    if release_date is not None:
+        blocks.append((DECADE_BLOCK, [decade_index(release_date.year)]))
+    if rating is not None and rating > 0:
+        blocks.append((RATING_BLOCK, [rating_band(rating)]))
+    if keyword_ids:
+        blocks.append((KEYWORD_BLOCK, [keyword_bucket(keyword_id) for keyword_id in keyword_ids]))
+    if not blocks:
+        return None
+
+    vector = np.zeros(DIMENSIONS, dtype=np.float32)
+    for (start, size, weight), columns in blocks:
+        block = np.bincount(columns, minlength=size).astype(np.float32)
+        # Cada bloco pesa o mesmo, qualquer que seja o número de gêneros/palavras-chave
+        vector[start:start + size] = weight * block / np.linalg.norm(block)
+    return vector / np.linalg.norm(vector)
+
+
+class RecommendationIndex:
+    """Uma geração da matriz: ids (ordenados) e vetores abertos com mmap."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / 'meta.json').read_text())
+        self.ids = np.load(self.path / 'ids.npy', mmap_mode='r')
+        self.vectors = np.load(self.path / 'vectors.npy', mmap_mode='r')
+
+    def __len__(self):
+        return len(self.ids)
+
+    def positions(self, tmdb_ids):
+        """Linhas da matriz dos filmes `tmdb_ids` que estão no índice."""
+        tmdb_ids = np.unique(np.asarray(list(tmdb_ids), dtype=np.int64))
+        positions = np.searchsorted(self.ids, tmdb_ids)
+        inside = positions < len(self.ids)
+        positions, tmdb_ids = positions[inside], tmdb_ids[inside]
+        return positions[self.ids[positions] == tmdb_ids]
+
+    def recommend(self, tmdb_ids, k):
+        """
+        [(tmdb_id, pontuação)] dos k filmes mais parecidos com a média dos
+        `tmdb_ids`, sem eles mesmos, da maior para a menor pontuação.
+        """
+        positions = self.positions(tmdb_ids)
+        if not len(positions) or k < 1:
+            return []
+        profile = self.vectors[positions].mean(axis=0)
+        profile /= np.linalg.norm(profile)
+
+        scores = self.vectors @ profile
+        scores[positions] = -np.inf
+        k = min(k, len(scores) - len(positions))
+        if k < 1:
+            return []
+        top = np.argpartition(scores, -k)[-k:]
+        top = top[np.argsort(scores[top])[::-1]]
+        return [(int(self.ids[i]), float(scores[i])) for i in top]
+
+
+def index_dir():
+    return Path(settings.RECOMMENDATIONS['DIR'])
+
+
+def current_generation(base=None):
+    """Pasta da geração publicada, ou None se a matriz ainda não foi gerada."""
+    base = Path(base or index_dir())
+    try:
+        name = (base / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    return base / name if name else None
+
+
+_index = None
+_index_checked = 0.0
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """
+    A geração publicada, aberta uma vez por processo. A cada
+    RECOMMENDATIONS['RELOAD_INTERVAL'] segundos confere o CURRENT e abre a
+    geração nova, se houver. None sem numpy ou sem matriz gerada.
+    """
+    global _index, _index_checked
+    if np is None:
+        return None
+    now = time.monotonic()
+    if _index is not None and now - _index_checked < settings.RECOMMENDATIONS['RELOAD_INTERVAL']:
+        return _index
+    with _index_lock:
+        if _index is None or now - _index_checked >= settings.RECOMMENDATIONS['RELOAD_INTERVAL']:
+            generation = current_generation()
+            if generation is None:
+                _index = None
+            elif _index is None or _index.path != generation:
+                _index = RecommendationIndex(generation)
+            _index_checked = now
+    return _index
+
+
+def reset_index():
+    """Esquece a geração aberta (testes e troca de RECOMMENDATIONS['DIR'])."""
+    global _index, _index_checked
+    with _index_lock:
+        _index, _index_checked = None, 0.0
+
+
+# --- Geração da matriz ---
+
+def write_generation(base, ids, vectors, meta):
+    """Grava uma nova geração e a publica no CURRENT (troca atômica)."""
+    base = Path(base)
+    base.mkdir(parents=True, exist_ok=True)
+    name = f"gen-{time.time_ns()}"
+    path = base / name
+    path.mkdir()
+    np.save(path / 'ids.npy', np.ascontiguousarray(ids, dtype=np.int32))
+    np.save(path / 'vectors.npy', np.ascontiguousarray(vectors, dtype=np.float32))
+    (path / 'meta.json').write_text(json.dumps({**meta, 'layout': LAYOUT_VERSION, 'count': len(ids)}))
+
+    tmp = base / f".{CURRENT_FILE}.{os.getpid()}.tmp"
+    tmp.write_text(name)
+    os.replace(tmp, base / CURRENT_FILE)
+
+    generations = sorted(p for p in base.glob('gen-*') if p.is_dir())
+    for old in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+    return path
+
+
+def vectors_for(movies):
+    """(ids, vetores, ids sem características, maior updated_at) de tuplas VECTOR_FIELDS."""
+    ids, vectors, empty, watermark = [], [], [], None
+    for tmdb_id, genre_ids, release_date, rating, keyword_ids, updated_at in movies:
+        vector = movie_vector(genre_ids, release_date, rating, keyword_ids)
+        if vector is None:
+            empty.append(tmdb_id)
+        else:
+            ids.append(tmdb_id)
+            vectors.append(vector)
+        if watermark is None or updated_at > watermark:
+            watermark = updated_at
+    matrix = np.vstack(vectors) if vectors else np.empty((0, DIMENSIONS), dtype=np.float32)
+    return np.asarray(ids, dtype=np.int32), matrix, empty, watermark
+
+
+def build_index(base=None, full=False, chunk_size=5000):
+    """
+    Gera a matriz a partir do catálogo. Sem `full`, parte da geração atual e
+    só recalcula os filmes com updated_at desde a última geração; filmes
+    apagados do catálogo ou que passaram a ser adultos saem da matriz.
+    Retorna (caminho, filmes recalculados, total).
+    """
+    base = Path(base or index_dir())
+    previous = current_generation(base)
+    index = RecommendationIndex(previous) if previous and not full else None
+    if index is not None and index.meta.get('layout') != LAYOUT_VERSION:
+        index = None
+
+    movies = Movie.objects.filter(adult=False)
+    since = parse_datetime(index.meta['watermark']) if index and index.meta.get('watermark') else None
+    if since is not None:
+        # >=: uma gravação no mesmo instante da anterior não fica de fora
+        movies = movies.filter(updated_at__gte=since)
+    rows = movies.order_by('tmdb_id').values_list(*VECTOR_FIELDS).iterator(chunk_size=chunk_size)
+    ids, vectors, empty, watermark = vectors_for(rows)
+    changed = len(ids) + len(empty)
+
+    if index is not None:
+        # Linhas antigas que não foram recalculadas (nem perderam as características)
+        # e cujo filme ainda está no catálogo sem ser adulto
+        keep = ~np.isin(index.ids, np.concatenate([ids, np.asarray(empty, dtype=np.int32)]))
+        alive = Movie.objects.filter(adult=False).values_list('tmdb_id', flat=True)
+        keep &= np.isin(index.ids, np.fromiter(alive.iterator(chunk_size=chunk_size), dtype=np.int32))
+        ids = np.concatenate([index.ids[keep], ids])
+        vectors = np.concatenate([index.vectors[keep], vectors])
+        order = np.argsort(ids, kind='stable')
+        ids, vectors = ids[order], vectors[order]
+        if watermark is None:
+            watermark = since
+
+    path = write_generation(base, ids, vectors, {
+        'watermark': watermark.isoformat() if watermark else None,
+        'built_at': timezone.now().isoformat(),
+        'dimensions': DIMENSIONS,
+    })
+    return path, changed, len(ids)
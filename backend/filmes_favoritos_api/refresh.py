@@ -0,0 +1,209 @@
+"""
+Atualização em lote dos dados dos filmes favoritados (título, poster, nota e
+data de lançamento) a partir do TMDb, usada pelo refresh_favorite_metadata.
+
+Cada filme favoritado é buscado uma única vez, qualquer que seja o número de
+usuários que o favoritaram, em lotes em ordem crescente de tmdb_id. Dentro do
+lote as chamadas saem em paralelo (ThreadPoolExecutor) sob um rate limit, e as
+mudanças são gravadas no Movie com bulk_update em uma transação. O checkpoint (o último
+tmdb_id de cada lote gravado) permite retomar uma execução interrompida.
+"""
+import datetime
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import tmdb
+from .models import FavoriteMovie, Movie
+from .sync import touch_movie_favorites
+
+# Campos do Movie atualizados a partir dos detalhes do filme
+REFRESH_FIELDS = ('title', 'poster_path', 'rating', 'release_date')
+
+
+class Pacer:
+    """Rate limit simples entre threads: no máximo `rate` chamadas por segundo (0 = sem limite)."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def parse_rating(value):
+    try:
+        return Decimal(str(value)).quantize(Decimal('0.1'))
+    except (InvalidOperation, TypeError, ValueError):
+        return None
+
+
+def parse_release_date(value):
+    try:
+        return datetime.date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def metadata_from_details(details):
+    """Valores dos REFRESH_FIELDS a partir da resposta de /movie/{id}."""
+    rating = parse_rating(details.get('vote_average'))
+    return {
+        'title': (details.get('title') or details.get('original_title') or '')[:255],
+        'poster_path': details.get('poster_path'),
+        'rating': Decimal('0.0') if rating is None else rating,
+        'release_date': parse_release_date(details.get('release_date')),
+    }
+
+
+@dataclass
+class Checkpoint:
+    """Progresso gravado em JSON (escrita atômica) depois de cada lote."""
+
+    path: Path = None
+    last_tmdb_id: int = 0
+    # tmdb_ids que falharam por indisponibilidade do TMDb (tentados de novo ao retomar)
+    failed: list = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path):
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        data = json.loads(path.read_text())
+        return cls(path, data.get('last_tmdb_id', 0), data.get('failed', []))
+
+    def save(self, pending=()):
+        """`pending`: falhas anteriores ainda não tentadas de novo, mantidas no arquivo."""
+        if self.path is None:
+            return
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({'last_tmdb_id': self.last_tmdb_id, 'failed': self.failed + list(pending)}))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class RefreshStats:
+    movies: int = 0
+    updated_rows: int = 0
+    missing: int = 0
+    failed: int = 0
+
+
+def distinct_tmdb_ids(after, batch_size):
+    """Lotes de tmdb_ids favoritados (por qualquer usuário) maiores que `after`, em ordem."""
+    while True:
+        batch = list(
+            FavoriteMovie.objects.filter(movie_id__gt=after)
+            .order_by('movie_id').values_list('movie_id', flat=True).distinct()[:batch_size]
+        )
+        if not batch:
+            return
+        yield batch
+        after = batch[-1]
+
+
+def apply_metadata(metadata):
+    """
+    Grava {tmdb_id: campos} nos filmes que estão diferentes. Os favoritos
+    desses filmes ganham uma nova versão da lista do seu usuário, para a
+    mudança chegar à sincronização. Retorna quantos favoritos mudaram.
+    """
+    if not metadata:
+        return 0
+    now = timezone.now()
+    with transaction.atomic():
+        changed = []
+        for movie in Movie.objects.filter(tmdb_id__in=metadata).only('tmdb_id', *REFRESH_FIELDS):
+            values = metadata[movie.tmdb_id]
+            if all(getattr(movie, name) == values[name] for name in REFRESH_FIELDS):
+                continue
+            for name in REFRESH_FIELDS:
+                setattr(movie, name, values[name])
+            # O bulk_update não preenche o auto_now (usado pelo build_recommendations)
+            movie.updated_at = now
+            changed.append(movie)
+
+        Movie.objects.bulk_update(changed, [*REFRESH_FIELDS, 'updated_at'], batch_size=500)
+        return touch_movie_favorites([movie.tmdb_id for movie in changed])
+
+
+class MetadataRefresher:
+    """Busca os detalhes de cada filme no TMDb e grava as mudanças nos favoritos."""
+
+    def __init__(self, workers=8, rate=40, batch_size=200, language='pt-BR', client=None):
+        self.workers = workers
+        self.pacer = Pacer(rate)
+        self.batch_size = batch_size
+        self.language = language
+        self.client = client or tmdb.get_client()
+        self.stats = RefreshStats()
+
+    def fetch(self, tmdb_id):
+        """
+        (tmdb_id, detalhes | None se o filme não existe mais | exceção, se o
+        TMDb está indisponível). Outros erros (ex.: chave inválida) interrompem.
+        """
+        self.pacer.wait()
+        try:
+            return tmdb_id, self.client.movie_details(tmdb_id, self.language)
+        except (tmdb.TMDbUnavailable, tmdb.TMDbOverloaded) as e:
+            return tmdb_id, e
+        except tmdb.TMDbNotFound:
+            # Filme removido do TMDb: os dados guardados ficam como estão
+            return tmdb_id, None
+
+    def refresh_batch(self, executor, tmdb_ids):
+        """Atualiza um lote; retorna os tmdb_ids que falharam."""
+        metadata, failed = {}, []
+        for tmdb_id, details in executor.map(self.fetch, tmdb_ids):
+            if isinstance(details, Exception):
+                failed.append(tmdb_id)
+            elif details is None:
+                self.stats.missing += 1
+            else:
+                metadata[tmdb_id] = metadata_from_details(details)
+
+        updated = apply_metadata(metadata)
+        self.stats.movies += len(tmdb_ids)
+        self.stats.updated_rows += updated
+        self.stats.failed += len(failed)
+        return failed
+
+    def run(self, checkpoint=None, progress=None):
+        """
+        Percorre todos os tmdb_ids depois do checkpoint (tentando antes os que
+        falharam na execução anterior) e grava o progresso a cada lote.
+        """
+        checkpoint = checkpoint or Checkpoint()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tmdb-refresh') as executor:
+            retry, checkpoint.failed = checkpoint.failed, []
+            while retry:
+                batch, retry = retry[:self.batch_size], retry[self.batch_size:]
+                checkpoint.failed += self.refresh_batch(executor, batch)
+                checkpoint.save(pending=retry)
+
+            for tmdb_ids in distinct_tmdb_ids(checkpoint.last_tmdb_id, self.batch_size):
+                checkpoint.failed += self.refresh_batch(executor, tmdb_ids)
+                checkpoint.last_tmdb_id = tmdb_ids[-1]
+                checkpoint.save()
+                if progress:
+                    progress(self.stats, checkpoint)
+        return self.stats
@@ -0,0 +1,36 @@
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson é opcional: sem ele vale o JSONRenderer padrão
+    orjson = None
+
+
+class OrjsonRenderer(JSONRenderer):
+    """
+    JSONRenderer que serializa com orjson quando settings.FAST_READ_PATH está
+    ativo, gerando os mesmos bytes da saída compacta do DRF.
+
+    Feito para as respostas de favoritos (inteiros, textos e strings já
+    formatadas pelos serializers). Tipos que o orjson formataria diferente
+    (datas cruas, dataclasses) passam pelo encoder do DRF, e qualquer coisa
+    que ele não serialize (inteiros grandes, chaves não-str) cai no render
+    padrão. Floats não são garantidos byte a byte (ex.: 1e16 x 1e+16).
+    """
+
+    options = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not settings.FAST_READ_PATH:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Mesmo escape de \u2028 e \u2029 do JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,165 @@
+import asyncio
+import hashlib
+import threading
+import weakref
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def normalize_query(query):
+    """Normaliza o termo de pesquisa (espaços e maiúsculas) para montar a chave."""
+    return ' '.join(query.split()).casefold()
+
+
+class _InflightCall:
+    """Chamada ao TMDb em andamento, compartilhada pelas requisições idênticas."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _LeaderGone(Exception):
+    """A requisição que fazia a chamada ao TMDb foi cancelada (cliente desconectou)."""
+
+
+class SearchCache:
+    """
+    Cache dos resultados de pesquisa do TMDb sobre o cache framework do Django.
+
+    Pesquisas idênticas que chegam ao mesmo tempo (e ainda não estão no cache)
+    são agrupadas: apenas uma chamada ao TMDb é feita e as demais aguardam o
+    resultado dela.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight = {}
+        # Chamadas async em andamento, separadas por event loop
+        self._async_inflight = weakref.WeakKeyDictionary()
+        self._counters = {'hits': 0, 'misses': 0, 'coalesced': 0}
+
+    @property
+    def options(self):
+        return settings.TMDB_SEARCH_CACHE
+
+    @property
+    def cache(self):
+        return caches[self.options['ALIAS']]
+
+    def make_key(self, query, language, **extra):
+        # Hash do termo normalizado: mantém a chave curta e segura para o memcached/redis
+        normalized = normalize_query(query)
+        parts = [language, normalized] + [f'{k}={v}' for k, v in sorted(extra.items())]
+        digest = hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()
+        return f"search:{digest}"
+
+    def _incr(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def stats(self):
+        """Retorna uma cópia dos contadores de hits, misses e chamadas agrupadas."""
+        with self._lock:
+            return dict(self._counters)
+
+    def reset_stats(self):
+        with self._lock:
+            for counter in self._counters:
+                self._counters[counter] = 0
+
+    def get_or_fetch(self, query, language, fetch, **extra):
+        """
+        Retorna o resultado em cache para (query, language) ou chama `fetch()`.
+
+        Exceções levantadas por `fetch` são repassadas a todas as requisições
+        que aguardavam a mesma chamada, e nada é gravado no cache.
+        """
+        if len(query) > self.options['MAX_QUERY_LENGTH']:
+            # Termos muito longos quase nunca se repetem: não ocupam espaço no cache
+            self._incr('misses')
+            return fetch()
+
+        key = self.make_key(query, language, **extra)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._incr('hits')
+            return cached
+
+        with self._lock:
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _InflightCall()
+                self._inflight[key] = call
+                self._counters['misses'] += 1
+            else:
+                self._counters['coalesced'] += 1
+
+        if not leader:
+            if not call.done.wait(self.options['COALESCE_TIMEOUT']):
+                # A chamada líder travou: segue sozinho em vez de esperar para sempre
+                return fetch()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fetch()
+            self.cache.set(key, call.result, self.options['TIMEOUT'])
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            call.done.set()
+
+    async def aget_or_fetch(self, query, language, afetch, **extra):
+        """Versão assíncrona de `get_or_fetch`; `afetch` é uma coroutine function."""
+        if len(query) > self.options['MAX_QUERY_LENGTH']:
+            self._incr('misses')
+            return await afetch()
+
+        key = self.make_key(query, language, **extra)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            self._incr('hits')
+            return cached
+
+        loop = asyncio.get_running_loop()
+        inflight = self._async_inflight.setdefault(loop, {})
+        future = inflight.get(key)
+        if future is not None:
+            self._incr('coalesced')
+            try:
+                return await asyncio.wait_for(
+                    asyncio.shield(future), self.options['COALESCE_TIMEOUT']
+                )
+            except (_LeaderGone, asyncio.TimeoutError):
+                return await afetch()
+
+        future = inflight[key] = loop.create_future()
+        self._incr('misses')
+        try:
+            result = await afetch()
+            await self.cache.aset(key, result, self.options['TIMEOUT'])
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderGone())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Marca a exceção como lida caso ninguém esteja aguardando
+            future.exception()
+            raise
+        finally:
+            inflight.pop(key, None)
+
+
+search_cache = SearchCache()
@@ -0,0 +1,177 @@
+"""
+Pesquisa em várias páginas do TMDb (?pages=N, ?limit=, ?page=): as páginas
+são buscadas ao mesmo tempo pelo pool de conexões do cliente, juntadas e sem
+filmes repetidos, com os metadados de paginação na resposta.
+
+Todas as páginas pedidas saem juntas, antes de saber o total_pages: a latência
+fica perto da de uma página, ao custo de chamadas vazias quando a pesquisa
+tem menos páginas que as pedidas (por isso o limite MOVIE_SEARCH['MAX_PAGES']).
+"""
+import logging
+import math
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+from django.conf import settings
+
+from . import tmdb
+
+logger = logging.getLogger(__name__)
+
+# Resultados por página do TMDb (fixo na API)
+PAGE_SIZE = 20
+# O TMDb não responde páginas além da 500
+LAST_PAGE = 500
+
+
+class InvalidPaging(ValueError):
+    """Parâmetros de paginação inválidos (a mensagem vai no 400)."""
+
+
+def parse_paging(params):
+    """
+    (primeira página, quantidade de páginas, limite de resultados) a partir de
+    ?page=, ?pages= e ?limit=, ou None sem nenhum deles (resposta antiga: só a
+    lista de resultados da primeira página).
+    """
+    if not any(name in params for name in ('page', 'pages', 'limit')):
+        return None
+    max_pages = settings.MOVIE_SEARCH['MAX_PAGES']
+
+    values = {}
+    for name in ('page', 'pages', 'limit'):
+        raw = params.get(name)
+        if raw is None:
+            continue
+        try:
+            values[name] = int(raw)
+        except ValueError:
+            values[name] = 0
+        if values[name] < 1:
+            raise InvalidPaging(f"O parâmetro '{name}' deve ser um inteiro positivo.")
+
+    first_page = values.get('page', 1)
+    limit = values.get('limit')
+    pages = values.get('pages') or (math.ceil(limit / PAGE_SIZE) if limit else 1)
+    if pages > max_pages or (limit and limit > max_pages * PAGE_SIZE):
+        raise InvalidPaging(
+            f"Peça no máximo {max_pages} páginas ({max_pages * PAGE_SIZE} resultados) por pesquisa."
+        )
+    if first_page + pages - 1 > LAST_PAGE:
+        raise InvalidPaging(f"O TMDb só pagina até a página {LAST_PAGE}.")
+    return first_page, pages, limit
+
+
+def merge_pages(pages_data, first_page, pages, limit=None):
+    """
+    Junta as respostas do TMDb (na ordem das páginas; None = página que
+    falhou) em uma resposta com os metadados de paginação. Um filme repetido
+    entre páginas (a ordenação do TMDb muda entre as chamadas) fica só na
+    primeira ocorrência.
+    """
+    results, seen = [], set()
+    for data in pages_data:
+        for movie in (data or {}).get('results', ()):
+            if movie.get('id') in seen:
+                continue
+            seen.add(movie.get('id'))
+            results.append(movie)
+    if limit is not None:
+        results = results[:limit]
+
+    first = pages_data[0]
+    total_pages = first.get('total_pages', first_page)
+    last_page = first_page + pages - 1
+    return {
+        'page': first_page,
+        'pages': pages,
+        'total_pages': total_pages,
+        'total_results': first.get('total_results', len(results)),
+        'next_page': last_page + 1 if last_page < total_pages else None,
+        # Alguma página além da primeira falhou e ficou de fora
+        'incomplete': any(data is None for data in pages_data),
+        'results': results,
+    }
+
+
+def catalog_limit(first_page, pages):
+    """Quantos resultados buscar no catálogo: até a última página pedida e mais um."""
+    return (first_page + pages - 1) * PAGE_SIZE + 1
+
+
+def catalog_page(found, first_page, pages):
+    """
+    Resposta no formato do TMDb a partir dos resultados do catálogo local,
+    buscados com catalog_limit. O resultado a mais fica de fora e só indica
+    que existe uma próxima página (o total conta até ela).
+    """
+    return {
+        'results': found[(first_page - 1) * PAGE_SIZE:(first_page + pages - 1) * PAGE_SIZE],
+        'total_pages': math.ceil(len(found) / PAGE_SIZE),
+        'total_results': len(found),
+    }
+
+
+def collect_pages(outcomes):
+    """
+    Respostas por página a partir de (resposta ou exceção). Um erro na
+    primeira página é repassado; nas demais, a página fica de fora (None).
+    """
+    first = outcomes[0]
+    if isinstance(first, Exception):
+        raise first
+    pages_data = [first]
+    for outcome in outcomes[1:]:
+        if isinstance(outcome, tmdb.TMDbError):
+            logger.warning(f"Página extra da pesquisa ignorada: {outcome}")
+            outcome = None
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        pages_data.append(outcome)
+    return pages_data
+
+
+def outcome_of(fetch, *args):
+    """Resultado de `fetch(*args)` ou a exceção levantada, para juntar as páginas."""
+    try:
+        return fetch(*args)
+    except Exception as e:
+        return e
+
+
+def fetch_pages(fetch, page_numbers):
+    """
+    Chama `fetch(page)` para cada página: a primeira na thread da requisição e
+    as demais no pool, ao mesmo tempo. O contexto (métricas da requisição)
+    segue para as threads do pool.
+    """
+    executor = get_executor()
+    futures = [
+        executor.submit(copy_context().run, outcome_of, fetch, page)
+        for page in page_numbers[1:]
+    ]
+    return [outcome_of(fetch, page_numbers[0])] + [future.result() for future in futures]
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Pool de threads do processo para as páginas extras (o worker atende a
+    primeira). Depois de um fork, o processo filho cria o próprio pool.
+    """
+    global _executor, _executor_pid
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.MOVIE_SEARCH['PAGE_WORKERS'], thread_name_prefix='tmdb-page',
+                )
+                _executor_pid = pid
+    return _executor
@@ -1,12 +1,21 @@
 from rest_framework import serializers
 from .models import FavoriteMovie, ShareableList
+from django.conf import settings
 from django.contrib.auth.models import User
 
 class FavoriteMovieSerializer(serializers.ModelSerializer):
     """
     Serializer para o modelo FavoriteMovie.
     Usado para converter objetos Python para JSON e validar dados de entrada.
+    Os dados do filme vêm do Movie ligado ao favorito, no mesmo formato plano;
+    na entrada só o tmdb_id é lido (título, nota etc. enviados são ignorados).
     """
+    tmdb_id = serializers.IntegerField(source='movie_id', min_value=1, max_value=2147483647)
+    title = serializers.CharField(source='movie.title', read_only=True)
+    poster_path = serializers.CharField(source='movie.poster_path', read_only=True)
+    rating = serializers.DecimalField(source='movie.rating', max_digits=3, decimal_places=1, read_only=True)
+    release_date = serializers.DateField(source='movie.release_date', read_only=True)
+
     class Meta:
         model = FavoriteMovie
         # IDs de filmes e dados que o Front-End precisa ver
@@ -21,6 +30,31 @@ class FavoriteMovieSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ('added_at', 'id')
 
+    def create(self, validated_data):
+        # O Movie compartilhado vem da view (save(movie=...), ver movies.ensure_movies)
+        validated_data.pop('movie_id')
+        return FavoriteMovie.objects.create(**validated_data)
+
+class FavoriteStatusSerializer(serializers.Serializer):
+    """IDs do TMDb consultados em lote no POST /api/favorites/status/."""
+    tmdb_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=settings.FAVORITE_STATUS_MAX_IDS,
+    )
+
+class ShareLinkRequestSerializer(serializers.Serializer):
+    """Validade opcional do link pedida no POST /api/share/generate/."""
+    expires_in_days = serializers.IntegerField(
+        required=False, min_value=1, max_value=settings.SHARE_LINKS['MAX_TTL_DAYS'],
+    )
+
+class ShareStatsRequestSerializer(serializers.Serializer):
+    """Período (?days=) do GET /api/share/<hash>/stats/."""
+    days = serializers.IntegerField(
+        required=False, default=30, min_value=1, max_value=settings.SHARE_ANALYTICS['MAX_DAYS'],
+    )
+
 class ShareableListSerializer(serializers.ModelSerializer):
     """
     Serializer para o modelo ShareableList.
@@ -0,0 +1,278 @@
+"""
+Contagem de acessos dos links compartilhados sem escrever no banco durante a
+requisição.
+
+O ShareLinkRetrieveView só soma o acesso em memória (record_view): por link e
+por dia, o número de acessos e um HyperLogLog esparso dos visitantes (hash do
+IP + User-Agent; nada identificável é guardado). Uma thread por processo
+(start_flusher) grava o acumulado a cada SHARE_ANALYTICS['FLUSH_INTERVAL']
+segundos, ou antes, quando MAX_PENDING acessos se acumulam:
+
+- o total e o último acesso de cada lista em um UPDATE ... CASE por lote (o
+  último acesso só avança: outro worker pode gravar depois um mais antigo);
+- os dias em SharedListDailyViews: as linhas que faltam são criadas vazias
+  (ignore_conflicts), travadas com select_for_update e atualizadas com os
+  registradores combinados (máximo de cada um) em um bulk_update.
+
+Se um worker morre sem o worker_exit do gunicorn, perde no máximo os acessos
+do último intervalo. Se a gravação falha, o acumulado volta para o buffer.
+"""
+import atexit
+import hashlib
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, DateTimeField, F, PositiveBigIntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from rest_framework.throttling import BaseThrottle
+
+from .models import ShareableList, SharedListDailyViews
+
+logger = logging.getLogger(__name__)
+
+
+# --- HyperLogLog ---
+
+def registers_count():
+    return 1 << settings.SHARE_ANALYTICS['HLL_PRECISION']
+
+
+def visitor_hash(request):
+    """Hash de 64 bits do visitante (IP, respeitando NUM_PROXIES, + User-Agent)."""
+    ident = f"{BaseThrottle().get_ident(request)}|{request.META.get('HTTP_USER_AGENT', '')}"
+    return int.from_bytes(hashlib.blake2b(ident.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def add_to_sketch(sketch, value, precision):
+    """Soma um hash de 64 bits ao sketch esparso {registrador: posto}."""
+    rest_bits = 64 - precision
+    index = value >> rest_bits
+    rest = value & ((1 << rest_bits) - 1)
+    # Posição do primeiro bit 1 depois dos bits do registrador
+    rank = rest_bits - rest.bit_length() + 1
+    if rank > sketch.get(index, 0):
+        sketch[index] = rank
+
+
+def merge_sketch(registers, sketch):
+    """Combina um sketch esparso nos registradores (bytes) gravados; retorna bytes."""
+    merged = bytearray(registers or bytes(registers_count()))
+    for index, rank in sketch.items():
+        if rank > merged[index]:
+            merged[index] = rank
+    return bytes(merged)
+
+
+def estimate(registers):
+    """Estimativa de cardinalidade (erro padrão ~1,04/sqrt(registradores))."""
+    if not registers:
+        return 0
+    m = len(registers)
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / sum(2.0 ** -rank for rank in registers)
+    zeros = registers.count(0)
+    if raw <= 2.5 * m and zeros:
+        # Poucos visitantes: contagem linear pelos registradores vazios
+        return round(m * math.log(m / zeros))
+    return round(raw)
+
+
+def union(sketches):
+    """Registradores da união de vários dias (máximo de cada registrador)."""
+    merged = None
+    for registers in sketches:
+        if not registers:
+            continue
+        if merged is None:
+            merged = bytearray(registers)
+        else:
+            merged = bytearray(map(max, merged, registers))
+    return bytes(merged) if merged is not None else b''
+
+
+# --- Buffer do processo ---
+
+class ViewBuffer:
+    """Acessos ainda não gravados: {share_hash: {dia: [acessos, sketch]}} e o último acesso."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_viewed = {}
+        self.count = 0
+        self.full = threading.Event()
+
+    def record(self, share_hash, visitor, now):
+        precision = settings.SHARE_ANALYTICS['HLL_PRECISION']
+        with self.lock:
+            day = self.pending.setdefault(share_hash, {}).setdefault(now.date(), [0, {}])
+            day[0] += 1
+            add_to_sketch(day[1], visitor, precision)
+            self.last_viewed[share_hash] = now
+            self.count += 1
+            if self.count >= settings.SHARE_ANALYTICS['MAX_PENDING']:
+                self.full.set()
+
+    def take(self):
+        """Esvazia o buffer e retorna (pendentes, últimos acessos)."""
+        with self.lock:
+            taken = self.pending, self.last_viewed
+            self.pending, self.last_viewed, self.count = {}, {}, 0
+            self.full.clear()
+        return taken
+
+    def restore(self, pending, last_viewed):
+        """Devolve ao buffer um acumulado que não pôde ser gravado."""
+        with self.lock:
+            for share_hash, days in pending.items():
+                current_days = self.pending.setdefault(share_hash, {})
+                for day, (views, sketch) in days.items():
+                    current = current_days.setdefault(day, [0, {}])
+                    current[0] += views
+                    for index, rank in sketch.items():
+                        if rank > current[1].get(index, 0):
+                            current[1][index] = rank
+                    self.count += views
+            for share_hash, when in last_viewed.items():
+                self.last_viewed[share_hash] = max(when, self.last_viewed.get(share_hash, when))
+
+
+buffer = ViewBuffer()
+
+
+def record_view(request, share_hash):
+    """Chamado pelo ShareLinkRetrieveView: só memória, nenhuma escrita no banco."""
+    if settings.SHARE_ANALYTICS['ENABLED']:
+        start_flusher()
+        buffer.record(share_hash, visitor_hash(request), timezone.now())
+
+
+# --- Gravação em lote ---
+
+@dataclass
+class FlushStats:
+    lists: int = 0
+    days: int = 0
+    views: int = 0
+
+
+def flush(batch_size=None):
+    """Grava o buffer do processo no banco (ver o docstring do módulo)."""
+    batch_size = batch_size or settings.SHARE_ANALYTICS['BATCH_SIZE']
+    pending, last_viewed = buffer.take()
+    if not pending:
+        return FlushStats()
+    try:
+        return write(pending, last_viewed, batch_size)
+    except Exception:
+        buffer.restore(pending, last_viewed)
+        raise
+
+
+def latest_view(when):
+    """O mais recente entre o último acesso gravado (NULL = nenhum) e `when`."""
+    when = Value(when, output_field=DateTimeField())
+    return Greatest(Coalesce(F('last_viewed_at'), when), when)
+
+
+def write(pending, last_viewed, batch_size):
+    stats = FlushStats()
+    with transaction.atomic():
+        ids = dict(ShareableList.objects.filter(share_hash__in=list(pending)).values_list('share_hash', 'id'))
+        # Links apagados nesse meio tempo ficam de fora
+        pending = {ids[share_hash]: days for share_hash, days in pending.items() if share_hash in ids}
+        last_viewed = {ids[share_hash]: when for share_hash, when in last_viewed.items() if share_hash in ids}
+        list_ids = sorted(pending)
+
+        # 1. Total de acessos e último acesso: um UPDATE ... CASE por lote
+        for start in range(0, len(list_ids), batch_size):
+            batch = list_ids[start:start + batch_size]
+            ShareableList.objects.filter(id__in=batch).update(
+                view_count=F('view_count') + Case(
+                    *[When(id=list_id, then=Value(sum(views for views, _ in pending[list_id].values())))
+                      for list_id in batch],
+                    output_field=PositiveBigIntegerField(),
+                ),
+                last_viewed_at=Case(
+                    *[When(id=list_id, then=latest_view(last_viewed[list_id])) for list_id in batch],
+                    output_field=DateTimeField(),
+                ),
+            )
+
+        # 2. Acessos e visitantes por dia
+        keys = [(list_id, day) for list_id in list_ids for day in pending[list_id]]
+        SharedListDailyViews.objects.bulk_create(
+            [SharedListDailyViews(shared_list_id=list_id, day=day) for list_id, day in keys],
+            batch_size=batch_size, ignore_conflicts=True,
+        )
+        rows = []
+        for start in range(0, len(list_ids), batch_size):
+            batch = list_ids[start:start + batch_size]
+            days = {day for list_id in batch for day in pending[list_id]}
+            for row in SharedListDailyViews.objects.select_for_update().filter(
+                shared_list_id__in=batch, day__in=days,
+            ).order_by('id'):
+                views, sketch = pending[row.shared_list_id].get(row.day, (0, None))
+                if sketch is None:
+                    continue
+                row.views += views
+                row.visitors_sketch = merge_sketch(bytes(row.visitors_sketch), sketch)
+                row.unique_visitors = estimate(row.visitors_sketch)
+                rows.append(row)
+                stats.views += views
+        SharedListDailyViews.objects.bulk_update(
+            rows, ['views', 'visitors_sketch', 'unique_visitors'], batch_size=batch_size,
+        )
+    stats.lists, stats.days = len(list_ids), len(rows)
+    return stats
+
+
+# --- Thread de gravação ---
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def flush_loop():
+    while True:
+        buffer.full.wait(settings.SHARE_ANALYTICS['FLUSH_INTERVAL'])
+        try:
+            flush()
+        except Exception as e:
+            logger.warning(f"Falha ao gravar os acessos dos links (mantidos para a próxima): {e}")
+        finally:
+            # A thread não fica com uma conexão parada entre as gravações
+            connection.close()
+
+
+def start_flusher():
+    """
+    Inicia a thread de gravação do processo no primeiro acesso (de novo depois
+    de um fork). Com FLUSH_INTERVAL = 0 não há thread: o buffer só é gravado
+    chamando flush() (testes).
+    """
+    global _flusher_pid
+    pid = os.getpid()
+    if _flusher_pid == pid or settings.SHARE_ANALYTICS['FLUSH_INTERVAL'] <= 0:
+        return
+    with _flusher_lock:
+        if _flusher_pid != pid:
+            threading.Thread(target=flush_loop, name='share-views-flush', daemon=True).start()
+            if _flusher_pid is None:
+                # Servidores sem o worker_exit do gunicorn (runserver, uvicorn)
+                atexit.register(flush_at_exit)
+            _flusher_pid = pid
+
+
+def flush_at_exit():
+    """Grava o que sobrou no buffer ao encerrar o processo (worker_exit do gunicorn e atexit)."""
+    try:
+        flush()
+    except Exception as e:
+        logger.warning(f"Acessos dos links perdidos ao encerrar: {e}")
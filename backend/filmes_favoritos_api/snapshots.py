@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from .exports import favorite_rows
+from .models import FavoriteMovie, ShareableList, SharedListDailyViews
+from .serializers import ShareableListSerializer
+
+renderer = JSONRenderer()
+
+
+class ShareQuotaExceeded(Exception):
+    """O usuário já tem SHARE_LINKS['MAX_PER_USER'] links válidos (com WHEN_FULL='reject')."""
+
+
+def render_json(data):
+    """Renderiza exatamente como a API (JSONRenderer do DRF, compacto e UTF-8)."""
+    return renderer.render(data)
+
+
+def compress(payload):
+    """gzip determinístico (mtime=0): o mesmo conteúdo gera sempre os mesmos bytes."""
+    return gzip.compress(payload, mtime=0)
+
+
+def build_payload(shared_list, favorites):
+    """Monta a resposta completa do link no mesmo formato do ShareableListSerializer."""
+    fields = ShareableListSerializer().fields
+    return render_json({
+        'share_hash': fields['share_hash'].to_representation(shared_list.share_hash),
+        'favorites': favorites,
+        'created_at': fields['created_at'].to_representation(shared_list.created_at),
+    })
+
+
+def content_hash_of(favorites):
+    """sha256 dos favoritos renderizados, que identifica o conteúdo do snapshot."""
+    return hashlib.sha256(render_json(favorites)).hexdigest()
+
+
+def store_payload(shared_list, payload):
+    """Guarda o snapshot renderizado (e a versão gzip, se valer a pena) na lista."""
+    shared_list.payload = payload.decode('utf-8')
+    shared_list.payload_gzip = None
+    if settings.SHARE_SNAPSHOT['COMPRESS'] and len(payload) >= settings.SHARE_SNAPSHOT['COMPRESS_MIN_SIZE']:
+        shared_list.payload_gzip = compress(payload)
+    shared_list.save(update_fields=['content_hash', 'payload', 'payload_gzip'])
+
+
+def active_lists(now=None):
+    """Links que ainda valem: sem validade ou com validade no futuro."""
+    return ShareableList.objects.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=now or timezone.now()))
+
+
+def outlives(expires_at, current):
+    """A validade `expires_at` vai além de `current` (None = não expira)."""
+    return current is not None and (expires_at is None or expires_at > current)
+
+
+def enforce_quota(user):
+    """
+    Com WHEN_FULL='evict': apaga os links válidos mais antigos do usuário
+    além de SHARE_LINKS['MAX_PER_USER'] e retorna os share_hash apagados. Os
+    expirados não contam (ficam para o purge_shared_lists).
+    """
+    keep = settings.SHARE_LINKS['MAX_PER_USER']
+    excess = list(
+        active_lists().filter(user=user)
+        .order_by('-created_at', '-id').values_list('id', 'share_hash')[keep:]
+    )
+    if excess:
+        ShareableList.objects.filter(id__in=[list_id for list_id, _ in excess]).delete()
+    return [share_hash for _, share_hash in excess]
+
+
+def get_or_create_snapshot(user, expires_at=None):
+    """
+    Retorna (lista, criada, apagados) para os favoritos atuais do usuário.
+
+    O conteúdo é identificado pelo sha256 da lista renderizada: se nada mudou
+    desde o último compartilhamento, o link existente (e ainda válido) é
+    reaproveitado, com a validade estendida até `expires_at` se for maior.
+    Com a cota de links válidos cheia, um link novo levanta
+    ShareQuotaExceeded (SHARE_LINKS['WHEN_FULL'] = 'reject', o padrão) ou
+    apaga os mais antigos do usuário, cujos share_hash vêm em `apagados`
+    ('evict'). Retorna (None, False, []) quando a lista de favoritos está vazia.
+    """
+    favorites_qs = FavoriteMovie.objects.filter(user=user).order_by('-added_at', '-id')
+    favorites = list(favorite_rows(favorites_qs))
+    if not favorites:
+        return None, False, []
+
+    content_hash = content_hash_of(favorites)
+    existing = (
+        active_lists().filter(user=user, content_hash=content_hash)
+        .only('share_hash', 'expires_at').first()
+    )
+    if existing is not None:
+        if outlives(expires_at, existing.expires_at):
+            existing.expires_at = expires_at
+            existing.save(update_fields=['expires_at'])
+        return existing, False, []
+
+    evict = settings.SHARE_LINKS['WHEN_FULL'] == 'evict'
+    if not evict and active_lists().filter(user=user).count() >= settings.SHARE_LINKS['MAX_PER_USER']:
+        raise ShareQuotaExceeded()
+
+    with transaction.atomic():
+        shared_list = ShareableList.objects.create(user=user, content_hash=content_hash, expires_at=expires_at)
+        store_payload(shared_list, build_payload(shared_list, favorites))
+        evicted = enforce_quota(user) if evict else []
+    return shared_list, True, evicted
+
+
+def backfill_payload(shared_list):
+    """Gera o snapshot de uma lista antiga (criada antes dos snapshots) a partir do M2M."""
+    favorites = ShareableListSerializer(shared_list).data['favorites']
+    shared_list.content_hash = content_hash_of(favorites)
+    payload = build_payload(shared_list, favorites)
+    store_payload(shared_list, payload)
+    return payload
+
+
+@dataclass
+class PurgeStats:
+    lists: int = 0
+    # Linhas do M2M (ShareableList.favorites) apagadas junto com as listas antigas
+    join_rows: int = 0
+    # Acessos por dia (SharedListDailyViews) apagados em cascata
+    daily_rows: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+
+def purgeable_lists(now=None):
+    """
+    Listas que podem ser apagadas: expiradas, ou listas antigas (sem snapshot)
+    cujos favoritos foram todos removidos.
+    """
+    now = now or timezone.now()
+    return ShareableList.objects.filter(
+        Q(expires_at__lte=now) | Q(payload='', favorites__isnull=True)
+    )
+
+
+def purge_lists(queryset, batch_size=500, pause=0.0):
+    """
+    Apaga as listas de `queryset` em lotes de `batch_size`, cada um na sua
+    transação (travas curtas), com `pause` segundos entre os lotes.
+    """
+    stats = PurgeStats()
+    through_label = ShareableList.favorites.through._meta.label
+    start = time.perf_counter()
+    while True:
+        with transaction.atomic():
+            ids = list(queryset.order_by('id').values_list('id', flat=True).distinct()[:batch_size])
+            if not ids:
+                break
+            _, deleted = ShareableList.objects.filter(id__in=ids).delete()
+        stats.lists += deleted.get(ShareableList._meta.label, 0)
+        stats.join_rows += deleted.get(through_label, 0)
+        stats.daily_rows += deleted.get(SharedListDailyViews._meta.label, 0)
+        stats.batches += 1
+        if pause:
+            time.sleep(pause)
+    stats.seconds = time.perf_counter() - start
+    return stats
@@ -0,0 +1,188 @@
+"""
+Resumo da lista de favoritos de cada usuário (FavoriteStats), para o
+GET /api/favorites/stats/ responder com uma leitura pela chave primária em vez
+de agregar os favoritos a cada acesso.
+
+Os receptores de post_save/post_delete (ligados em apps.py) atualizam o resumo
+na transação da gravação: contagem e soma das notas com um UPDATE de
+expressões F; as décadas e os últimos favoritos (JSON) são lidos e gravados
+logo depois, com a linha já travada por esse UPDATE. Caminhos em lote
+(bulk_create da importação) e mudanças nos dados dos filmes
+(touch_movie_favorites) recalculam o resumo dos usuários afetados
+(rebuild_stats), que também é o reparo do rebuild_favorite_stats.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Window
+from django.db.models.functions import RowNumber
+from rest_framework.fields import DateTimeField
+
+from .models import FavoriteMovie, FavoriteStats, Movie
+
+
+def decade_of(release_date):
+    """Chave da década de lançamento ("1990"); None sem data."""
+    return str(release_date.year // 10 * 10) if release_date else None
+
+
+def recent_entry(tmdb_id, title, poster_path, added_at):
+    return {
+        'tmdb_id': tmdb_id,
+        'title': title,
+        'poster_path': poster_path,
+        'added_at': DateTimeField().to_representation(added_at),
+    }
+
+
+def latest_favorites(user_id):
+    """Os FAVORITE_STATS['RECENT'] favoritos mais recentes do usuário, no formato de `recent`."""
+    rows = (
+        FavoriteMovie.objects.filter(user_id=user_id).order_by('-added_at', '-id')
+        .values_list('movie_id', 'movie__title', 'movie__poster_path', 'added_at')
+        [:settings.FAVORITE_STATS['RECENT']]
+    )
+    return [recent_entry(*row) for row in rows]
+
+
+def apply_change(favorite, delta):
+    """
+    Soma (delta=1) ou tira (delta=-1) um favorito do resumo do usuário. Sem
+    resumo gravado (usuário anterior à tabela), ele é recalculado por inteiro.
+    """
+    movie = favorite.movie
+    # Um Movie ainda não relido do banco pode ter os valores como foram atribuídos
+    rating = Movie._meta.get_field('rating').to_python(movie.rating)
+    release_date = Movie._meta.get_field('release_date').to_python(movie.release_date)
+    counters = {'count': F('count') + delta}
+    if rating is not None:
+        counters['rated_count'] = F('rated_count') + delta
+        counters['rating_sum'] = F('rating_sum') + delta * rating
+
+    with transaction.atomic():
+        summaries = FavoriteStats.objects.filter(user_id=favorite.user_id)
+        if not summaries.update(**counters):
+            rebuild_stats([favorite.user_id])
+            return
+
+        # O UPDATE acima trava a linha até o fim da transação
+        decades, recent = summaries.values_list('decades', 'recent').get()
+        decade = decade_of(release_date)
+        if decade:
+            decades[decade] = decades.get(decade, 0) + delta
+            if decades[decade] <= 0:
+                del decades[decade]
+        if delta > 0:
+            entry = recent_entry(favorite.movie_id, movie.title, movie.poster_path, favorite.added_at)
+            recent = [entry, *recent][:settings.FAVORITE_STATS['RECENT']]
+        elif any(entry['tmdb_id'] == favorite.movie_id for entry in recent):
+            # O próximo mais recente só está nos favoritos
+            recent = latest_favorites(favorite.user_id)
+        summaries.update(decades=decades, recent=recent)
+
+
+def favorite_saved(sender, instance, created=False, raw=False, **kwargs):
+    """Receptor de post_save do FavoriteMovie: um favorito novo entra no resumo."""
+    if created and not raw:
+        apply_change(instance, 1)
+
+
+def favorite_deleted(sender, instance, origin=None, **kwargs):
+    """Receptor de post_delete do FavoriteMovie: o favorito removido sai do resumo."""
+    from .sync import is_user_deletion
+
+    if is_user_deletion(origin):
+        # O resumo do usuário também está sendo removido
+        return
+    apply_change(instance, -1)
+
+
+def rebuild_stats(user_ids):
+    """
+    Recalcula o resumo dos usuários `user_ids` a partir dos favoritos, com três
+    consultas agregadas e um upsert. Retorna quantos resumos foram gravados.
+    """
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return 0
+    favorites = FavoriteMovie.objects.filter(user_id__in=user_ids)
+
+    totals = {
+        row['user_id']: row
+        for row in favorites.values('user_id').order_by().annotate(
+            count=Count('id'),
+            rated_count=Count('id', filter=Q(movie__rating__isnull=False)),
+            rating_sum=Sum('movie__rating'),
+        )
+    }
+
+    decades = defaultdict(dict)
+    years = (
+        favorites.filter(movie__release_date__isnull=False)
+        .values_list('user_id', 'movie__release_date__year').order_by().annotate(Count('id'))
+    )
+    for user_id, year, count in years:
+        decade = str(year // 10 * 10)
+        decades[user_id][decade] = decades[user_id].get(decade, 0) + count
+
+    recent = defaultdict(list)
+    latest = (
+        favorites.annotate(position=Window(
+            RowNumber(), partition_by=F('user_id'), order_by=[F('added_at').desc(), F('id').desc()],
+        ))
+        .filter(position__lte=settings.FAVORITE_STATS['RECENT'])
+        .order_by('user_id', 'position')
+        .values_list('user_id', 'movie_id', 'movie__title', 'movie__poster_path', 'added_at')
+    )
+    for user_id, *row in latest:
+        recent[user_id].append(recent_entry(*row))
+
+    summaries = []
+    for user_id in user_ids:
+        total = totals.get(user_id, {})
+        summaries.append(FavoriteStats(
+            user_id=user_id,
+            count=total.get('count', 0),
+            rated_count=total.get('rated_count', 0),
+            rating_sum=total.get('rating_sum') or 0,
+            decades=dict(sorted(decades[user_id].items())),
+            recent=recent[user_id],
+        ))
+    FavoriteStats.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['count', 'rated_count', 'rating_sum', 'decades', 'recent'],
+    )
+    return len(summaries)
+
+
+def rebuild_all(batch_size=500):
+    """Recalcula o resumo de todos os usuários, em lotes. Retorna quantos foram gravados."""
+    rebuilt, after = 0, 0
+    users = get_user_model().objects.order_by('pk').values_list('pk', flat=True)
+    while True:
+        batch = list(users.filter(pk__gt=after)[:batch_size])
+        if not batch:
+            return rebuilt
+        with transaction.atomic():
+            rebuilt += rebuild_stats(batch)
+        after = batch[-1]
+
+
+def get_stats(user_id):
+    """
+    Resumo do usuário (calculado e gravado na primeira leitura, se ainda não
+    existe). None se o usuário não existe mais: com AUTH_STATELESS_READS, o
+    token de um usuário removido continua valendo até expirar.
+    """
+    summary = FavoriteStats.objects.filter(user_id=user_id).first()
+    if summary is None:
+        if not get_user_model().objects.filter(pk=user_id).exists():
+            return None
+        with transaction.atomic():
+            rebuild_stats([user_id])
+        summary = FavoriteStats.objects.get(user_id=user_id)
+    return summary
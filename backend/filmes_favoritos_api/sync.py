@@ -0,0 +1,124 @@
+"""
+Versões da lista de favoritos, para a sincronização incremental
+(GET /api/favorites/?since=<versão>) e o ETag da lista.
+
+Cada usuário tem um contador (FavoriteListState.version) que aumenta a cada
+gravação: o favorito gravado recebe a nova versão e cada remoção deixa um
+FavoriteTombstone com a sua. O delta desde a versão N são os favoritos com
+version > N e as remoções com version > N.
+
+Os receptores de pre_save/post_delete (ligados em apps.py) cobrem qualquer
+save()/delete() do ORM; caminhos em lote (bulk_create, bulk_update, update())
+não disparam sinais e precisam chamar bump_version por conta própria. Uma
+mudança nos dados compartilhados de um filme (Movie) aparece como gravação
+dos favoritos desse filme (touch_movie_favorites), que também recalcula o
+resumo desses usuários (stats.py). Para a ordem das versões acompanhar a dos
+commits, a gravação deve rodar na mesma transação que o bump_version (o
+UPDATE trava a linha do usuário até o fim).
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import F, Max, QuerySet
+
+from .models import FavoriteListState, FavoriteMovie, FavoriteTombstone
+from .stats import rebuild_stats
+
+
+def bump_version(user_id):
+    """Aumenta e retorna a versão da lista do usuário."""
+    with transaction.atomic():
+        states = FavoriteListState.objects.filter(user_id=user_id)
+        if not states.update(version=F('version') + 1):
+            FavoriteListState.objects.get_or_create(user_id=user_id)
+            states.update(version=F('version') + 1)
+        return states.values_list('version', flat=True).get()
+
+
+def get_state(user_id):
+    """(versão, versão compactada) da lista; (0, 0) se o usuário nunca gravou nada."""
+    state = FavoriteListState.objects.filter(user_id=user_id).values_list('version', 'compacted_version').first()
+    return state or (0, 0)
+
+
+def assign_version(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Receptor de pre_save do FavoriteMovie: o favorito gravado recebe a próxima versão."""
+    if raw:
+        return
+    instance.version = bump_version(instance.user_id)
+    if update_fields is not None and 'version' not in update_fields:
+        # O save() só grava os campos pedidos: a versão vai à parte
+        FavoriteMovie.objects.filter(pk=instance.pk).update(version=instance.version)
+
+
+def touch_movie_favorites(tmdb_ids):
+    """
+    Os dados dos filmes `tmdb_ids` mudaram: cada favorito desses filmes recebe
+    uma nova versão do seu usuário, para entrar no próximo delta, e o resumo
+    desses usuários é recalculado (nota e lançamento podem ter mudado). Deve
+    rodar na transação da alteração. Retorna quantos favoritos foram marcados.
+    """
+    favorites = list(FavoriteMovie.objects.filter(movie_id__in=tmdb_ids).only('id', 'user_id'))
+    user_ids = sorted({f.user_id for f in favorites})
+    versions = {user_id: bump_version(user_id) for user_id in user_ids}
+    for favorite in favorites:
+        favorite.version = versions[favorite.user_id]
+    FavoriteMovie.objects.bulk_update(favorites, ['version'], batch_size=500)
+    for start in range(0, len(user_ids), 500):
+        rebuild_stats(user_ids[start:start + 500])
+    return len(favorites)
+
+
+def is_user_deletion(origin):
+    """O delete() partiu de um usuário (ou queryset de usuários) removido em cascata."""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is get_user_model()
+
+
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    """Receptor de post_delete do FavoriteMovie: registra a remoção com uma nova versão."""
+    if is_user_deletion(origin):
+        # O estado e as remoções do usuário também estão sendo removidos
+        return
+    FavoriteTombstone.objects.create(
+        user_id=instance.user_id,
+        tmdb_id=instance.movie_id,
+        version=bump_version(instance.user_id),
+    )
+
+
+def changes_since(user_id, since):
+    """
+    Favoritos gravados e tmdb_ids removidos depois da versão `since`. Um filme
+    removido e adicionado de novo aparece só entre os gravados.
+    """
+    favorites = FavoriteMovie.objects.filter(user_id=user_id)
+    changed = favorites.filter(version__gt=since).order_by('version')
+    removed = (
+        FavoriteTombstone.objects.filter(user_id=user_id, version__gt=since)
+        .exclude(tmdb_id__in=favorites.values('movie_id'))
+        .order_by('version').values_list('tmdb_id', flat=True)
+    )
+    return changed, list(dict.fromkeys(removed))
+
+
+def compact_tombstones(before, batch_size=1000):
+    """
+    Apaga as remoções anteriores a `before` e registra em cada usuário a maior
+    versão apagada (compacted_version). Retorna quantas remoções foram apagadas.
+    """
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                FavoriteTombstone.objects.filter(deleted_at__lt=before)
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                return deleted
+            batch = FavoriteTombstone.objects.filter(id__in=ids)
+            horizons = batch.values('user_id').annotate(max_version=Max('version')).order_by()
+            for horizon in horizons:
+                FavoriteListState.objects.filter(
+                    user_id=horizon['user_id'], compacted_version__lt=horizon['max_version'],
+                ).update(compacted_version=horizon['max_version'])
+            deleted += batch.delete()[0]
@@ -0,0 +1,120 @@
+"""
+Rate limits em token bucket, guardados no cache THROTTLING['ALIAS'].
+
+Cada limite é um balde de N fichas que se reabastece a N por período
+("10/min" = até 10 seguidas, depois uma a cada 6 s). Quem estoura recebe 429
+com Retry-After na hora, sem ficar na fila de um worker.
+
+Com o cache local (locmem) os baldes são por processo; com o Redis de
+CACHE_URL valem para todos os workers. A leitura e gravação do balde não é
+atômica (como no SimpleRateThrottle do DRF): em corrida, algumas requisições
+a mais podem passar.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (capacidade 10, 10/60 fichas por segundo). None = sem limite."""
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+def take(key, rate, now=None):
+    """
+    Tira uma ficha do balde `key`. Retorna 0 se a requisição pode seguir ou
+    os segundos até a próxima ficha.
+    """
+    capacity, refill = rate
+    now = time.time() if now is None else now
+    cache = caches[settings.THROTTLING['ALIAS']]
+    full_key = f"throttle:{key}"
+
+    tokens, updated = cache.get(full_key, (capacity, now))
+    tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        tokens -= 1
+        wait = 0.0
+    else:
+        wait = (1 - tokens) / refill
+
+    # O balde cheio some sozinho do cache
+    cache.set(full_key, (tokens, now), timeout=int(capacity / refill) + 1)
+    return wait
+
+
+def get_rate(scope, kind):
+    if not settings.THROTTLING['ENABLED']:
+        return None
+    return parse_rate(settings.THROTTLING['RATES'].get(f"{scope}_{kind}"))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Base dos throttles: o limite vem de THROTTLING['RATES']['<scope>_<kind>'],
+    onde `scope` é o `throttle_scope` da view. Sem limite configurado, libera.
+    """
+
+    kind = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.wait_time = 0.0
+        rate = get_rate(getattr(view, 'throttle_scope', None), self.kind)
+        if rate is None:
+            return True
+        self.wait_time = take(f"{view.throttle_scope}:{self.kind}:{self.get_key(request)}", rate)
+        return self.wait_time == 0
+
+    def wait(self):
+        return self.wait_time
+
+
+class UserTokenBucketThrottle(TokenBucketThrottle):
+    """Por usuário autenticado (ou por IP, para anônimos)."""
+
+    kind = 'user'
+
+    def get_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"u{request.user.id}"
+        return f"ip{self.get_ident(request)}"
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    kind = 'ip'
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class GlobalTokenBucketThrottle(TokenBucketThrottle):
+    """Um balde para todas as requisições do escopo."""
+
+    kind = 'global'
+
+    def get_key(self, request):
+        return 'all'
+
+
+def throttle_wait(request, view, throttle_classes):
+    """
+    Para views Django sem DRF (ex.: a pesquisa async): aplica os throttles e
+    retorna os segundos de espera (0 = liberada).
+    """
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            waits.append(throttle.wait())
+    return max(waits, default=0)
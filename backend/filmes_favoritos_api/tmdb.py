@@ -0,0 +1,390 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import metrics
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp só é necessário no modo assíncrono
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# Status do TMDb que valem uma nova tentativa (rate limit e falhas do servidor)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def backoff_delay(options, attempt):
+    """Espera antes da tentativa `attempt` (1, 2, ...), igual ao Retry do urllib3."""
+    delay = options['BACKOFF_FACTOR'] * (2 ** (attempt - 1))
+    delay += random.uniform(0, options['BACKOFF_JITTER'])
+    return min(delay, options['BACKOFF_MAX'])
+
+
+class TMDbError(Exception):
+    """Erro ao consultar a API do TMDb."""
+
+
+class TMDbUnavailable(TMDbError):
+    """O TMDb está fora do ar, lento demais ou o circuit breaker está aberto."""
+
+
+class TMDbNotFound(TMDbError):
+    """O recurso (ex.: o filme) não existe no TMDb (404)."""
+
+
+class TMDbOverloaded(TMDbError):
+    """Já há TMDB['MAX_CONCURRENCY'] chamadas em andamento neste processo."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples (fechado -> aberto -> meio-aberto).
+
+    Depois de `failure_threshold` falhas seguidas o circuito abre e as chamadas
+    falham imediatamente por `reset_timeout` segundos. Passado esse tempo, uma
+    única chamada de teste é liberada: se der certo o circuito fecha de novo.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self):
+        """
+        Libera a chamada de teste que terminou sem resultado (cancelada ou com
+        um erro inesperado): o circuito continua meio-aberto e a próxima
+        chamada faz o teste.
+        """
+        with self._lock:
+            if self._state() == self.HALF_OPEN:
+                self._probing = False
+
+
+class ConcurrencyLimiter:
+    """
+    Limite de chamadas simultâneas ao TMDb no processo, sem fila: quando está
+    cheio, `acquire()` retorna False na hora (a view responde 429) em vez de
+    prender o worker esperando a vez. `limit` 0 desliga o limite.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def acquire(self):
+        with self._lock:
+            if self.limit and self.in_flight >= self.limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+
+class TMDbClient:
+    """
+    Cliente HTTP do TMDb compartilhado pelo processo.
+
+    Mantém uma única `requests.Session` com pool de conexões keep-alive,
+    timeouts de conexão/leitura, novas tentativas com jitter para 429/5xx e
+    um circuit breaker. Todas as chamadas ao TMDb devem passar por aqui.
+    """
+
+    def __init__(self, options=None):
+        self.options = options or settings.TMDB
+        self.breaker = CircuitBreaker(
+            self.options['CIRCUIT_FAILURE_THRESHOLD'],
+            self.options['CIRCUIT_RESET_TIMEOUT'],
+        )
+        self.limiter = ConcurrencyLimiter(self.options['MAX_CONCURRENCY'])
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def timeout(self):
+        return (self.options['CONNECT_TIMEOUT'], self.options['READ_TIMEOUT'])
+
+    def _build_session(self):
+        retry = Retry(
+            total=self.options['MAX_RETRIES'],
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            backoff_factor=self.options['BACKOFF_FACTOR'],
+            backoff_jitter=self.options['BACKOFF_JITTER'],
+            backoff_max=self.options['BACKOFF_MAX'],
+            # Um Retry-After longo prenderia o worker: usamos só o backoff limitado
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.options['POOL_SIZE'],
+            pool_block=False,
+            max_retries=retry,
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @property
+    def session(self):
+        # Depois de um fork (gunicorn --preload) o processo filho abre o próprio pool
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    self._session = self._build_session()
+                    self._session_pid = pid
+        return self._session
+
+    def warm(self):
+        """Monta o pool de conexões deste processo, sem chamar o TMDb."""
+        return self.session
+
+    def get(self, path, **params):
+        """Faz um GET em `path` e retorna o JSON decodificado."""
+        # O limite vem antes do breaker: uma recusa aqui não pode deixar a
+        # chamada de teste do meio-aberto reservada sem resultado
+        if not self.limiter.acquire():
+            raise TMDbOverloaded("Limite de chamadas simultâneas ao TMDb atingido.")
+        try:
+            if not self.breaker.allow():
+                raise TMDbUnavailable("Circuit breaker do TMDb aberto.")
+
+            params['api_key'] = self.options['API_KEY']
+            url = f"{self.options['BASE_URL']}{path}"
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                self.breaker.record_failure()
+                raise TMDbUnavailable(f"Falha de conexão com o TMDb: {e}") from e
+            except BaseException:
+                # Erro inesperado, sem resultado para o breaker
+                self.breaker.release_probe()
+                raise
+            finally:
+                metrics.record_tmdb(time.perf_counter() - start)
+        finally:
+            self.limiter.release()
+
+        if response.status_code in RETRY_STATUSES:
+            self.breaker.record_failure()
+            raise TMDbUnavailable(f"TMDb respondeu {response.status_code} em {path}")
+
+        # Erros 4xx (chave inválida, filme inexistente) não indicam TMDb fora do ar
+        self.breaker.record_success()
+        if response.status_code == 404:
+            raise TMDbNotFound(f"TMDb não encontrou {path}")
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            raise TMDbError(str(e)) from e
+        return response.json()
+
+    def search_movies(self, query, language, page=1):
+        """Pesquisa filmes pelo título e retorna a resposta completa do TMDb."""
+        return self.get('/search/movie', query=query, language=language, page=page)
+
+    def movie_details(self, tmdb_id, language):
+        """Detalhes de um filme (título, poster, nota, data de lançamento...)."""
+        return self.get(f'/movie/{int(tmdb_id)}', language=language)
+
+
+class AsyncTMDbClient:
+    """
+    Versão assíncrona do cliente do TMDb, usada pelas views async (ASGI).
+
+    Cada event loop tem a sua `aiohttp.ClientSession` com pool de conexões
+    keep-alive. Timeouts, novas tentativas e o circuit breaker seguem as
+    mesmas regras do `TMDbClient` (e o breaker é compartilhado com ele).
+    """
+
+    def __init__(self, options=None, breaker=None, limiter=None):
+        if aiohttp is None:
+            raise ImproperlyConfigured("O modo assíncrono do TMDb requer o pacote 'aiohttp'.")
+        self.options = options or settings.TMDB
+        self.breaker = breaker or CircuitBreaker(
+            self.options['CIRCUIT_FAILURE_THRESHOLD'],
+            self.options['CIRCUIT_RESET_TIMEOUT'],
+        )
+        self.limiter = limiter or ConcurrencyLimiter(self.options['MAX_CONCURRENCY'])
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def _build_session(self):
+        return aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.options['ASYNC_POOL_SIZE']),
+            timeout=aiohttp.ClientTimeout(
+                sock_connect=self.options['CONNECT_TIMEOUT'],
+                sock_read=self.options['READ_TIMEOUT'],
+            ),
+        )
+
+    @property
+    def session(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = self._sessions[loop] = self._build_session()
+        return session
+
+    async def aclose(self):
+        """Fecha a sessão (e as conexões) do event loop atual."""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def get(self, path, **params):
+        """Faz um GET em `path` e retorna o JSON decodificado."""
+        # Mesma ordem do TMDbClient.get: limite antes do breaker
+        if not self.limiter.acquire():
+            raise TMDbOverloaded("Limite de chamadas simultâneas ao TMDb atingido.")
+        try:
+            if not self.breaker.allow():
+                raise TMDbUnavailable("Circuit breaker do TMDb aberto.")
+
+            params['api_key'] = self.options['API_KEY']
+            url = f"{self.options['BASE_URL']}{path}"
+            start = time.perf_counter()
+            try:
+                return await self._get_with_retries(url, path, params)
+            except TMDbError:
+                # Resultado já registrado no breaker
+                raise
+            except BaseException:
+                # Cancelada (cliente desconectou, timeout da view) no meio da chamada
+                self.breaker.release_probe()
+                raise
+            finally:
+                metrics.record_tmdb(time.perf_counter() - start)
+        finally:
+            self.limiter.release()
+
+    async def _get_with_retries(self, url, path, params):
+        max_retries = self.options['MAX_RETRIES']
+
+        for attempt in range(max_retries + 1):
+            if attempt:
+                await asyncio.sleep(backoff_delay(self.options, attempt))
+            try:
+                async with self.session.get(url, params=params) as response:
+                    if response.status in RETRY_STATUSES:
+                        error = TMDbUnavailable(f"TMDb respondeu {response.status} em {path}")
+                        continue
+                    # Erros 4xx (chave inválida, filme inexistente) não indicam TMDb fora do ar
+                    self.breaker.record_success()
+                    if response.status == 404:
+                        raise TMDbNotFound(f"TMDb não encontrou {path}")
+                    try:
+                        response.raise_for_status()
+                    except aiohttp.ClientResponseError as e:
+                        raise TMDbError(str(e)) from e
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = TMDbUnavailable(f"Falha de conexão com o TMDb: {e!r}")
+
+        self.breaker.record_failure()
+        raise error
+
+    async def search_movies(self, query, language, page=1):
+        """Pesquisa filmes pelo título e retorna a resposta completa do TMDb."""
+        return await self.get('/search/movie', query=query, language=language, page=page)
+
+
+_client = None
+_async_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Retorna o cliente do TMDb do processo, criando-o no primeiro uso."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = TMDbClient()
+    return _client
+
+
+def get_async_client():
+    """
+    Retorna o cliente assíncrono do TMDb, que divide o circuit breaker e o
+    limite de chamadas simultâneas com o síncrono.
+    """
+    global _async_client
+    if _async_client is None:
+        client = get_client()
+        with _client_lock:
+            if _async_client is None:
+                _async_client = AsyncTMDbClient(breaker=client.breaker, limiter=client.limiter)
+    return _async_client
+
+
+def reset_client():
+    """Descarta os clientes atuais (ex.: depois de mudar settings.TMDB)."""
+    global _client, _async_client
+    with _client_lock:
+        if _client is not None and _client._session is not None:
+            _client._session.close()
+        _client = None
+        _async_client = None
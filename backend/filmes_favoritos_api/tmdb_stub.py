@@ -0,0 +1,175 @@
+"""
+Servidor falso do TMDb para benchmarks e testes locais.
+
+Responde às rotas usadas pela aplicação com dados determinísticos, com
+latência e taxa de erros configuráveis. Uso:
+
+    with TMDbStub(latency=0.2) as stub:
+        settings.TMDB['BASE_URL'] = stub.url
+"""
+import json
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+RESULTS_PER_PAGE = 20
+
+GENRE_IDS = [28, 12, 16, 35, 80, 99, 18, 10751, 14, 36, 27, 10402, 9648, 10749, 878, 10770, 53, 10752, 37]
+
+
+def fake_movie(tmdb_id, title=None):
+    """Monta um filme no formato dos resultados de pesquisa do TMDb."""
+    rnd = random.Random(tmdb_id)
+    title = title or f"Filme {tmdb_id}"
+    return {
+        'adult': False,
+        'backdrop_path': f"/backdrop{tmdb_id}.jpg",
+        'genre_ids': rnd.sample(GENRE_IDS, 3),
+        'id': tmdb_id,
+        'original_language': 'en',
+        'original_title': title,
+        'overview': f"Sinopse de {title}. " * rnd.randint(3, 8),
+        'popularity': round(rnd.uniform(1, 500), 3),
+        'poster_path': f"/poster{tmdb_id}.jpg",
+        'release_date': f"{rnd.randint(1950, 2025)}-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        'title': title,
+        'video': False,
+        'vote_average': round(rnd.uniform(1, 10), 3),
+        'vote_count': rnd.randint(0, 30000),
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Fila de conexões grande o bastante para centenas de requisições simultâneas
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Cliente que desistiu da resposta (timeout, cancelamento): não é erro do stub
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Cabeçalhos e corpo saem em escritas separadas: sem isso o Nagle atrasa o keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub.count_request()
+
+        delay = stub.latency + random.uniform(0, stub.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if stub.error_rate and random.random() < stub.error_rate:
+            headers = {'Retry-After': str(stub.retry_after)} if stub.retry_after is not None else None
+            self._send_json(stub.error_status, {'status_message': 'Serviço indisponível (stub).'}, headers)
+            return
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        path = url.path[len(stub.prefix):]
+        movie_id = path[len('/movie/'):] if path.startswith('/movie/') else ''
+
+        if path == '/search/movie':
+            self._send_json(200, stub.search(params.get('query', ''), int(params.get('page', 1))))
+        elif movie_id.isdigit() and int(movie_id) not in stub.missing_ids:
+            self._send_json(200, stub.details(int(movie_id)))
+        elif path == '/configuration':
+            self._send_json(200, {'images': {'base_url': 'http://image.tmdb.org/t/p/'}})
+        else:
+            self._send_json(404, {'status_message': 'Recurso não encontrado (stub).'})
+
+
+class TMDbStub:
+    """
+    Fake do TMDb rodando em uma thread do próprio processo.
+
+    `latency` (+ até `jitter`) segundos de espera por requisição e `error_rate`
+    (0 a 1) de respostas `error_status` (503), com o cabeçalho Retry-After se
+    `retry_after` for definido. `total_pages` define quantas páginas cada
+    pesquisa tem; os filmes em `missing_ids` respondem 404.
+    """
+
+    prefix = '/3'
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, total_pages=5,
+                 host='127.0.0.1', port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = 503
+        self.retry_after = None
+        self.total_pages = total_pages
+        self.missing_ids = set()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{self.prefix}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def search(self, query, page):
+        base = zlib.crc32(query.casefold().encode('utf-8')) % 100000 * 100
+        total_results = self.total_pages * RESULTS_PER_PAGE
+        results = []
+        if 1 <= page <= self.total_pages:
+            first = (page - 1) * RESULTS_PER_PAGE
+            results = [
+                fake_movie(base + first + i + 1, f"{query.title()} {first + i + 1}")
+                for i in range(RESULTS_PER_PAGE)
+            ]
+        return {
+            'page': page,
+            'results': results,
+            'total_pages': self.total_pages,
+            'total_results': total_results,
+        }
+
+    def details(self, tmdb_id):
+        movie = fake_movie(tmdb_id)
+        movie['genres'] = [{'id': genre_id, 'name': str(genre_id)} for genre_id in movie.pop('genre_ids')]
+        movie['runtime'] = 90 + tmdb_id % 60
+        return movie
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
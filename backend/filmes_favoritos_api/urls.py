@@ -1,24 +1,46 @@
+from django.conf import settings
 from django.urls import path
+from .async_views import AsyncMovieSearchView
 from .views import (MovieSearchView, FavoriteListCreateView, 
-                    FavoriteDestroyView, ShareLinkGenerateView, 
-                    ShareLinkRetrieveView, RegisterView)
+                    FavoriteBulkImportView, FavoriteExportView,
+                    FavoriteDestroyView, FavoriteStatsView, FavoriteStatusView, RecommendationView,
+                    ShareLinkGenerateView, ShareLinkRetrieveView, ShareLinkStatsView, RegisterView)
+
+# No ASGI, as views que chamam o TMDb podem rodar de forma assíncrona
+SearchView = AsyncMovieSearchView if settings.TMDB_ASYNC_VIEWS else MovieSearchView
 
 urlpatterns = [
     # Endpoint de Pesquisa
-    path('search/', MovieSearchView.as_view(), name='movie-search'),
+    path('search/', SearchView.as_view(), name='movie-search'),
 
     # Gerenciamento da Lista (GET e POST)
     path('favorites/', FavoriteListCreateView.as_view(), name='favorite-list-create'),
     
+    # Importação em lote (POST) e exportação em streaming (GET)
+    path('favorites/import/', FavoriteBulkImportView.as_view(), name='favorite-bulk-import'),
+    path('favorites/export/', FavoriteExportView.as_view(), name='favorite-export'),
+
+    # Quais filmes de uma lista já são favoritos (POST)
+    path('favorites/status/', FavoriteStatusView.as_view(), name='favorite-status'),
+
+    # Resumo da lista: total, nota média, décadas e últimos adicionados (GET)
+    path('favorites/stats/', FavoriteStatsView.as_view(), name='favorite-stats'),
+
+    # Filmes parecidos com os favoritos (GET)
+    path('recommendations/', RecommendationView.as_view(), name='recommendations'),
+
     # Remoção (DELETE)
     path('favorites/<int:tmdb_id>/', FavoriteDestroyView.as_view(), name='favorite-destroy'),
 
     # Geração do Link (POST)
     path('share/generate/', ShareLinkGenerateView.as_view(), name='share-link-generate'), 
     
-    # Visualização do Link (GET)
+    # Visualização do Link (GET) e remoção pelo dono (DELETE)
     path('share/<uuid:share_hash>/', ShareLinkRetrieveView.as_view(), name='share-link-retrieve'),
 
+    # Acessos ao link, só para o dono (GET)
+    path('share/<uuid:share_hash>/stats/', ShareLinkStatsView.as_view(), name='share-link-stats'),
+
     # Rota de Registro de Usuário
     path('register/', RegisterView.as_view(), name='user-register'),
 ]
\ No newline at end of file
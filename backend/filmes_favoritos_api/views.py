@@ -2,22 +2,123 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from .models import FavoriteMovie, ShareableList
-from .serializers import FavoriteMovieSerializer, ShareableListSerializer, UserSerializer
+from rest_framework.fields import DateTimeField
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .models import FavoriteMovie, Movie, ShareableList, SharedListDailyViews
+from .serializers import (FavoriteMovieSerializer, FavoriteStatusSerializer, ShareLinkRequestSerializer,
+                          ShareStatsRequestSerializer, UserSerializer)
+from .favorite_status import annotate_results, favorited_ids
+from .movies import ensure_movies
+from .recommendations import get_index
+from .exports import EXPORT_FORMATS, favorite_row_serializer, favorite_rows
+from .renderers import OrjsonRenderer
+from .search_cache import search_cache
+from .catalog import movie_to_result, search_catalog
+from .pagination import FavoriteCursorPagination
+from .projection import InvalidFields, parse_fields, project
+from .search_pages import (InvalidPaging, catalog_limit, catalog_page, collect_pages,
+                           fetch_pages, merge_pages, parse_paging)
+from .throttling import GlobalTokenBucketThrottle, IPTokenBucketThrottle, UserTokenBucketThrottle
+from .snapshots import ShareQuotaExceeded, active_lists, backfill_payload, get_or_create_snapshot, render_json
+from .share_views import estimate, record_view, union
+from .stats import get_stats, rebuild_stats
+from .conditional import (favorites_etag, is_conditional, not_modified, private_cache,
+                          public_cache, set_validators, snapshot_etag)
+from .sync import bump_version, changes_since, get_state
+from . import metrics, tmdb
 
-from decouple import config
-import requests
+from django.conf import settings
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from datetime import timedelta
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-# URL base da API do TMDb
-TMDB_BASE_URL = 'https://api.themoviedb.org/3'
-API_KEY = config('API_KEY')
+# Idioma usado nas pesquisas do TMDb
+TMDB_LANGUAGE = 'pt-BR'
+
+# Versão atual da lista de favoritos, para a próxima sincronização (?since=)
+FAVORITES_VERSION_HEADER = 'X-Favorites-Version'
+
+# Campos aceitos em ?fields= nos favoritos e nos links compartilhados
+FAVORITE_FIELDS = FavoriteMovieSerializer.Meta.fields
+
+
+def bad_request(error):
+    return Response({"detail": str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def fetch_tmdb_search(search_query, language=TMDB_LANGUAGE):
+    """Faz a pesquisa no TMDb e retorna a lista de resultados."""
+    data = tmdb.get_client().search_movies(search_query, language)
+    return data['results']
+
+
+def search_movies(search_query):
+    """Pesquisa no catálogo local e/ou no TMDb, conforme settings.MOVIE_SEARCH."""
+    options = settings.MOVIE_SEARCH
+    if options['BACKEND'] == 'catalog':
+        results = search_catalog(search_query, options['LIMIT'])
+        if results or not options['TMDB_FALLBACK']:
+            return results
+
+    # Busca no cache; em caso de miss, faz a requisição HTTP externa
+    return search_cache.get_or_fetch(
+        search_query,
+        TMDB_LANGUAGE,
+        lambda: fetch_tmdb_search(search_query),
+    )
+
+def fetch_tmdb_page(search_query, page, language=TMDB_LANGUAGE):
+    """Uma página da pesquisa no TMDb, com os totais para a paginação."""
+    data = tmdb.get_client().search_movies(search_query, language, page=page)
+    return {key: data.get(key) for key in ('page', 'total_pages', 'total_results', 'results')}
+
+
+def search_movie_pages(search_query, first_page, pages, limit=None):
+    """
+    Várias páginas da pesquisa (catálogo local e/ou TMDb), juntas e sem
+    repetições. As páginas do TMDb são buscadas ao mesmo tempo e cada uma
+    tem a sua entrada no cache de pesquisa.
+    """
+    options = settings.MOVIE_SEARCH
+    if options['BACKEND'] == 'catalog':
+        found = search_catalog(search_query, catalog_limit(first_page, pages))
+        if found or not options['TMDB_FALLBACK']:
+            return merge_pages([catalog_page(found, first_page, pages)], first_page, pages, limit)
+
+    def fetch_page(page):
+        return search_cache.get_or_fetch(
+            search_query,
+            TMDB_LANGUAGE,
+            lambda: fetch_tmdb_page(search_query, page),
+            page=page,
+        )
+
+    outcomes = fetch_pages(fetch_page, range(first_page, first_page + pages))
+    return merge_pages(collect_pages(outcomes), first_page, pages, limit)
+
 
 class MovieSearchView(APIView):
-    """View para pesquisar filmes na API do TMDb."""
+    """
+    View para pesquisar filmes no catálogo local ou na API do TMDb.
+
+    Sem ?page=/?pages=/?limit=, responde a lista da primeira página; com eles,
+    {page, pages, total_pages, total_results, next_page, incomplete, results}.
+    """
+    stateless_auth = True
+    # Rate limit por usuário (ou IP), por IP e global: protege a cota do TMDb
+    throttle_scope = 'search'
+    throttle_classes = [UserTokenBucketThrottle, IPTokenBucketThrottle, GlobalTokenBucketThrottle]
     
     def get(self, request):
         # 1. Obter o termo de pesquisa (query) da URL
@@ -28,25 +129,37 @@ class MovieSearchView(APIView):
                 {"detail": "O parâmetro 'query' é obrigatório para a pesquisa."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-            
-        # 2. Construir o URL da API do TMDb
-        url = f"{TMDB_BASE_URL}/search/movie"
-        params = {
-            'api_key': API_KEY,
-            'query': search_query,
-            'language': 'pt-BR'
-        }
-        
+
         try:
-            # 3. Fazer a requisição HTTP externa
-            response = requests.get(url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
+            fields = parse_fields(request.query_params.get('fields'))
+            paging = parse_paging(request.query_params)
+        except (InvalidFields, InvalidPaging) as e:
+            return bad_request(e)
             
-            return Response(data['results'], status=status.HTTP_200_OK)
+        try:
+            # 2. Pesquisa no catálogo local e/ou no TMDb (uma ou várias páginas)
+            if paging is None:
+                results = search_movies(search_query)
+            else:
+                data = search_movie_pages(search_query, *paging)
+                results = data['results']
+
+            # 3. Com login, marca os filmes que já estão nos favoritos
+            if request.user.is_authenticated and (fields is None or 'is_favorite' in fields):
+                results = annotate_results(results, request.user.id)
+
+            # 4. Só os campos pedidos em ?fields=
+            results = project(results, fields)
+            body = results if paging is None else {**data, 'results': results}
+            return Response(body, status=status.HTTP_200_OK)
             
-        except requests.exceptions.HTTPError as e:
+        except tmdb.TMDbOverloaded:
+            return Response(
+                {"detail": "Muitas pesquisas em andamento. Tente novamente em instantes."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={'Retry-After': '1'}
+            )
+        except tmdb.TMDbError as e:
             logger.error(f"Erro HTTP ao chamar TMDb: {e}")
             return Response(
                 {"detail": "Erro ao buscar filmes no TMDb. Verifique a chave da API."},
@@ -61,37 +174,346 @@ class MovieSearchView(APIView):
         
 class FavoriteListCreateView(APIView):
     """
-    GET: Retorna a lista de filmes favoritos DO USUÁRIO LOGADO.
-    POST: Adiciona um novo filme à lista do USUÁRIO LOGADO.
+    GET: Retorna a lista de filmes favoritos DO USUÁRIO LOGADO. Com
+         ?since=<versão>, retorna só o que mudou depois dessa versão; com
+         ?fields=, só os campos pedidos de cada filme.
+    POST: Adiciona um novo filme à lista do USUÁRIO LOGADO ({"tmdb_id": N}; os
+          dados do filme vêm do Movie já gravado ou do TMDb).
     """
     permission_classes = [IsAuthenticated]  # IMPEDE ACESSO SEM TOKEN
+    renderer_classes = [OrjsonRenderer, BrowsableAPIRenderer]
+    # GET pode usar só as claims do token (AUTH_STATELESS_READS)
+    stateless_auth = True
 
     def get(self, request):
+        try:
+            fields = parse_fields(request.query_params.get('fields'), FAVORITE_FIELDS)
+        except InvalidFields as e:
+            return bad_request(e)
+
+        # A versão é lida antes da lista: uma gravação concorrente pode entrar
+        # na resposta, mas nunca ficar de fora do próximo ?since=<versão>
+        version, compacted_version = get_state(request.user.id)
+        etag = favorites_etag(request, version)
+        response = not_modified(request, etag)
+        if response is None:
+            since = request.query_params.get('since')
+            if since is None:
+                response = self.list_favorites(request, fields)
+            else:
+                response = self.list_changes(request, since, version, compacted_version, fields)
+        response[FAVORITES_VERSION_HEADER] = str(version)
+        return private_cache(set_validators(response, etag))
+
+    def list_changes(self, request, since, version, compacted_version, fields=None):
+        """Delta desde a versão `since`: favoritos gravados e tmdb_ids removidos."""
+        try:
+            since = int(since)
+        except ValueError:
+            since = -1
+        if since < 0:
+            return Response(
+                {"detail": "O parâmetro 'since' deve ser uma versão da lista (inteiro não negativo)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Remoções anteriores já foram compactadas (ou a versão é de outro banco)
+        if since < compacted_version or since > version:
+            return Response(
+                {"detail": "Versão expirada. Busque a lista completa.", "version": version},
+                status=status.HTTP_410_GONE
+            )
+
+        changed, removed = changes_since(request.user.id, since)
+        changed = changed.select_related('movie')
+        if settings.FAST_READ_PATH:
+            added = favorite_row_serializer.serialize(favorite_row_serializer.values(changed))
+        else:
+            added = FavoriteMovieSerializer(changed, many=True).data
+        return Response(
+            {"version": version, "added": project(added, fields), "removed": removed},
+            status=status.HTTP_200_OK
+        )
+
+    def list_favorites(self, request, fields=None):
         # Obtém APENAS os favoritos do usuário logado
-        favorites = FavoriteMovie.objects.filter(user=request.user).order_by('-added_at')
+        favorites = FavoriteMovie.objects.filter(user_id=request.user.id).select_related('movie').order_by('-added_at')
+        if settings.FAST_READ_PATH:
+            return self.list_favorites_fast(request, favorites, fields)
+
+        # Com ?cursor= ou ?page_size=, pagina por cursor em (added_at, id)
+        paginator = FavoriteCursorPagination()
+        if paginator.is_requested(request):
+            page = paginator.paginate_queryset(favorites, request, view=self)
+            serializer = FavoriteMovieSerializer(page, many=True)
+            return paginator.get_paginated_response(project(serializer.data, fields))
         
         serializer = FavoriteMovieSerializer(favorites, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(project(serializer.data, fields), status=status.HTTP_200_OK)
+
+    def list_favorites_fast(self, request, favorites, fields=None):
+        """Mesma resposta de list_favorites, a partir de tuplas de .values_list()."""
+        rows = favorite_row_serializer.values(favorites)
+
+        paginator = FavoriteCursorPagination()
+        if paginator.is_requested(request):
+            paginator.position = favorite_row_serializer.getter('added_at', 'id')
+            page = paginator.paginate_queryset(rows, request, view=self)
+            return paginator.get_paginated_response(project(favorite_row_serializer.serialize(page), fields))
+
+        return Response(project(favorite_row_serializer.serialize(rows), fields), status=status.HTTP_200_OK)
 
     def post(self, request):
         serializer = FavoriteMovieSerializer(data=request.data)
         
         if serializer.is_valid():
-            tmdb_id = serializer.validated_data.get('tmdb_id')
+            tmdb_id = serializer.validated_data.get('movie_id')
             
             # Verifica se o filme já existe PARA ESTE USUÁRIO
-            if FavoriteMovie.objects.filter(tmdb_id=tmdb_id, user=request.user).exists():
+            if FavoriteMovie.objects.filter(movie_id=tmdb_id, user=request.user).exists():
                 return Response(
                     {"detail": "Este filme já está na sua lista de favoritos."},
                     status=status.HTTP_409_CONFLICT
                 )
             
-            # Salva o filme e liga-o ao usuário logado
-            serializer.save(user=request.user) 
+            # Dados do filme: o Movie já gravado ou os detalhes do TMDb, nunca os do cliente
+            ensured = ensure_movies([tmdb_id])
+            if tmdb_id in ensured.not_found:
+                return Response(
+                    {"detail": "Filme não encontrado no TMDb."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if tmdb_id in ensured.unavailable:
+                return Response(
+                    {"detail": "Não foi possível buscar o filme no TMDb. Tente novamente em instantes."},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE
+                )
+
+            # Salva o filme e liga-o ao usuário logado (com a nova versão da lista)
+            with transaction.atomic():
+                serializer.save(user=request.user, movie=ensured.movies[tmdb_id])
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class FavoriteBulkImportView(APIView):
+    """
+    POST: Adiciona vários filmes de uma vez à lista do USUÁRIO LOGADO.
+    Recebe uma lista de filmes e responde com o resultado de cada item
+    (created, exists, duplicate, invalid, not_found, unavailable, conflict).
+
+    Cada filme novo custa uma chamada ao TMDb: no máximo
+    FAVORITES_IMPORT_MAX_FETCHES por importação (os demais voltam como
+    unavailable, para reenviar) e poucas importações por usuário.
+    """
+    permission_classes = [IsAuthenticated]  # IMPEDE ACESSO SEM TOKEN
+    throttle_scope = 'favorites_import'
+    throttle_classes = [UserTokenBucketThrottle]
+
+    def post(self, request):
+        items = request.data
+        max_items = settings.FAVORITES_IMPORT_MAX_ITEMS
+
+        if not isinstance(items, list):
+            return Response(
+                {"detail": "Envie uma lista de filmes."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > max_items:
+            return Response(
+                {"detail": f"Envie no máximo {max_items} filmes por importação."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # 1. Valida cada item (sem consultas ao banco)
+        results = [None] * len(items)
+        to_import = {}
+        for index, item in enumerate(items):
+            serializer = FavoriteMovieSerializer(data=item)
+            if not serializer.is_valid():
+                results[index] = {"status": "invalid", "errors": serializer.errors}
+                continue
+            tmdb_id = serializer.validated_data['movie_id']
+            if tmdb_id in to_import:
+                results[index] = {"tmdb_id": tmdb_id, "status": "duplicate"}
+                continue
+            to_import[tmdb_id] = (index, serializer.validated_data)
+
+        # 2. Uma consulta para os filmes que já estão na lista
+        existing = set(
+            FavoriteMovie.objects.filter(user=request.user, movie_id__in=to_import)
+            .values_list('movie_id', flat=True)
+        )
+        # 3. Filmes que ainda não estão na tabela (ou só com o export de IDs):
+        #    detalhes do TMDb (fora da transação)
+        ensured = ensure_movies(
+            [tmdb_id for tmdb_id in to_import if tmdb_id not in existing],
+            max_fetches=settings.FAVORITES_IMPORT_MAX_FETCHES,
+        )
+        new_favorites = [
+            FavoriteMovie(user=request.user, movie_id=tmdb_id)
+            for tmdb_id in ensured.movies
+        ]
+
+        # 4. Insere tudo em uma transação, com uma nova versão da lista e o
+        #    resumo recalculado (o bulk_create não dispara sinais); conflitos
+        #    concorrentes são ignorados
+        with transaction.atomic():
+            if new_favorites:
+                version = bump_version(request.user.id)
+                for favorite in new_favorites:
+                    favorite.version = version
+            FavoriteMovie.objects.bulk_create(
+                new_favorites,
+                batch_size=settings.FAVORITES_IMPORT_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            if new_favorites:
+                rebuild_stats([request.user.id])
+        created = set(
+            FavoriteMovie.objects.filter(
+                user=request.user,
+                movie_id__in=[favorite.movie_id for favorite in new_favorites],
+            ).values_list('movie_id', flat=True)
+        )
+
+        for tmdb_id, (index, _) in to_import.items():
+            if tmdb_id in existing:
+                item_status = "exists"
+            elif tmdb_id in ensured.not_found:
+                item_status = "not_found"
+            elif tmdb_id in ensured.unavailable:
+                item_status = "unavailable"
+            elif tmdb_id in created:
+                item_status = "created"
+            else:
+                item_status = "conflict"
+            results[index] = {"tmdb_id": tmdb_id, "status": item_status}
+
+        return Response(
+            {"created": len(created), "results": results},
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class FavoriteExportView(APIView):
+    """
+    GET: Exporta a lista de favoritos DO USUÁRIO LOGADO em NDJSON (padrão) ou CSV
+    (?output=csv), em streaming e com memória constante.
+    """
+    permission_classes = [IsAuthenticated]  # IMPEDE ACESSO SEM TOKEN
+    stateless_auth = True
+
+    def get(self, request):
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"Formato inválido. Use: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        render, content_type, extension = EXPORT_FORMATS[output]
+        favorites = FavoriteMovie.objects.filter(user_id=request.user.id).order_by('-added_at', '-id')
+
+        response = StreamingHttpResponse(render(favorite_rows(favorites)), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="favoritos.{extension}"'
+        return response
+
+
+class FavoriteStatusView(APIView):
+    """
+    POST: Informa quais dos tmdb_ids enviados estão na lista do USUÁRIO LOGADO.
+    Recebe {"tmdb_ids": [603, 550]} e responde {"603": true, "550": false}.
+    """
+    permission_classes = [IsAuthenticated]  # IMPEDE ACESSO SEM TOKEN
+
+    def post(self, request):
+        serializer = FavoriteStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        tmdb_ids = serializer.validated_data['tmdb_ids']
+        favorited = favorited_ids(request.user.id, tmdb_ids)
+        return Response(
+            {str(tmdb_id): tmdb_id in favorited for tmdb_id in tmdb_ids},
+            status=status.HTTP_200_OK
+        )
+
+
+class FavoriteStatsView(APIView):
+    """
+    GET: Resumo da lista DO USUÁRIO LOGADO: total, nota média, favoritos por
+    década de lançamento e os últimos adicionados. Lido do FavoriteStats, que
+    é mantido a cada gravação (ver stats.py): uma consulta pela chave primária.
+    """
+    permission_classes = [IsAuthenticated]  # IMPEDE ACESSO SEM TOKEN
+    stateless_auth = True
+
+    def get(self, request):
+        summary = get_stats(request.user.id)
+        if summary is None:
+            return Response(
+                {"detail": "Usuário não encontrado."},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        average = summary.rating_sum / summary.rated_count if summary.rated_count else None
+        return Response({
+            'count': summary.count,
+            'rated_count': summary.rated_count,
+            'average_rating': round(float(average), 2) if average is not None else None,
+            'decades': [
+                {'decade': int(decade), 'count': count}
+                for decade, count in sorted(summary.decades.items())
+            ],
+            # Favoritos sem data de lançamento
+            'undated': summary.count - sum(summary.decades.values()),
+            'recent': summary.recent,
+        }, status=status.HTTP_200_OK)
+
+
+class RecommendationView(APIView):
+    """
+    GET: Filmes do catálogo local parecidos com os favoritos DO USUÁRIO LOGADO,
+    no formato dos resultados de pesquisa e com a similaridade em `score`.
+    Aceita ?limit= (padrão 20) e ?fields=.
+    """
+    permission_classes = [IsAuthenticated]  # IMPEDE ACESSO SEM TOKEN
+    default_limit = 20
+
+    def get(self, request):
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+        except InvalidFields as e:
+            return bad_request(e)
+        max_results = settings.RECOMMENDATIONS['MAX_RESULTS']
+        try:
+            limit = int(request.query_params.get('limit', self.default_limit))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= max_results:
+            return bad_request(f"O parâmetro 'limit' deve estar entre 1 e {max_results}.")
+
+        index = get_index()
+        if index is None:
+            return Response(
+                {"detail": "Recomendações indisponíveis no momento."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        # 1. Similaridade com todo o catálogo (em memória) e os `limit` melhores
+        favorite_ids = FavoriteMovie.objects.filter(user_id=request.user.id).values_list('movie_id', flat=True)
+        scored = index.recommend(list(favorite_ids), limit)
+
+        # 2. Dados dos filmes recomendados, em uma consulta
+        # (sem adultos: a matriz publicada pode ser anterior à mudança no catálogo)
+        movies = Movie.objects.filter(adult=False).in_bulk([tmdb_id for tmdb_id, _ in scored])
+        results = [
+            {**movie_to_result(movies[tmdb_id]), 'score': round(score, 4)}
+            for tmdb_id, score in scored
+            if tmdb_id in movies
+        ]
+        return Response(project(results, fields), status=status.HTTP_200_OK)
+
+
 class FavoriteDestroyView(APIView):
     """
     DELETE: Remove um filme favorito do usuário logado.
@@ -103,8 +525,8 @@ class FavoriteDestroyView(APIView):
         
         try:
             # Busca o filme pelo tmdb_id E pelo user logado.
-            favorite = FavoriteMovie.objects.get(
-                tmdb_id=tmdb_id,
+            favorite = FavoriteMovie.objects.select_related('movie').get(
+                movie_id=tmdb_id,
                 user=user
             )
             
@@ -115,63 +537,188 @@ class FavoriteDestroyView(APIView):
                 status=status.HTTP_404_NOT_FOUND
             )
             
+        # O delete() registra a remoção (FavoriteTombstone) e tira o filme do
+        # resumo (com os dados do Movie já carregados) na mesma transação
         favorite.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
     
 class ShareLinkGenerateView(APIView):
     """
-    POST: Gera um novo hash de compartilhamento para a lista de favoritos DO USUÁRIO.
+    POST: Gera um hash de compartilhamento para a lista de favoritos DO USUÁRIO.
+
+    O link é um snapshot endereçado pelo conteúdo: se os favoritos não mudaram
+    desde o último compartilhamento, o mesmo link é devolvido (200) em vez de
+    criar outra lista (201). Recebe opcionalmente {"expires_in_days": N}; sem
+    ele, vale a validade padrão de SHARE_LINKS['TTL_DAYS'] (0 = não expira).
+    Cada usuário mantém até SHARE_LINKS['MAX_PER_USER'] links válidos: além
+    da cota, um link novo é recusado com 409 (WHEN_FULL='reject') ou apaga os
+    mais antigos, listados em "evicted" (WHEN_FULL='evict').
     """
     permission_classes = [IsAuthenticated] # IMPEDE ACESSO SEM TOKEN
     
     def post(self, request):
-        # 1. Obtém APENAS os favoritos do usuário logado
-        favorites = FavoriteMovie.objects.filter(user=request.user)
+        serializer = ShareLinkRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        days = serializer.validated_data.get('expires_in_days', settings.SHARE_LINKS['TTL_DAYS'])
+        expires_at = timezone.now() + timedelta(days=days) if days else None
+
+        # 1. Renderiza os favoritos do usuário e procura um snapshot igual
+        try:
+            shared_list, created, evicted = get_or_create_snapshot(request.user, expires_at)
+        except ShareQuotaExceeded:
+            return Response(
+                {"detail": f"Você já tem {settings.SHARE_LINKS['MAX_PER_USER']} links de compartilhamento "
+                           "válidos. Apague um deles antes de gerar outro."},
+                status=status.HTTP_409_CONFLICT
+            )
         
-        if not favorites.exists():
+        if shared_list is None:
             return Response(
                 {"detail": "Não é possível gerar um link: sua lista de favoritos está vazia."},
                 status=status.HTTP_400_BAD_REQUEST
             )
             
-        # 2. Cria o objeto ShareableList e liga-o ao usuário
-        # O modelo ShareableList agora exige o campo 'user'
-        new_list = ShareableList.objects.create(user=request.user) 
-        
-        # 3. Adiciona os filmes filtrados ao M2M
-        new_list.favorites.set(favorites)
-        
+        # 2. Retorna o hash (novo ou reaproveitado), a validade e os links apagados pela cota
         return Response(
-            {"share_hash": new_list.share_hash},
-            status=status.HTTP_201_CREATED
+            {
+                "share_hash": shared_list.share_hash,
+                "expires_at": DateTimeField().to_representation(shared_list.expires_at)
+                if shared_list.expires_at else None,
+                "evicted": [str(share_hash) for share_hash in evicted],
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
 
 
 class ShareLinkRetrieveView(APIView):
     """
     GET: Retorna os detalhes da lista de filmes a partir do hash de compartilhamento.
+
+    A resposta já está pronta no banco: uma busca pelo índice único de
+    share_hash, sem join nem serializer. Clientes que aceitam gzip recebem a
+    cópia comprimida. O snapshot não muda, então a resposta leva ETag (o
+    sha256 do conteúdo), Last-Modified e cache público para CDN; requisições
+    condicionais são respondidas com 304 lendo só esses metadados. Com
+    ?fields=, os favoritos do snapshot são projetados antes de renderizar.
+    Links expirados respondem 404, e o cache não passa da validade do link.
+    Cada acesso (inclusive os 304) é só somado em memória (record_view).
+
+    DELETE: O dono apaga o link (e libera a vaga na cota de links).
     """
+    def delete(self, request, share_hash):
+        # O DELETE exige login (IsAuthenticatedOrReadOnly); só o dono encontra o link
+        deleted, _ = ShareableList.objects.filter(user=request.user, share_hash=share_hash).delete()
+        if not deleted:
+            return Response({"detail": "Link de compartilhamento não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     def get(self, request, share_hash):
         try:
-            # 1. Busca a lista pelo hash (UUID) passado na URL
-            shared_list = ShareableList.objects.get(share_hash=share_hash)
-            
-        except ShareableList.DoesNotExist:
-            return Response(
-                {"detail": "Link de compartilhamento inválido ou expirado."},
-                status=status.HTTP_404_NOT_FOUND
-            )
-            
-        # 2. Serializa a lista, incluindo todos os filmes relacionados
-        serializer = ShareableListSerializer(shared_list)
+            fields = parse_fields(request.query_params.get('fields'), FAVORITE_FIELDS)
+        except InvalidFields as e:
+            return bad_request(e)
+
+        # Com ?fields=, a resposta é montada a partir do snapshot sem o gzip pronto
+        accepts_gzip = fields is None and bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        snapshots = active_lists().filter(share_hash=share_hash)
+        link_not_found = Response(
+            {"detail": "Link de compartilhamento inválido ou expirado."},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+        # 1. Requisição condicional: compara só os metadados do snapshot
+        if is_conditional(request):
+            meta = snapshots.annotate(
+                compressed=ExpressionWrapper(Q(payload_gzip__isnull=False), output_field=BooleanField())
+            ).values_list('content_hash', 'created_at', 'compressed', 'expires_at').first()
+            if meta is None:
+                return link_not_found
+            content_hash, created_at, compressed, expires_at = meta
+            if content_hash:
+                etag = snapshot_etag(content_hash, accepts_gzip and compressed, fields)
+                response = not_modified(request, etag, created_at)
+                if response is not None:
+                    record_view(request, share_hash)
+                    return public_cache(set_validators(response, etag, created_at), settings.SHARE_SNAPSHOT, expires_at)
+
+        # 2. Busca o snapshot pelo hash (UUID) passado na URL
+        columns = ['payload', 'content_hash', 'created_at', 'expires_at']
+        if accepts_gzip:
+            columns.append('payload_gzip')
+        row = snapshots.values_list(*columns).first()
         
-        # 3. Retorna a lista de filmes
-        return Response(serializer.data)
+        if row is None:
+            return link_not_found
+        record_view(request, share_hash)
+
+        payload, content_hash, created_at, expires_at = row[:4]
+        if not payload:
+            # Lista anterior aos snapshots: gera o snapshot uma única vez
+            shared_list = ShareableList.objects.prefetch_related('favorites__movie').get(share_hash=share_hash)
+            payload = backfill_payload(shared_list)
+            content_hash = shared_list.content_hash
+
+        # 3. Retorna o JSON pré-renderizado (comprimido, se possível)
+        compressed = accepts_gzip and row[-1] is not None
+        if fields is not None:
+            data = json.loads(payload)
+            data['favorites'] = project(data['favorites'], fields)
+            response = HttpResponse(render_json(data), content_type='application/json')
+        elif compressed:
+            response = HttpResponse(bytes(row[-1]), content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(payload, content_type='application/json')
+        set_validators(response, snapshot_etag(content_hash, compressed, fields), created_at)
+        return public_cache(response, settings.SHARE_SNAPSHOT, expires_at)
     
+class ShareLinkStatsView(APIView):
+    """
+    GET: Acessos de um link do usuário: total, último acesso e, nos últimos
+    ?days= dias (padrão 30), acessos e visitantes únicos estimados por dia e
+    no período. Os acessos dos últimos SHARE_ANALYTICS['FLUSH_INTERVAL']
+    segundos podem ainda estar só na memória dos workers.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, share_hash):
+        serializer = ShareStatsRequestSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        shared_list = ShareableList.objects.filter(user=request.user, share_hash=share_hash).values(
+            'id', 'view_count', 'last_viewed_at',
+        ).first()
+        if shared_list is None:
+            return Response({"detail": "Link de compartilhamento não encontrado."}, status=status.HTTP_404_NOT_FOUND)
+
+        since = timezone.now().date() - timedelta(days=serializer.validated_data['days'] - 1)
+        daily = list(
+            SharedListDailyViews.objects.filter(shared_list_id=shared_list['id'], day__gte=since)
+            .order_by('day').values_list('day', 'views', 'unique_visitors', 'visitors_sketch')
+        )
+        return Response({
+            'share_hash': share_hash,
+            'views': shared_list['view_count'],
+            'last_viewed_at': DateTimeField().to_representation(shared_list['last_viewed_at'])
+            if shared_list['last_viewed_at'] else None,
+            # União dos HyperLogLogs dos dias: quem voltou em outro dia conta uma vez
+            'unique_visitors': estimate(union(bytes(sketch) for *_, sketch in daily)),
+            'daily': [
+                {'date': day.isoformat(), 'views': views, 'unique_visitors': unique_visitors}
+                for day, views, unique_visitors, _ in daily
+            ],
+        })
+
+
 class RegisterView(APIView):
     """Endpoint para cadastro de novos usuários."""
     # Permite que usuários não autenticados (qualquer um) acessem este endpoint
     permission_classes = [AllowAny] 
+    # O hash da senha (PBKDF2) é caro: limite por IP e global
+    throttle_scope = 'auth'
+    throttle_classes = [IPTokenBucketThrottle, GlobalTokenBucketThrottle]
     
     def post(self, request):
         serializer = UserSerializer(data=request.data)
@@ -183,4 +730,30 @@ class RegisterView(APIView):
                 status=status.HTTP_201_CREATED
             )
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """Login JWT com os mesmos limites do cadastro (a verificação da senha é cara)."""
+    throttle_scope = 'auth'
+    throttle_classes = [IPTokenBucketThrottle, GlobalTokenBucketThrottle]
+
+
+class MetricsView(View):
+    """
+    GET: Métricas de todos os workers no formato de texto do Prometheus.
+    View Django simples: o token de METRICS_TOKEN não é um JWT. Sem token
+    configurado, o endpoint só responde com DEBUG ligado.
+    """
+
+    def get(self, request):
+        token = settings.METRICS['TOKEN']
+        if not token:
+            if not settings.DEBUG:
+                return JsonResponse(
+                    {"detail": "Métricas desativadas: defina METRICS_TOKEN para expor o /metrics."},
+                    status=403
+                )
+        elif not constant_time_compare(request.headers.get('Authorization', ''), f"Bearer {token}"):
+            return JsonResponse({"detail": "Token de métricas inválido."}, status=401)
+
+        return HttpResponse(metrics.render(metrics.collect()), content_type=metrics.CONTENT_TYPE)
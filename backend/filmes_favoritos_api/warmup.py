@@ -0,0 +1,91 @@
+"""
+Aquecimento de um worker do gunicorn (hook post_worker_init), para a primeira
+requisição não pagar a conexão com o banco e com os caches, a montagem das
+rotas, o pool do TMDb e a abertura da matriz de recomendações.
+
+O conteúdo dos caches (pesquisas, usuários) não é pré-carregado: no cache
+local cada worker teria a sua cópia, o que custaria chamadas ao TMDb por
+worker a cada subida, e no Redis ele já é compartilhado e sobrevive aos
+restarts. Só a conexão com o Redis é aberta aqui.
+
+Roda depois do fork: nada aqui pode ser feito no processo mestre, senão os
+workers herdariam o mesmo socket do banco e do TMDb.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.urls import reverse
+
+from . import recommendations, tmdb
+
+logger = logging.getLogger(__name__)
+
+
+def warm_database():
+    # Com CONN_MAX_AGE a conexão aberta aqui é a usada pelas requisições
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    if getattr(connection, 'pool', None) is not None:
+        # Com DB_POOL, a conexão volta para o pool (aberto com MIN_SIZE conexões)
+        connection.close()
+
+
+def warm_caches():
+    # Com CACHE_URL, a primeira leitura abre a conexão do worker com o Redis
+    for alias in settings.CACHES:
+        caches[alias].get('warmup')
+
+
+def warm_urls():
+    # Importa as views e monta as rotas (o resolver é montado no primeiro reverse/resolve)
+    reverse('movie-search')
+
+
+def warm_tmdb():
+    client = tmdb.get_client()
+    client.warm()
+    if settings.WARMUP['TMDB_PRECONNECT']:
+        try:
+            client.get('/configuration')
+        except tmdb.TMDbError as e:
+            logger.warning(f"TMDb indisponível no aquecimento: {e}")
+
+
+def warm_recommendations():
+    index = recommendations.get_index()
+    if index is not None:
+        # Lê a matriz uma vez: as páginas ficam no cache do sistema operacional,
+        # divididas por todos os workers
+        index.vectors.sum()
+
+
+STEPS = {
+    'database': warm_database,
+    'caches': warm_caches,
+    'urls': warm_urls,
+    'tmdb': warm_tmdb,
+    'recommendations': warm_recommendations,
+}
+
+
+def warm_up(skip=()):
+    """
+    Executa os passos de STEPS (menos os de `skip`) e retorna {passo: ms}. Um
+    passo que falha só é registrado no log: o worker sobe mesmo assim.
+    """
+    timings = {}
+    if not settings.WARMUP['ENABLED']:
+        return timings
+    for name, step in STEPS.items():
+        if name in skip:
+            continue
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            logger.warning(f"Falha no aquecimento ({name}): {e}")
+        timings[name] = (time.perf_counter() - start) * 1000
+    return timings
@@ -0,0 +1,131 @@
+"""
+Configuração do gunicorn:
+
+    gunicorn -c python:verzel_filmes_app.gunicorn_config
+
+GUNICORN_PROFILE escolhe o tipo de worker (o app WSGI ou ASGI vem junto):
+
+- sync: um processo por requisição simultânea, 2 × núcleos + 1 workers.
+  O padrão: a pesquisa no TMDb prende o worker só durante a chamada.
+- gthread: menos processos (núcleos + 1) com GUNICORN_THREADS threads cada;
+  menos memória para a mesma concorrência, com o GIL dividido entre as threads.
+- asgi: UvicornWorker com verzel_filmes_app.asgi e as views assíncronas da
+  pesquisa (TMDB_ASYNC_VIEWS), um processo por núcleo.
+
+Com GUNICORN_PRELOAD (padrão), o Django é carregado no processo mestre antes
+do fork e os workers dividem essas páginas de memória (copy-on-write). Depois
+de iniciar, cada worker abre o pool do TMDb, a conexão do banco (sync) e a do
+Redis dos caches, monta as rotas e lê a matriz de recomendações
+(filmes_favoritos_api.warmup); o conteúdo dos caches não é pré-carregado. WEB_CONCURRENCY fixa o número de
+workers. O benchmark_server mede o tempo de subida e a memória de cada perfil.
+"""
+import gc
+import os
+from pathlib import Path
+
+# Não pode se chamar config: o gunicorn lê todas as variáveis do módulo como opções
+from decouple import config as env
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'verzel_filmes_app.settings')
+
+WSGI_APP = 'verzel_filmes_app.wsgi:application'
+ASGI_APP = 'verzel_filmes_app.asgi:application'
+
+
+def available_cores():
+    """Núcleos que o processo pode usar: afinidade de CPU e cota do cgroup (containers)."""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    try:
+        quota, period = Path('/sys/fs/cgroup/cpu.max').read_text().split()
+        if quota != 'max':
+            cores = min(cores, max(1, -(-int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+# Perfil -> (classe do worker, workers por núcleo, app)
+PROFILES = {
+    'sync': ('sync', lambda cores: 2 * cores + 1, WSGI_APP),
+    'gthread': ('gthread', lambda cores: cores + 1, WSGI_APP),
+    'asgi': ('uvicorn.workers.UvicornWorker', lambda cores: cores, ASGI_APP),
+}
+
+profile = env('GUNICORN_PROFILE', default='sync')
+if profile not in PROFILES:
+    raise RuntimeError(f"GUNICORN_PROFILE inválido: {profile!r}. Use: {', '.join(PROFILES)}.")
+worker_class, workers_for, wsgi_app = PROFILES[profile]
+if profile == 'asgi':
+    os.environ.setdefault('TMDB_ASYNC_VIEWS', 'True')
+
+cores = available_cores()
+bind = f"0.0.0.0:{env('PORT', default=8000, cast=int)}"
+workers = env('WEB_CONCURRENCY', default=workers_for(cores), cast=int)
+threads = env('GUNICORN_THREADS', default=4 if profile == 'gthread' else 1, cast=int)
+
+# Carrega o app antes do fork: workers dividem a memória e sobem mais rápido
+preload_app = env('GUNICORN_PRELOAD', default=True, cast=bool)
+
+# Recicla os workers de tempos em tempos (vazamentos de memória), com
+# jitter para não reiniciarem todos juntos
+max_requests = env('GUNICORN_MAX_REQUESTS', default=2000, cast=int)
+max_requests_jitter = env('GUNICORN_MAX_REQUESTS_JITTER', default=200, cast=int)
+
+# Pior caso de uma pesquisa: (3,05 s de conexão + 5 s de leitura) × 3
+# tentativas com backoff ≈ 26 s; o worker só é morto depois disso
+timeout = env('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = env('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+# Maior que o keep-alive do balanceador na frente (ex.: 5 s no Render)
+keepalive = env('GUNICORN_KEEPALIVE', default=10, cast=int)
+
+accesslog = env('GUNICORN_ACCESS_LOG', default=None)
+errorlog = '-'
+# Arquivos temporários de heartbeat em memória (o /tmp de containers pode ser lento)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+
+def pre_fork(server, worker):
+    """
+    Com o preload, nenhuma conexão do mestre pode ser herdada pelos workers, e
+    os objetos já carregados saem da coleta de lixo (gc.freeze): o coletor não
+    reescreve as páginas deles e elas continuam divididas com o mestre.
+    """
+    if preload_app:
+        from django.db import connections
+        connections.close_all()
+        for connection in connections.all(initialized_only=True):
+            if getattr(connection, 'pool', None) is not None:
+                # Cada worker abre o próprio pool (DB_POOL)
+                connection.close_pool()
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    """Depois do fork e da carga do app: aquece o worker antes da primeira requisição."""
+    from django.db import connection
+    from filmes_favoritos_api.warmup import warm_up
+
+    # Sem o pool, as conexões do banco são por thread e só o sync atende na
+    # thread principal: no gthread e no ASGI abrir uma aqui só deixaria uma
+    # conexão parada. Com o pool, o aquecimento abre as MIN_SIZE conexões
+    pooled = getattr(connection, 'pool', None) is not None
+    timings = warm_up(skip=() if profile == 'sync' or pooled else ('database', ))
+    worker.log.info("Worker %s aquecido: %s", worker.pid,
+                    ', '.join(f"{step} {ms:.0f} ms" for step, ms in timings.items()))
+
+
+def worker_exit(server, worker):
+    """No worker, ao sair (inclusive reciclado pelo max_requests): grava os acessos dos links em memória."""
+    if worker.pid != os.getpid():
+        # O mestre também chama este hook para um worker que já tinha morrido
+        return
+    from filmes_favoritos_api.share_views import flush_at_exit
+    flush_at_exit()
+
+
+def child_exit(server, worker):
+    """No mestre: soma as métricas do worker encerrado (METRICS_DIR) no archive.json."""
+    directory = env('METRICS_DIR', default='')
+    if directory:
+        from filmes_favoritos_api import metrics
+        metrics.mark_process_dead(worker.pid, directory)
@@ -56,8 +56,13 @@ INSTALLED_APPS = [
 # ==============================================================================
 
 MIDDLEWARE = [
+    # Primeiro da lista: a latência medida inclui todos os outros middlewares
+    "filmes_favoritos_api.middleware.MetricsMiddleware",
+    # brotli/gzip das respostas (logo abaixo das métricas, que medem o tamanho final)
+    "filmes_favoritos_api.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    # WhiteNoise com suporte a async, para não serializar as views async no ASGI
+    "filmes_favoritos_api.middleware.AsyncWhiteNoiseMiddleware",
     'corsheaders.middleware.CorsMiddleware', 
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -67,6 +72,16 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Compressão das respostas (CompressionMiddleware): brotli quando o pacote
+# está instalado e o cliente aceita, senão gzip. Respostas menores que
+# MIN_SIZE bytes não compensam o custo de CPU (ver benchmark_compression)
+COMPRESSION = {
+    'ENABLED': config('COMPRESSION_ENABLED', default=True, cast=bool),
+    'MIN_SIZE': config('COMPRESSION_MIN_SIZE', default=1024, cast=int),
+    'GZIP_LEVEL': config('COMPRESSION_GZIP_LEVEL', default=6, cast=int),
+    'BROTLI_QUALITY': config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int),
+}
+
 # --- FIM da seção MIDDLEWARE ---
 
 # CORS
@@ -78,6 +93,8 @@ CORS_ALLOWED_ORIGINS = [
     "https://verzel-filmes-front.onrender.com", 
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Cabeçalhos que o front-end pode ler nas respostas
+CORS_EXPOSE_HEADERS = ['ETag', 'X-Favorites-Version', 'Retry-After']
 
 
 ROOT_URLCONF = "verzel_filmes_app.urls"
@@ -107,12 +124,33 @@ WSGI_APPLICATION = "verzel_filmes_app.wsgi.application"
 # 1. Tenta ler DATABASE_URL (definida pelo Render em produção)
 DATABASE_URL = config('DATABASE_URL', default=None)
 
+# Conexões com o PostgreSQL. Sem POOL, cada thread mantém a sua conexão por
+# CONN_MAX_AGE segundos, conferida no início de cada requisição
+# (CONN_HEALTH_CHECKS). Com POOL, cada processo tem um pool do psycopg 3 com
+# MIN_SIZE a MAX_SIZE conexões: a conexão volta ao pool no fim da requisição
+# e, com CONN_HEALTH_CHECKS, é conferida antes de ser entregue. O total no
+# servidor fica em até MAX_SIZE x workers; uma requisição espera até TIMEOUT s
+# por uma conexão livre
+DB_POOL = {
+    'ENABLED': config('DB_POOL', default=False, cast=bool),
+    'MIN_SIZE': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+    'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+    'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    # Conexões acima do MIN_SIZE paradas por MAX_IDLE s são fechadas, e
+    # nenhuma dura mais que MAX_LIFETIME s
+    'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+    'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+    'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+    'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+}
+
 if DATABASE_URL:
     # MODO PRODUÇÃO: Usa a URL completa do Render
     DATABASES = {
         'default': dj_database_url.config(
             default=DATABASE_URL,
-            conn_max_age=600  
+            conn_max_age=DB_POOL['CONN_MAX_AGE'],
+            conn_health_checks=DB_POOL['CONN_HEALTH_CHECKS'],
         )
     }
 else:
@@ -128,18 +166,293 @@ else:
             'PORT': config('DB_PORT', default=''),
         }
     }
-    
+
+if DB_POOL['ENABLED'] and DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # O pool substitui as conexões persistentes (o Django não aceita os dois);
+    # com CONN_HEALTH_CHECKS, o pool faz um SELECT 1 antes de entregar cada
+    # conexão e troca as quebradas
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = DB_POOL['CONN_HEALTH_CHECKS']
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': DB_POOL['MIN_SIZE'],
+        'max_size': DB_POOL['MAX_SIZE'],
+        'timeout': DB_POOL['TIMEOUT'],
+        'max_idle': DB_POOL['MAX_IDLE'],
+        'max_lifetime': DB_POOL['MAX_LIFETIME'],
+    }
+
 # --- FIM da seção DATABASES ---
 
+# ==============================================================================
+# CACHE (LOCMEM LOCAL / REDIS COMPARTILHADO EM PRODUÇÃO)
+# ==============================================================================
+
+# Em produção, CACHE_URL aponta para um Redis compartilhado entre os workers
+CACHE_URL = config('CACHE_URL', default=None)
+
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        },
+        'tmdb': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'tmdb',
+        },
+        'auth': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'auth',
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+            'KEY_PREFIX': 'throttle',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'default',
+        },
+        'tmdb': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'tmdb',
+            'OPTIONS': {
+                # Limite de pesquisas guardadas por processo
+                'MAX_ENTRIES': config('TMDB_SEARCH_CACHE_MAX_ENTRIES', default=2000, cast=int),
+            },
+        },
+        'auth': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'auth',
+            'OPTIONS': {
+                # Limite de usuários guardados por processo
+                'MAX_ENTRIES': config('AUTH_CACHE_MAX_ENTRIES', default=5000, cast=int),
+            },
+        },
+        'throttle': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'throttle',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        },
+    }
+
+# Cache das pesquisas no TMDb (ver filmes_favoritos_api/search_cache.py)
+TMDB_SEARCH_CACHE = {
+    'ALIAS': 'tmdb',
+    # Tempo de vida (segundos) de uma pesquisa no cache
+    'TIMEOUT': config('TMDB_SEARCH_CACHE_TIMEOUT', default=600, cast=int),
+    # Termos maiores que isso não são guardados
+    'MAX_QUERY_LENGTH': config('TMDB_SEARCH_CACHE_MAX_QUERY_LENGTH', default=100, cast=int),
+    # Tempo máximo (segundos) que uma requisição espera pela pesquisa idêntica em andamento
+    'COALESCE_TIMEOUT': config('TMDB_SEARCH_CACHE_COALESCE_TIMEOUT', default=15, cast=float),
+}
+
+# Usuários resolvidos pela autenticação JWT (ver filmes_favoritos_api/authentication.py)
+AUTH_CACHE = {
+    'ALIAS': 'auth',
+    # Tempo de vida (segundos): limita por quanto tempo outro worker pode ver
+    # um usuário desativado/com senha trocada quando o cache é local
+    'TIMEOUT': config('AUTH_CACHE_TIMEOUT', default=60, cast=int),
+    # Views com `stateless_auth = True` confiam nas claims assinadas do token
+    # em GET/HEAD/OPTIONS, sem consultar o usuário
+    'STATELESS_READS': config('AUTH_STATELESS_READS', default=False, cast=bool),
+}
+
+# Rate limits em token bucket (ver filmes_favoritos_api/throttling.py).
+# "N/período": até N seguidas, reabastecendo N por período. Chave vazia = sem
+# limite. No cache local os baldes (inclusive os globais) são por processo
+THROTTLING = {
+    'ENABLED': config('THROTTLING_ENABLED', default=True, cast=bool),
+    'ALIAS': 'throttle',
+    'RATES': {
+        # Login e cadastro (PBKDF2: dezenas de ms de CPU por chamada). O limite
+        # por IP é a defesa contra força bruta; o global só protege a CPU e
+        # fica bem acima do uso normal, para um cliente sozinho não bloquear
+        # o login de todos
+        'auth_ip': config('THROTTLE_AUTH_IP', default='20/min'),
+        'auth_global': config('THROTTLE_AUTH_GLOBAL', default='50/s'),
+        # Pesquisa (cota do TMDb compartilhada por todos)
+        'search_user': config('THROTTLE_SEARCH_USER', default='60/min'),
+        'search_ip': config('THROTTLE_SEARCH_IP', default='120/min'),
+        'search_global': config('THROTTLE_SEARCH_GLOBAL', default='40/s'),
+        # Importação em lote dos favoritos (até FAVORITES_IMPORT_MAX_FETCHES chamadas ao TMDb cada)
+        'favorites_import_user': config('THROTTLE_FAVORITES_IMPORT_USER', default='5/min'),
+    },
+}
+
+# --- FIM da seção CACHE ---
+
+# ==============================================================================
+# TMDb (CLIENTE HTTP COMPARTILHADO - ver filmes_favoritos_api/tmdb.py)
+# ==============================================================================
+
+TMDB = {
+    'BASE_URL': config('TMDB_BASE_URL', default='https://api.themoviedb.org/3'),
+    'API_KEY': config('API_KEY'),
+    # Conexões keep-alive mantidas por processo
+    'POOL_SIZE': config('TMDB_POOL_SIZE', default=10, cast=int),
+    # Conexões do cliente assíncrono (uma requisição async não prende um worker)
+    'ASYNC_POOL_SIZE': config('TMDB_ASYNC_POOL_SIZE', default=100, cast=int),
+    # Timeouts (segundos) de conexão e de leitura
+    'CONNECT_TIMEOUT': config('TMDB_CONNECT_TIMEOUT', default=3.05, cast=float),
+    'READ_TIMEOUT': config('TMDB_READ_TIMEOUT', default=5, cast=float),
+    # Novas tentativas para 429/5xx e falhas de conexão, com backoff exponencial + jitter
+    'MAX_RETRIES': config('TMDB_MAX_RETRIES', default=2, cast=int),
+    'BACKOFF_FACTOR': config('TMDB_BACKOFF_FACTOR', default=0.2, cast=float),
+    'BACKOFF_JITTER': config('TMDB_BACKOFF_JITTER', default=0.2, cast=float),
+    'BACKOFF_MAX': config('TMDB_BACKOFF_MAX', default=2, cast=float),
+    # Circuit breaker: falhas seguidas até abrir e segundos até tentar de novo
+    'CIRCUIT_FAILURE_THRESHOLD': config('TMDB_CIRCUIT_FAILURE_THRESHOLD', default=5, cast=int),
+    'CIRCUIT_RESET_TIMEOUT': config('TMDB_CIRCUIT_RESET_TIMEOUT', default=30, cast=float),
+    # Chamadas simultâneas ao TMDb por processo; acima disso a pesquisa
+    # responde 429 na hora (0 = sem limite). Total = isso x workers
+    'MAX_CONCURRENCY': config('TMDB_MAX_CONCURRENCY', default=20, cast=int),
+}
+
+# Pesquisa de filmes: 'tmdb' (API externa) ou 'catalog' (tabela Movie local,
+# preenchida com `manage.py import_tmdb_catalog`)
+MOVIE_SEARCH = {
+    'BACKEND': config('MOVIE_SEARCH_BACKEND', default='tmdb'),
+    # Sem resultados no catálogo, consulta o TMDb
+    'TMDB_FALLBACK': config('MOVIE_SEARCH_TMDB_FALLBACK', default=True, cast=bool),
+    'LIMIT': config('MOVIE_SEARCH_LIMIT', default=20, cast=int),
+    # ?pages=N / ?limit=: páginas do TMDb buscadas ao mesmo tempo por pesquisa
+    # (cada uma ocupa uma vaga do TMDB_MAX_CONCURRENCY) e threads para elas
+    'MAX_PAGES': config('MOVIE_SEARCH_MAX_PAGES', default=5, cast=int),
+    'PAGE_WORKERS': config('MOVIE_SEARCH_PAGE_WORKERS', default=16, cast=int),
+}
+
+# Usa as views assíncronas (ASGI) nos endpoints que chamam o TMDb
+TMDB_ASYNC_VIEWS = config('TMDB_ASYNC_VIEWS', default=False, cast=bool)
+
+# --- FIM da seção TMDb ---
+
+# ==============================================================================
+# MÉTRICAS (PROMETHEUS EM /metrics + SERVER-TIMING)
+# ==============================================================================
+
+METRICS = {
+    'ENABLED': config('METRICS_ENABLED', default=True, cast=bool),
+    # Diretório compartilhado pelos workers do gunicorn (um <pid>.json por
+    # worker); sem ele o /metrics mostra só o processo que atendeu
+    'DIR': config('METRICS_DIR', default=None),
+    # Intervalo mínimo (s) entre as gravações do snapshot de cada worker
+    'FLUSH_INTERVAL': config('METRICS_FLUSH_INTERVAL', default=1.0, cast=float),
+    # Envia app/db/tmdb no cabeçalho Server-Timing (visível no DevTools)
+    'SERVER_TIMING': config('METRICS_SERVER_TIMING', default=True, cast=bool),
+    # O /metrics exige "Authorization: Bearer <token>"; sem token, só responde com DEBUG
+    'TOKEN': config('METRICS_TOKEN', default=None),
+}
+
+# --- FIM da seção MÉTRICAS ---
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         # Define o JWT como o principal método de autenticação da API
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # (com o usuário em cache - ver filmes_favoritos_api/authentication.py)
+        'filmes_favoritos_api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         # Rejeita requisições se não estiver autenticado
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
-    )
+    ),
+    # Proxies reversos confiáveis na frente da aplicação (o Render usa 1). Com
+    # 0, o IP dos rate limits e das visitas dos links é o REMOTE_ADDR e o
+    # X-Forwarded-For enviado pelo cliente é ignorado
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+}
+
+# Paginação por cursor da lista de favoritos (?cursor= / ?page_size=)
+FAVORITES_PAGE_SIZE = config('FAVORITES_PAGE_SIZE', default=50, cast=int)
+FAVORITES_MAX_PAGE_SIZE = config('FAVORITES_MAX_PAGE_SIZE', default=200, cast=int)
+
+# Caminho rápido de leitura da lista de favoritos: linhas de .values_list() com
+# conversores pré-montados e renderização com orjson (mesmos bytes da API)
+FAST_READ_PATH = config('FAST_READ_PATH', default=False, cast=bool)
+
+# Importação em lote e exportação em streaming dos favoritos
+FAVORITES_IMPORT_MAX_ITEMS = config('FAVORITES_IMPORT_MAX_ITEMS', default=1000, cast=int)
+FAVORITES_IMPORT_BATCH_SIZE = config('FAVORITES_IMPORT_BATCH_SIZE', default=500, cast=int)
+FAVORITES_EXPORT_CHUNK_SIZE = config('FAVORITES_EXPORT_CHUNK_SIZE', default=2000, cast=int)
+# Buscas simultâneas no TMDb dos filmes favoritados que ainda não estão na tabela Movie
+FAVORITES_TMDB_WORKERS = config('FAVORITES_TMDB_WORKERS', default=8, cast=int)
+# Máximo de filmes buscados no TMDb por importação em lote (a requisição
+# precisa terminar bem antes do timeout do gunicorn); os demais voltam como
+# "unavailable" e podem ser reenviados
+FAVORITES_IMPORT_MAX_FETCHES = config('FAVORITES_IMPORT_MAX_FETCHES', default=50, cast=int)
+
+# Máximo de tmdb_ids por consulta em lote de POST /api/favorites/status/
+FAVORITE_STATUS_MAX_IDS = config('FAVORITE_STATUS_MAX_IDS', default=500, cast=int)
+
+# Sincronização incremental dos favoritos (GET /api/favorites/?since=<versão>):
+# as remoções ficam guardadas TOMBSTONE_DAYS dias (compact_favorite_tombstones)
+FAVORITES_SYNC = {
+    'TOMBSTONE_DAYS': config('FAVORITES_TOMBSTONE_DAYS', default=30, cast=int),
+}
+
+# Resumo da lista de favoritos (GET /api/favorites/stats/), mantido a cada
+# gravação: RECENT = quantos favoritos mais recentes ele guarda
+FAVORITE_STATS = {
+    'RECENT': config('FAVORITE_STATS_RECENT', default=5, cast=int),
+}
+
+# Snapshots dos links compartilhados: JSON pré-renderizado e, a partir de
+# COMPRESS_MIN_SIZE bytes, também uma cópia gzip servida a quem aceita gzip.
+# MAX_AGE/S_MAXAGE: Cache-Control público (navegador / CDN) das respostas
+SHARE_SNAPSHOT = {
+    'COMPRESS': config('SHARE_SNAPSHOT_COMPRESS', default=True, cast=bool),
+    'COMPRESS_MIN_SIZE': config('SHARE_SNAPSHOT_COMPRESS_MIN_SIZE', default=1024, cast=int),
+    'MAX_AGE': config('SHARE_CACHE_MAX_AGE', default=300, cast=int),
+    'S_MAXAGE': config('SHARE_CACHE_S_MAXAGE', default=3600, cast=int),
+}
+
+# Recomendações a partir do catálogo local (build_recommendations): a matriz
+# de vetores fica em DIR, e cada processo confere a cada RELOAD_INTERVAL
+# segundos se há uma geração nova
+RECOMMENDATIONS = {
+    'DIR': config('RECOMMENDATIONS_DIR', default=str(BASE_DIR / 'recommendations')),
+    'RELOAD_INTERVAL': config('RECOMMENDATIONS_RELOAD_INTERVAL', default=60, cast=float),
+    'MAX_RESULTS': config('RECOMMENDATIONS_MAX_RESULTS', default=50, cast=int),
+}
+
+# Validade e cota dos links compartilhados: TTL_DAYS é a validade padrão
+# (0 = sem validade), o cliente pode pedir até MAX_TTL_DAYS, e cada usuário
+# mantém até MAX_PER_USER links válidos. Com a cota cheia, WHEN_FULL decide:
+# 'reject' responde 409 (o usuário apaga um link com DELETE /api/share/<hash>/)
+# e 'evict' apaga os links mais antigos, informados em "evicted"
+SHARE_LINKS = {
+    'TTL_DAYS': config('SHARE_LINK_TTL_DAYS', default=0, cast=int),
+    'MAX_TTL_DAYS': config('SHARE_LINK_MAX_TTL_DAYS', default=365, cast=int),
+    'MAX_PER_USER': config('SHARE_LINK_MAX_PER_USER', default=20, cast=int),
+    'WHEN_FULL': config('SHARE_LINK_WHEN_FULL', default='reject'),
+}
+
+# Acessos dos links compartilhados (filmes_favoritos_api/share_views.py):
+# somados em memória e gravados por uma thread de cada processo a cada
+# FLUSH_INTERVAL s (ou ao juntar MAX_PENDING acessos), em lotes de BATCH_SIZE
+# listas. Visitantes únicos por dia estimados com HyperLogLog de
+# 2^HLL_PRECISION registradores (10 = 1 KB por dia, erro ~3%)
+SHARE_ANALYTICS = {
+    'ENABLED': config('SHARE_ANALYTICS_ENABLED', default=True, cast=bool),
+    'FLUSH_INTERVAL': config('SHARE_ANALYTICS_FLUSH_INTERVAL', default=10, cast=float),
+    'MAX_PENDING': config('SHARE_ANALYTICS_MAX_PENDING', default=5000, cast=int),
+    'BATCH_SIZE': config('SHARE_ANALYTICS_BATCH_SIZE', default=500, cast=int),
+    'HLL_PRECISION': config('SHARE_ANALYTICS_HLL_PRECISION', default=10, cast=int),
+    # Dias devolvidos pelo endpoint de estatísticas do link
+    'MAX_DAYS': config('SHARE_ANALYTICS_MAX_DAYS', default=90, cast=int),
+}
+
+# Aquecimento de cada worker do gunicorn antes da primeira requisição (ver
+# verzel_filmes_app/gunicorn_config.py). TMDB_PRECONNECT faz uma chamada leve
+# ao TMDb (/configuration) para já abrir a conexão TLS do pool
+WARMUP = {
+    'ENABLED': config('WARMUP_ENABLED', default=True, cast=bool),
+    'TMDB_PRECONNECT': config('WARMUP_TMDB_PRECONNECT', default=False, cast=bool),
 }
 
 
@@ -188,7 +501,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Configurações do JWT
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
+    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=config('JWT_ACCESS_TOKEN_MINUTES', default=5, cast=int)),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=30),
     "ROTATE_REFRESH_TOKENS": True,
 }
\ No newline at end of file
@@ -98,7 +98,9 @@ function Favorites() {
       showNotification('Link gerado com sucesso!', 'success');
       
     } catch (e) {
-      showNotification('Erro ao gerar link. A lista pode estar vazia ou o servidor falhou.', 'error');
+      // 400 (lista vazia) e 409 (limite de links) trazem o motivo em detail
+      const detail = e.response?.data?.detail;
+      showNotification(detail || 'Erro ao gerar link. A lista pode estar vazia ou o servidor falhou.', 'error');
     }
   };
   
@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { searchMovies, addFavorite, getFavorites, removeFavorite } from '../services/api';
+import { searchMovies, addFavorite, removeFavorite } from '../services/api';
 import { useAuth } from '../context/AuthContext';
 
 const TMDB_IMAGE_URL = 'https://image.tmdb.org/t/p/w500';
@@ -69,21 +69,10 @@ function Home() {
   
 
   useEffect(() => {
-    const loadFavorites = async () => {
-        if (!isLoggedIn) {
-        setFavoriteIds([]);
-        return;
-        }
-        try {
-        const response = await getFavorites();
-        // Mapeia o resultado para obter apenas os tmdb_id
-        setFavoriteIds(response.data.map(fav => fav.tmdb_id));
-        } catch (e) {
-        console.error("Não foi possível carregar favoritos:", e);
-        }
-    };
-
-    loadFavorites();
+    // Sem login, nenhum resultado aparece como favorito
+    if (!isLoggedIn) {
+      setFavoriteIds([]);
+    }
   }, [isLoggedIn]);
 
   const handleSearch = async (e) => {
@@ -97,6 +86,8 @@ function Home() {
     try {
       const response = await searchMovies(searchTerm);
       setMovies(response.data); 
+      // Com login, a pesquisa já marca os favoritos (is_favorite)
+      setFavoriteIds(response.data.filter(movie => movie.is_favorite).map(movie => movie.id));
     } catch (err) {
       setError("Falha ao buscar filmes. Verifique o servidor Django e a API Key.");
     } finally {
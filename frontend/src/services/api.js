@@ -39,9 +39,11 @@ export const apiRegister = (data) =>
 
 // Funções do Core do Aplicativo (USAM o interceptor e o Token)
 
-// A - Pesquisa TMDb
+// A - Pesquisa TMDb (só os campos exibidos nos cards)
+const SEARCH_FIELDS = 'id,title,poster_path,vote_average,release_date,is_favorite';
+
 export const searchMovies = (query) => {
-  return api.get(`/search/`, { params: { query } });
+  return api.get(`/search/`, { params: { query, fields: SEARCH_FIELDS } });
 };
 
 // B - Gerenciamento de Favoritos (CRUD)
@@ -49,8 +51,15 @@ export const addFavorite = (movieData) => api.post('/favorites/', movieData);
 
 export const getFavorites = () => api.get('/favorites/');
 
+// Só o que mudou desde a versão `since` (cabeçalho X-Favorites-Version da
+// resposta anterior): { version, added, removed }. 410 = buscar a lista completa
+export const syncFavorites = (since) => api.get('/favorites/', { params: { since } });
+
 export const removeFavorite = (tmdbId) => api.delete(`/favorites/${tmdbId}/`);
 
+// Quais dos tmdb_ids já estão nos favoritos: { "603": true, "550": false }
+export const getFavoriteStatus = (tmdbIds) => api.post('/favorites/status/', { tmdb_ids: tmdbIds });
+
 // C - Compartilhamento
 export const generateShareLink = () => api.post('/share/generate/');
 